@@ -2,23 +2,34 @@
 """
 Compatible with ASTRA 8.2 and later only.
 """
-import comtypes.client
-from comtypes.client import GetEvents, PumpEvents
-
-import inspect
-
-from distutils.version import LooseVersion
-from threading import Event, RLock, Thread
+import queue
+import re
+import traceback
+
+from threading import Condition, Event, Lock, RLock, Thread, get_ident
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from functools import partial
 from enum import Enum
 from datetime import datetime
-from typing import Callable
-from dataclasses import dataclass
-from copy import deepcopy
+from time import monotonic
+from typing import Callable, Iterable
+from dataclasses import dataclass, fields, replace
+from copy import copy
 from ctypes import *
 
+from astra_errors import AstraError, AstraErrorCode
+from astra_metrics import COM_CALL, EVENT_WAIT, LOCK_WAIT, MetricsRegistry, MetricsSnapshot, call_name
+from astra_trace import Tracer
+from fraction_results import FractionResult, FractionResultError
+from com_backend import get_backend
+
 
 rlock = RLock()
 
+# Creates the ASTRA objects: COM servers, or in-process fakes when "ASTRA_BACKEND" is "fake".
+backend = get_backend()
+
 # Security pack classes
 @dataclass
 class LogonResult:
@@ -154,32 +165,158 @@ class PeakRanges:
     peaks: list
 
 
+@dataclass
+class DispatchStats:
+    """Counters of the ObserverDispatcher. Latencies are expressed in seconds, from the
+    notification to the call of the observer.
+    """
+    queue_depth: int
+    max_queue_depth: int
+    dispatched: int
+    dropped: int
+    mean_latency: float
+    max_latency: float
+
+
+class ObserverDispatcher:
+    """Deliver notifications to observers on a bounded thread pool.
+
+    Each observer has its own queue, served by at most one worker at a time, so that it
+    receives notifications in order while a slow observer only delays itself. Workers
+    deliver one notification per turn so that observers share the pool fairly.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = None, name: str = "AstraObservers") -> None:
+        """Constructor.
+
+        Args:
+            max_workers (int, optional): Number of observers notified at the same time. Defaults to 4.
+            max_queue_size (int, optional): Maximum number of notifications queued per observer, the oldest ones
+                are dropped beyond that. Defaults to None (unbounded).
+            name (str, optional): Prefix of the worker thread names. Defaults to "AstraObservers".
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._max_queue_size = max_queue_size
+        self._condition = Condition()
+        self._queues: dict[Callable, deque] = {}
+        self._scheduled: set[Callable] = set()
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._dispatched = 0
+        self._dropped = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def post(self, observer: Callable, *args) -> None:
+        """Queue a notification for "observer" and return immediately.
+
+        Args:
+            observer (Callable): Observer to notify.
+            args: Arguments of "observer".
+        """
+        with self._condition:
+            pending = self._queues.setdefault(observer, deque())
+            if self._max_queue_size is not None and len(pending) >= self._max_queue_size:
+                pending.popleft()
+                self._queue_depth -= 1
+                self._dropped += 1
+            pending.append((monotonic(), args))
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+            if observer in self._scheduled:
+                return
+            self._scheduled.add(observer)
+        self._executor.submit(self._deliver, observer)
+
+    def _deliver(self, observer: Callable) -> None:
+        with self._condition:
+            posted, args = self._queues[observer].popleft()
+            self._queue_depth -= 1
+            latency = monotonic() - posted
+            self._dispatched += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+
+        try:
+            observer(*args)
+        except Exception:
+            # A failing observer must not prevent the other ones from being notified.
+            traceback.print_exc()
+
+        with self._condition:
+            if not self._queues[observer]:
+                self._scheduled.discard(observer)
+                self._condition.notify_all()
+                return
+        self._executor.submit(self._deliver, observer)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until all queued notifications have been delivered.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if all notifications were delivered, false if the timeout expired.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._scheduled, timeout)
+
+    def stats(self) -> DispatchStats:
+        """Get the dispatch counters.
+
+        Returns:
+            DispatchStats: Current queue depth, and counters since the creation of the dispatcher.
+        """
+        with self._condition:
+            return DispatchStats(
+                queue_depth=self._queue_depth,
+                max_queue_depth=self._max_queue_depth,
+                dispatched=self._dispatched,
+                dropped=self._dropped,
+                mean_latency=self._total_latency / self._dispatched if self._dispatched else 0.0,
+                max_latency=self._max_latency,
+            )
+
+    def stop(self) -> None:
+        """Stop the workers once all queued notifications have been delivered."""
+        self.flush()
+        self._executor.shutdown()
+
+
+observer_dispatcher = ObserverDispatcher()
+
+
 class ExperimentEventHandler:
     """ExperimentEventHandler
     """
-    def __init__(self) -> None:
+    def __init__(self, dispatcher: ObserverDispatcher = None) -> None:
         self._experiment_observers = []
+        self._dispatcher = dispatcher if dispatcher is not None else observer_dispatcher
 
     def add_experiment_observer(self, observer: Callable) -> None:
         self._experiment_observers.append(observer)
 
     def notify_observers(self, param) -> None:
+        # Observers run later on the dispatcher: they get the state at the time of the notification.
+        param = param.snapshot()
         for observer in self._experiment_observers:
-            observer(param)
+            self._dispatcher.post(observer, param)
 
 
 class InstrumentsDetectedEventHandler:
     """InstrumentsDetectedEventHandler
     """
-    def __init__(self) -> None:
+    def __init__(self, dispatcher: ObserverDispatcher = None) -> None:
         self._inst_detected_observers = []
+        self._dispatcher = dispatcher if dispatcher is not None else observer_dispatcher
 
     def add_experiment_observer(self, observer: Callable) -> None:
         self._inst_detected_observers.append(observer)
 
     def notify_observers(self) -> None:
         for observer in self._inst_detected_observers:
-            observer()
+            self._dispatcher.post(observer)
 
 
 @dataclass
@@ -202,6 +339,136 @@ class ExperimentStatus(Enum):
     BUSY = 3
 
 
+class ExperimentEventType(Enum):
+    """ExperimentEventType: events fired by ASTRA for a given experiment.
+    """
+    READY = 0
+    READ = 1
+    WRITE = 2
+    RUN = 3
+    CLOSED = 4
+    PREPARING_FOR_COLLECTION = 5
+    WAITING_FOR_AUTO_INJECT = 6
+    COLLECTION_STARTED = 7
+    COLLECTION_ABORTED = 8
+    COLLECTION_FINISHED = 9
+
+
+class Snapshot:
+    """Immutable, slotted view of a value. Snapshots are shared: a new one is only
+    created for the parts of a value that changed since the previous snapshot.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values) -> None:
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class SampleSnapshot(Snapshot):
+    """Immutable SampleInfo."""
+    __slots__ = ("name", "description", "dndc", "a2", "uvExtinction", "concentration")
+
+    @classmethod
+    def of(cls, sample: SampleInfo, previous: "SampleSnapshot" = None) -> "SampleSnapshot":
+        if previous is not None and previous.matches(sample):
+            return previous
+        return cls(**{name: getattr(sample, name) for name in cls.__slots__})
+
+    def matches(self, sample: SampleInfo) -> bool:
+        return all(getattr(self, name) == getattr(sample, name) for name in self.__slots__)
+
+
+class ExperimentDataSnapshot(Snapshot):
+    """Immutable ExperimentData."""
+    __slots__ = ("description", "collection_duration", "flow_rate", "injected_volume", "sample")
+
+    @classmethod
+    def of(cls, data: ExperimentData, previous: "ExperimentDataSnapshot" = None) -> "ExperimentDataSnapshot":
+        if previous is not None and previous.matches(data):
+            return previous
+        return cls(
+            description=data.description,
+            collection_duration=data.collection_duration,
+            flow_rate=data.flow_rate,
+            injected_volume=data.injected_volume,
+            sample=SampleSnapshot.of(data.sample, previous.sample if previous is not None else None),
+        )
+
+    def matches(self, data: ExperimentData) -> bool:
+        return (
+            self.description == data.description
+            and self.collection_duration == data.collection_duration
+            and self.flow_rate == data.flow_rate
+            and self.injected_volume == data.injected_volume
+            and self.sample.matches(data.sample)
+        )
+
+
+class ExperimentSnapshot(Snapshot):
+    """Immutable view of an Experiment, with the same read-only attributes."""
+    __slots__ = ("id", "name", "status", "has_data", "data")
+
+    @classmethod
+    def of(cls, experiment: "Experiment", previous: "ExperimentSnapshot" = None) -> "ExperimentSnapshot":
+        if previous is not None and previous.matches(experiment):
+            return previous
+        return cls(
+            id=experiment.id,
+            name=experiment.name,
+            status=experiment.status,
+            has_data=experiment.has_data,
+            data=ExperimentDataSnapshot.of(experiment._data, previous.data if previous is not None else None),
+        )
+
+    def matches(self, experiment: "Experiment") -> bool:
+        return (
+            self.id == experiment.id
+            and self.name == experiment.name
+            and self.status == experiment.status
+            and self.has_data == experiment.has_data
+            and self.data.matches(experiment._data)
+        )
+
+    @property
+    def description(self) -> str:
+        return self.data.description
+
+    @property
+    def collection_duration(self) -> float:
+        return self.data.collection_duration
+
+    @property
+    def flow_rate(self) -> float:
+        return self.data.flow_rate
+
+    @property
+    def injected_volume(self) -> float:
+        return self.data.injected_volume
+
+    @property
+    def sample(self) -> SampleSnapshot:
+        return self.data.sample
+
+
 class Experiment:
     """Experiment wrapper: although all experiment operations can be performed through
     the AstraAdmin singleton, this class wraps calls to get/set various properties,
@@ -211,6 +478,7 @@ class Experiment:
     _tolerance = 1e-6
     _synchronized_data: ExperimentData
     _data: ExperimentData
+    _snapshot: ExperimentSnapshot = None
 
     def __init__(self, experiment_id: int) -> None:
         """Constructor: retrieve experiment name and initialize data.
@@ -251,39 +519,733 @@ class Experiment:
             )
         )
 
-    def read(self) -> None:
-        """Get experiment settings from ASTRA."""
+    def read(self, names: list[str] = None) -> None:
+        """Get experiment settings from ASTRA. Local changes of the settings read are discarded.
+
+        Args:
+            names (list[str], optional): Settings to read, among "description", "collection_duration",
+                "flow_rate", "injected_volume" and "sample". Defaults to None (all settings).
+        """
         if self.id == 0:
             return
 
-        self._synchronized_data.description = AstraAdmin().get_experiment_description(self.id)
-        self._synchronized_data.collection_duration = AstraAdmin().get_collection_duration(self.id)
-        self._synchronized_data.flow_rate = AstraAdmin().get_pump_flow_rate(self.id)
-        self._synchronized_data.injected_volume = AstraAdmin().get_injected_volume(self.id)
-        self._synchronized_data.sample = AstraAdmin().get_sample(self.id)
-
-        self._data = self._synchronized_data
+        admin = AstraAdmin()
+        getters = {
+            "description": admin.get_experiment_description,
+            "collection_duration": admin.get_collection_duration,
+            "flow_rate": admin.get_pump_flow_rate,
+            "injected_volume": admin.get_injected_volume,
+            "sample": lambda experiment_id: self._copy_sample(admin.get_sample(experiment_id)),
+        }
+        for name in names if names is not None else getters:
+            value = getters[name](self.id)
+            setattr(self._synchronized_data, name, value)
+            setattr(self._data, name, self._copy_sample(value) if name == "sample" else value)
 
     def reset(self) -> None:
         """Reset experiment state to synched state. Synched state will be the
         last applied state, or the initial state.
         """
-        self._data = self._synchronized_data
+        self._data = self._copy_data(self._synchronized_data)
+
+    def snapshot(self) -> ExperimentSnapshot:
+        """Get an immutable view of the experiment. The same snapshot is returned as long as
+        the experiment does not change, and unchanged parts are shared with the previous one.
+
+        Returns:
+            ExperimentSnapshot: Current state of the experiment.
+        """
+        snapshot = ExperimentSnapshot.of(self, self._snapshot)
+        self._snapshot = snapshot
+        return snapshot
+
+    def clone(self) -> "Experiment":
+        """Get a copy of the experiment that can be changed and applied independently.
+
+        Returns:
+            Experiment: Copy of the experiment.
+        """
+        experiment = copy(self)
+        experiment._synchronized_data = self._copy_data(self._synchronized_data)
+        experiment._data = self._copy_data(self._data)
+        return experiment
+
+    def dirty_fields(self) -> list[str]:
+        """Get the settings changed locally since the last synchronization with ASTRA.
+        Floating point values are only considered changed beyond the experiment tolerance.
+
+        Returns:
+            list[str]: Names of the changed settings, sample fields are prefixed with "sample." (e.g. "sample.dndc").
+        """
+        return [name for name in self.field_names() if self._is_dirty(name)]
+
+    def is_dirty(self) -> bool:
+        """Has any setting been changed locally since the last synchronization with ASTRA?
+
+        Returns:
+            bool: True if "apply" has changes to send, false otherwise.
+        """
+        return any(self._is_dirty(name) for name in self.field_names())
+
+    def apply(self) -> bool:
+        """Synch differences in experiment properties with ASTRA, waiting for a single run when possible.
+        Only the settings changed locally are sent and read back.
+
+        Returns:
+            bool: True if all changes were applied, false otherwise.
+        """
+        dirty_fields = self.dirty_fields()
+        if not dirty_fields:
+            return True
+
+        batch = ExperimentParameterBatch(self.id, self._synchronized_data)
+        for name in dirty_fields:
+            batch.set_value(name, self.get_value(name))
+        if not batch.apply():
+            return False
+
+        self._synchronized_data = self._copy_data(self._data)
+        return True
+
+    def synchronize(self, name: str, value) -> None:
+        """Record a value known to be set in ASTRA, e.g. by an AstraAdmin setter. The local value
+        is updated as well unless it was changed locally.
+
+        Args:
+            name (str): Name of the setting, as returned by "dirty_fields".
+            value (_type_): Value of the setting in ASTRA.
+        """
+        if not self._is_dirty(name):
+            self._set_value(self._data, name, value)
+        self._set_value(self._synchronized_data, name, value)
+
+    def get_value(self, name: str):
+        """Get the local value of a setting.
+
+        Args:
+            name (str): Name of the setting, as returned by "dirty_fields".
+
+        Returns:
+            _type_: Local value of the setting.
+        """
+        return self._get_value(self._data, name)
+
+    @classmethod
+    def field_names(cls) -> list[str]:
+        """Get the names of all settings.
+
+        Returns:
+            list[str]: Names of the settings, sample fields are prefixed with "sample.".
+        """
+        return ["description", "collection_duration", "flow_rate", "injected_volume"] + [
+            f"sample.{field.name}" for field in fields(SampleInfo)
+        ]
+
+    def _is_dirty(self, name: str) -> bool:
+        value = self._get_value(self._data, name)
+        synchronized_value = self._get_value(self._synchronized_data, name)
+        if isinstance(value, float) and isinstance(synchronized_value, (int, float)):
+            return abs(value - synchronized_value) > self._tolerance
+        return value != synchronized_value
+
+    @staticmethod
+    def _get_value(data: ExperimentData, name: str):
+        if name.startswith("sample."):
+            return getattr(data.sample, name[len("sample."):])
+        return getattr(data, name)
+
+    @staticmethod
+    def _set_value(data: ExperimentData, name: str, value) -> None:
+        if name.startswith("sample."):
+            setattr(data.sample, name[len("sample."):], value)
+        elif name == "sample":
+            data.sample = Experiment._copy_sample(value)
+        else:
+            setattr(data, name, value)
+
+    @property
+    def description(self) -> str:
+        return self._data.description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._data.description = value
+
+    @property
+    def collection_duration(self) -> float:
+        return self._data.collection_duration
+
+    @collection_duration.setter
+    def collection_duration(self, value: float) -> None:
+        self._data.collection_duration = value
+
+    @property
+    def flow_rate(self) -> float:
+        return self._data.flow_rate
+
+    @flow_rate.setter
+    def flow_rate(self, value: float) -> None:
+        self._data.flow_rate = value
+
+    @property
+    def injected_volume(self) -> float:
+        return self._data.injected_volume
+
+    @injected_volume.setter
+    def injected_volume(self, value: float) -> None:
+        self._data.injected_volume = value
+
+    @property
+    def sample(self) -> SampleInfo:
+        return self._data.sample
+
+    @sample.setter
+    def sample(self, value: SampleInfo) -> None:
+        self._data.sample = value
+
+    @staticmethod
+    def _copy_sample(sample: SampleInfo) -> SampleInfo:
+        # The sample returned by ASTRA is a COM record, it is copied field by field.
+        return SampleInfo(**{field.name: getattr(sample, field.name) for field in fields(SampleInfo)})
+
+    @staticmethod
+    def _copy_data(data: ExperimentData) -> ExperimentData:
+        return replace(data, sample=Experiment._copy_sample(data.sample))
+
+
+class ExperimentParameterBatch:
+    """Collect parameter changes of an experiment and push them to ASTRA in one go.
+
+    Every setter that changes the sample, injected volume or flow rate makes ASTRA run the
+    experiment again, and the next setter fails while the experiment is running. The batch
+    only sends values that differ from the last synchronized state, merges all sample
+    fields into a single SetSample call, and only waits for a run before the next setter
+    that needs it and once at the end. Description and collection duration do not cause a run.
+    """
+
+    _tolerance = Experiment._tolerance
+
+    def __init__(self, experiment_id: int, synchronized_data: ExperimentData = None) -> None:
+        """Constructor.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            synchronized_data (ExperimentData, optional): State known to ASTRA, unchanged values are not sent.
+                Defaults to None (state of the open experiment, or send all values if it is unknown).
+        """
+        self.experiment_id = experiment_id
+        self._synchronized_data = synchronized_data
+        self._changes: dict[str, object] = {}
+        self._sample_changes: dict[str, object] = {}
+        self._experiment_run: Future = None
+
+    def set_description(self, description: str) -> "ExperimentParameterBatch":
+        self._changes["description"] = description
+        return self
+
+    def set_collection_duration(self, duration: float) -> "ExperimentParameterBatch":
+        self._changes["collection_duration"] = duration
+        return self
+
+    def set_pump_flow_rate(self, flow_rate: float) -> "ExperimentParameterBatch":
+        self._changes["flow_rate"] = flow_rate
+        return self
+
+    def set_injected_volume(self, injected_volume: float) -> "ExperimentParameterBatch":
+        self._changes["injected_volume"] = injected_volume
+        return self
+
+    def set_sample(self, sample: SampleInfo) -> "ExperimentParameterBatch":
+        for field in fields(SampleInfo):
+            self._sample_changes[field.name] = getattr(sample, field.name)
+        return self
+
+    def set_sample_name(self, name: str) -> "ExperimentParameterBatch":
+        self._sample_changes["name"] = name
+        return self
+
+    def set_sample_description(self, description: str) -> "ExperimentParameterBatch":
+        self._sample_changes["description"] = description
+        return self
+
+    def set_sample_dndc(self, dndc: float) -> "ExperimentParameterBatch":
+        self._sample_changes["dndc"] = dndc
+        return self
+
+    def set_sample_a2(self, a2: float) -> "ExperimentParameterBatch":
+        self._sample_changes["a2"] = a2
+        return self
+
+    def set_sample_uv_extinction(self, uv_extinction: float) -> "ExperimentParameterBatch":
+        self._sample_changes["uvExtinction"] = uv_extinction
+        return self
+
+    def set_sample_concentration(self, concentration: float) -> "ExperimentParameterBatch":
+        self._sample_changes["concentration"] = concentration
+        return self
+
+    def set_value(self, name: str, value) -> "ExperimentParameterBatch":
+        """Set a parameter by name.
+
+        Args:
+            name (str): Name of the parameter, as returned by "Experiment.dirty_fields".
+            value (_type_): Value of the parameter.
+
+        Returns:
+            ExperimentParameterBatch: This batch.
+        """
+        if name.startswith("sample."):
+            self._sample_changes[name[len("sample."):]] = value
+        elif name == "sample":
+            self.set_sample(value)
+        else:
+            self._changes[name] = value
+        return self
+
+    def apply(self) -> bool:
+        """Push the changed parameters to ASTRA and wait for the experiment to be run.
+
+        Returns:
+            bool: True if all changes were applied, false otherwise.
+        """
+        admin = AstraAdmin()
+        experiment_id = self.experiment_id
+        synchronized_data = self._synchronized_data
+        if synchronized_data is None:
+            experiment = admin.get_internal_experiment(experiment_id)
+            if experiment is not None:
+                synchronized_data = experiment._synchronized_data
+
+        changes = self._changes
+        sample_changes = self._sample_changes
+        if synchronized_data is not None:
+            changes = {
+                name: value for name, value in changes.items()
+                if self._differs(getattr(synchronized_data, name), value)
+            }
+            sample_changes = {
+                name: value for name, value in sample_changes.items()
+                if self._differs(getattr(synchronized_data.sample, name), value)
+            }
+        if not changes and not sample_changes:
+            return True
+
+        # Changes are refused while the experiment is running.
+        experiment_run = admin.event_router.arm(experiment_id, ExperimentEventType.RUN)
+        if admin.is_running(experiment_id):
+            admin.wait_future(experiment_run)
+        else:
+            experiment_run.cancel()
+
+        success = True
+        if "description" in changes:
+            success &= admin.set_experiment_description(experiment_id, changes["description"])
+        if "collection_duration" in changes:
+            success &= admin.set_collection_duration(experiment_id, changes["collection_duration"])
+        if sample_changes:
+            # All sample fields are sent at once, the ones that did not change are taken from the current sample.
+            current_sample = synchronized_data.sample if synchronized_data is not None else admin.get_sample(experiment_id)
+            sample = SampleInfo(**{field.name: getattr(current_sample, field.name) for field in fields(SampleInfo)})
+            sample = replace(sample, **sample_changes)
+            success &= self._execute_and_run(lambda: admin.astra_com.SetSample(experiment_id, sample))
+        if "injected_volume" in changes:
+            success &= self._execute_and_run(
+                lambda: admin.astra_com.SetInjectedVolume(experiment_id, changes["injected_volume"])
+            )
+        if "flow_rate" in changes:
+            success &= self._execute_and_run(lambda: admin.astra_com.SetPumpFlowRate(experiment_id, changes["flow_rate"]))
+
+        if self._experiment_run is not None:
+            admin.wait_future(self._experiment_run)
+            self._experiment_run = None
+
+        if admin.get_internal_experiment(experiment_id) is not None:
+            # Read back the settings that were sent only.
+            admin.refresh_experiment(experiment_id, list(changes) + (["sample"] if sample_changes else []))
+        return success
+
+    def _execute_and_run(self, action: Callable) -> bool:
+        # Wait for the run triggered by the previous setter, then expect the one triggered by this one.
+        admin = AstraAdmin()
+        if self._experiment_run is not None:
+            admin.wait_future(self._experiment_run)
+        self._experiment_run = admin.event_router.arm(self.experiment_id, ExperimentEventType.RUN)
+        if not admin.try_execute(action):
+            self._experiment_run.cancel()
+            self._experiment_run = None
+            return False
+        return True
+
+    def _differs(self, synchronized_value, value) -> bool:
+        if isinstance(value, float) and isinstance(synchronized_value, (int, float)):
+            return abs(value - synchronized_value) > self._tolerance
+        return value != synchronized_value
+
+
+class AstraSignal:
+    """Flag set by the AstraEvents handlers and awaited by the AstraAdmin wait methods.
+
+    It behaves like `threading.Event`, but waiting on a thread owning COM objects dispatches
+    COM messages through `CoWaitForMultipleHandles` on a Win32 event that is signaled together
+    with the flag. The waiter is therefore woken up as soon as the flag is set, and messages
+    are only pumped while waiting.
+    """
+
+    # Threads owning COM objects, on which waiting dispatches COM messages. Other threads only wait on the flag.
+    pumping_threads: set[int] = set()
+
+    # Maximum time spent in a single CoWaitForMultipleHandles call, so that a waiting thread stays interruptible.
+    wait_slice = 0.5
+
+    # Returned by CoWaitForMultipleHandles when the timeout elapsed before the handle was signaled.
+    RPC_S_CALLPENDING = -2147417835
+
+    def __init__(self) -> None:
+        self._flag = Event()
+        self._handle = None
+        if backend.pumps_messages:
+            self._handle = windll.kernel32.CreateEventW(None, True, False, None)
+            self._handles = (c_void_p * 1)(self._handle)
+
+    def __del__(self) -> None:
+        if self._handle:
+            windll.kernel32.CloseHandle(self._handle)
+            self._handle = None
+
+    def is_set(self) -> bool:
+        return self._flag.is_set()
+
+    def set(self) -> None:
+        self._flag.set()
+        if self._handle:
+            windll.kernel32.SetEvent(self._handle)
+
+    def clear(self) -> None:
+        self._flag.clear()
+        if self._handle:
+            windll.kernel32.ResetEvent(self._handle)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait until the flag is set, dispatching COM messages in the meantime.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the flag is set, false if the timeout expired.
+        """
+        if get_ident() not in self.pumping_threads:
+            return self._flag.wait(timeout)
+
+        deadline = None if timeout is None else monotonic() + timeout
+        while not self._flag.is_set():
+            wait_time = self.wait_slice
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - monotonic())
+                if wait_time <= 0:
+                    return False
+            try:
+                oledll.ole32.CoWaitForMultipleHandles(
+                    0, int(wait_time * 1000), len(self._handles), self._handles, byref(c_ulong())
+                )
+            except OSError as ex:
+                if ex.winerror != self.RPC_S_CALLPENDING:
+                    raise
+        return True
+
+
+class ComThread:
+    """Dedicated single-threaded apartment (STA) owning the ASTRA COM objects.
+
+    Calls made from other threads are queued and executed on this thread one at a time,
+    and COM messages, hence ASTRA events, are dispatched while it is idle.
+    """
+
+    def __init__(self, name: str = "AstraCom") -> None:
+        self._requests = queue.SimpleQueue()
+        self._wakeup = AstraSignal()
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        backend.initialize()
+        if backend.pumps_messages:
+            AstraSignal.pumping_threads.add(get_ident())
+        try:
+            while True:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    # Dispatch COM messages until a new request is queued.
+                    self._wakeup.wait()
+                    self._wakeup.clear()
+                    continue
+
+                if request is None:
+                    break
+                func, future = request
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func())
+                except BaseException as ex:
+                    future.set_exception(ex)
+        finally:
+            AstraSignal.pumping_threads.discard(get_ident())
+            backend.uninitialize()
+
+    def is_current(self) -> bool:
+        """Is the caller running on this thread?
+
+        Returns:
+            bool: True when called from the COM thread, false otherwise.
+        """
+        return get_ident() == self._thread.ident
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Queue a call to be executed on the COM thread.
+
+        Args:
+            func (Callable): Function to execute.
+            args: Arguments of "func".
+
+        Returns:
+            Future: Future holding the return value or the exception raised by "func".
+        """
+        future = Future()
+        self._requests.put((partial(func, *args), future))
+        self._wakeup.set()
+        return future
+
+    def call(self, func: Callable, *args):
+        """Execute a call on the COM thread and wait for its completion.
+
+        Args:
+            func (Callable): Function to execute.
+            args: Arguments of "func".
+
+        Returns:
+            _type_: Value returned by "func".
+        """
+        if self.is_current():
+            return func(*args)
+        return self.submit(func, *args).result()
+
+    def create_object(self, prog_id: str) -> "ComThreadProxy":
+        """Create a COM object owned by this thread.
+
+        Args:
+            prog_id (str): ProgID of the COM class.
+
+        Returns:
+            ComThreadProxy: Proxy forwarding calls on the COM object to this thread.
+        """
+        return ComThreadProxy(self, self.call(backend.create_object, prog_id))
+
+    def get_events(self, source: "ComThreadProxy", sink):
+        """Connect "sink" to the events of a COM object owned by this thread.
+
+        Args:
+            source (ComThreadProxy): COM object firing events.
+            sink (_type_): Object implementing the event handlers.
+
+        Returns:
+            _type_: Connection to keep alive as long as events should be received.
+        """
+        if not backend.pumps_messages:
+            sink = ComThreadSink(self, sink)
+        return self.call(backend.get_events, source.com_object, sink)
+
+    def stop(self) -> None:
+        """Stop the thread once all queued calls have been executed."""
+        self._requests.put(None)
+        self._wakeup.set()
+
+
+class ComThreadSink:
+    """Queue the events fired from any thread on the ComThread, as COM does for the objects of
+    a single-threaded apartment. Used with backends that do not dispatch COM messages."""
+
+    def __init__(self, com_thread: ComThread, sink) -> None:
+        self.com_thread = com_thread
+        self.sink = sink
+
+    def __getattr__(self, name: str):
+        handler = getattr(self.sink, name)
+        return partial(self.com_thread.submit, handler)
+
+
+class ComThreadProxy:
+    """Forward attribute access and method calls on a COM object to the ComThread owning it,
+    so that it can be used from any thread."""
+
+    def __init__(self, com_thread: ComThread, com_object) -> None:
+        self.com_thread = com_thread
+        self.com_object = com_object
+        self._methods = {}
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+
+        attribute = self.com_thread.call(getattr, self.com_object, name)
+        if not callable(attribute):
+            # Property: value has to be read again on each access.
+            return attribute
+        method = partial(self.com_thread.call, attribute)
+        self._methods[name] = method
+        return method
+
+
+class EventDispatcher:
+    """Single worker thread running the AstraEvents handlers one at a time, in the order
+    the events were fired. The handlers update the experiments under the lock and notify
+    observers, which must not happen on the COM thread that receives the events.
+    """
+
+    def __init__(self, name: str = "AstraEvents") -> None:
+        self._handlers = queue.SimpleQueue()
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            handler = self._handlers.get()
+            if handler is None:
+                break
+            try:
+                handler()
+            except Exception:
+                # A failing handler or observer must not stop the delivery of the next events.
+                traceback.print_exc()
+
+    def post(self, handler: Callable) -> None:
+        """Queue an event handler.
+
+        Args:
+            handler (Callable): Handler to run on the dispatch thread.
+        """
+        self._handlers.put(handler)
+
+    def stop(self) -> None:
+        """Stop the thread once all queued handlers have been run."""
+        self._handlers.put(None)
+
+
+class ExperimentEventRouter:
+    """Route the events fired by ASTRA to the operations waiting for them, using the
+    experiment ID passed to every AstraEvents callback. Each call to `expect` returns
+    a future completed by the next event of that type for that experiment, so that
+    several experiments can be processed at once without consuming each other's events.
+
+    An event that arrives while nobody expects it is kept until it is claimed by `expect`,
+    discarded, or the experiment is closed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._pending: dict[tuple[int, ExperimentEventType], list[Future]] = {}
+        self._unclaimed: set[tuple[int, ExperimentEventType]] = set()
+
+    def expect(self, experiment_id: int, event_type: ExperimentEventType) -> Future:
+        """Get a future completed by the next event "event_type" of experiment with ID "experiment_id".
+        If such an event was already received and not claimed yet, the future is already completed.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            event_type (ExperimentEventType): Event to wait for.
+
+        Returns:
+            Future: Future whose result is the experiment ID.
+        """
+        key = (experiment_id, event_type)
+        future = Future()
+        with self._lock:
+            if key in self._unclaimed:
+                self._unclaimed.discard(key)
+                future.set_result(experiment_id)
+            else:
+                self._pending.setdefault(key, []).append(future)
+        return future
+
+    def arm(self, experiment_id: int, event_type: ExperimentEventType) -> Future:
+        """Same as `expect`, but ignore events received before the call. To be used right before
+        the operation that will trigger the event.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            event_type (ExperimentEventType): Event to wait for.
+
+        Returns:
+            Future: Future whose result is the experiment ID.
+        """
+        self.discard(experiment_id, event_type)
+        return self.expect(experiment_id, event_type)
+
+    def dispatch(self, experiment_id: int, event_type: ExperimentEventType) -> None:
+        """Complete all futures waiting for an event. Called by AstraEvents.
+
+        Args:
+            experiment_id (int): ID of experiment that triggered the event.
+            event_type (ExperimentEventType): Event that was triggered.
+        """
+        key = (experiment_id, event_type)
+        with self._lock:
+            futures = [
+                future for future in self._pending.pop(key, [])
+                if future.set_running_or_notify_cancel()
+            ]
+            if not futures:
+                self._unclaimed.add(key)
+        for future in futures:
+            future.set_result(experiment_id)
+
+    def discard(self, experiment_id: int, event_type: ExperimentEventType = None) -> None:
+        """Discard unclaimed events of an experiment.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            event_type (ExperimentEventType, optional): Event to discard. Defaults to None (all events).
+        """
+        with self._lock:
+            self._unclaimed = {
+                key for key in self._unclaimed
+                if key[0] != experiment_id or (event_type is not None and key[1] != event_type)
+            }
+
+    def forget(self, experiment_id: int) -> None:
+        """Drop all state kept for a closed experiment, cancelling futures still waiting on it.
+
+        Args:
+            experiment_id (int): ID of experiment.
+        """
+        with self._lock:
+            self._unclaimed = {key for key in self._unclaimed if key[0] != experiment_id}
+            keys = [key for key in self._pending if key[0] == experiment_id]
+            futures = [future for key in keys for future in self._pending.pop(key)]
+        for future in futures:
+            future.cancel()
 
 
 class AstraEvents:
     """_summary_"""
 
-    ready_event = Event()
-    read_event = Event()
-    write_event = Event()
-    run_event = Event()
-    closed_event = Event()
-    instrument_detected_signal = Event()
-    preparing_for_collection_event = Event()
-    waiting_for_auto_inject_event = Event()
-    collection_started_event = Event()
-    collection_finished_event = Event()
+    # Handlers are run in order on a single thread, the COM thread only queues them.
+    dispatcher = EventDispatcher()
+
+    ready_event = AstraSignal()
+    read_event = AstraSignal()
+    write_event = AstraSignal()
+    run_event = AstraSignal()
+    closed_event = AstraSignal()
+    instrument_detected_signal = AstraSignal()
+    preparing_for_collection_event = AstraSignal()
+    waiting_for_auto_inject_event = AstraSignal()
+    collection_started_event = AstraSignal()
+    collection_finished_event = AstraSignal()
     """
     Note: The list of events need to have the exact same name,
           Changing the names to match Python's snake case convention
@@ -296,14 +1258,19 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that is closed.
         """
-        with rlock:
-            if experiment_id not in AstraAdmin().closing_experiments:
-                assert False, "Experiment should exist in a callback."
-            self.closed_event.set()
-            AstraAdmin().experiment_closed.notify_observers(
-                AstraAdmin().closing_experiments[experiment_id]
-            )
-            AstraAdmin().closing_experiments.pop(experiment_id)
+        def on_experiment_closed():
+            with rlock:
+                if experiment_id not in AstraAdmin().closing_experiments:
+                    assert False, "Experiment should exist in a callback."
+                self.closed_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.CLOSED)
+                AstraAdmin().experiment_closed.notify_observers(
+                    AstraAdmin().closing_experiments[experiment_id]
+                )
+                AstraAdmin().closing_experiments.pop(experiment_id)
+                AstraAdmin.event_router.forget(experiment_id)
+
+        self.dispatcher.post(on_experiment_closed)
 
     def _IAstraEvents_ExperimentReady(self, experiment_id: int) -> None:
         """Event fired when experiment is ready.
@@ -315,18 +1282,21 @@ class AstraEvents:
             with rlock:
                 experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
                 if experiment is None:
-                    assert (
-                        experiment_id in AstraAdmin().closing_experiments
-                    ), "Experiment should exist in a callback."
+                    if experiment_id not in AstraAdmin().closing_experiments:
+                        # Fired before "register_experiment" added the wrapper, as ASTRA may deliver events
+                        # while the call creating the experiment is in progress. The router keeps it for the waiter.
+                        self.ready_event.set()
+                        AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.READY)
                     return
 
                 experiment.status = ExperimentStatus.READY
 
                 self.ready_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.READY)
 
                 AstraAdmin().experiment_status_changed.notify_observers(experiment)
 
-        Thread(target=on_experiment_ready).start()
+        self.dispatcher.post(on_experiment_ready)
 
     def _IAstraEvents_PreparingForCollection(self, experiment_id: int) -> None:
         """Event fired when experiment is preparing for collection.
@@ -334,19 +1304,23 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that is preparing for collection.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_preparing_for_collection():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
 
-            experiment.status = ExperimentStatus.BUSY
+                experiment.status = ExperimentStatus.BUSY
 
-            self.preparing_for_collection_event.set()
+                self.preparing_for_collection_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.PREPARING_FOR_COLLECTION)
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
+
+        self.dispatcher.post(on_preparing_for_collection)
 
     def _IAstraEvents_WaitingForAutoInject(self, experiment_id: int) -> None:
         """Event fired when experiment is waiting for auto inject.
@@ -354,19 +1328,23 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that is waiting for auto inject.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_waiting_for_auto_inject():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
 
-            experiment.status = ExperimentStatus.WAITING_FOR_AUTO_INJECT
+                experiment.status = ExperimentStatus.WAITING_FOR_AUTO_INJECT
 
-            self.waiting_for_auto_inject_event.set()
+                self.waiting_for_auto_inject_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.WAITING_FOR_AUTO_INJECT)
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
+
+        self.dispatcher.post(on_waiting_for_auto_inject)
 
     def _IAstraEvents_CollectionStarted(self, experiment_id: int) -> None:
         """Event fired when experiment collection started.
@@ -374,20 +1352,24 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that a collection has started.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_collection_started():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
 
-            experiment.status = ExperimentStatus.BUSY
-            experiment.has_data = True
+                experiment.status = ExperimentStatus.BUSY
+                experiment.has_data = True
+
+                self.collection_started_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.COLLECTION_STARTED)
 
-            self.collection_started_event.set()
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+        self.dispatcher.post(on_collection_started)
 
     def _IAstraEvents_CollectionAborted(self, experiment_id: int) -> None:
         """Event fired when experiment collection is aborted.
@@ -395,19 +1377,24 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that a collection is aborted.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_collection_aborted():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
 
-            experiment.status = ExperimentStatus.READY
+                experiment.status = ExperimentStatus.READY
 
-            self.collection_finished_event.set()
+                self.collection_finished_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.COLLECTION_ABORTED)
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.COLLECTION_FINISHED)
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
+
+        self.dispatcher.post(on_collection_aborted)
 
     def _IAstraEvents_CollectionFinished(self, experiment_id: int) -> None:
         """Event fired when experiment collection is finished.
@@ -415,27 +1402,34 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that a collection is finished.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_collection_finished():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
 
-            experiment.status = ExperimentStatus.READY
+                experiment.status = ExperimentStatus.READY
+
+                self.collection_finished_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.COLLECTION_FINISHED)
 
-            self.collection_finished_event.set()
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+        self.dispatcher.post(on_collection_finished)
 
     def _IAstraEvents_InstrumentDetectionCompleted(self) -> None:
         """Event fired when Astra is done detecting instruments
         """
-        with rlock:
-            self.instrument_detected_signal.set()
+        def on_instrument_detection_completed():
+            with rlock:
+                self.instrument_detected_signal.set()
 
-            AstraAdmin().instrument_detected.notify_observers()
+                AstraAdmin().instrument_detected.notify_observers()
+
+        self.dispatcher.post(on_instrument_detection_completed)
 
     def _IAstraEvents_ExperimentRun(self, experiment_id: int) -> None:
         """Event fired when experiment is run.
@@ -447,18 +1441,21 @@ class AstraEvents:
             with rlock:
                 experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
                 if experiment is None:
-                    assert (
-                        experiment_id in AstraAdmin().closing_experiments
-                    ), "Experiment should exist in a callback."
+                    if experiment_id not in AstraAdmin().closing_experiments:
+                        # Fired before "register_experiment" added the wrapper, as ASTRA may deliver events
+                        # while the call creating the experiment is in progress. The router keeps it for the waiter.
+                        self.run_event.set()
+                        AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.RUN)
                     return
 
                 experiment.status = ExperimentStatus.READY
 
                 self.run_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.RUN)
 
                 AstraAdmin().experiment_status_changed.notify_observers(experiment)
 
-        Thread(target=on_experiment_run).start()
+        self.dispatcher.post(on_experiment_run)
 
     def _IAstraEvents_ExperimentRead(self, experiment_id: int) -> None:
         """Event fired when experiment is read.
@@ -470,18 +1467,21 @@ class AstraEvents:
             with rlock:
                 experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
                 if experiment is None:
-                    assert (
-                        experiment_id in AstraAdmin().closing_experiments
-                    ), "Experiment should exist in a callback."
+                    if experiment_id not in AstraAdmin().closing_experiments:
+                        # Fired before "register_experiment" added the wrapper, as ASTRA may deliver events
+                        # while the call creating the experiment is in progress. The router keeps it for the waiter.
+                        self.read_event.set()
+                        AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.READ)
                     return
 
                 experiment.status = ExperimentStatus.READY
 
                 self.read_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.READ)
 
                 AstraAdmin().experiment_status_changed.notify_observers(experiment)
 
-        Thread(target=on_experiment_read).start()
+        self.dispatcher.post(on_experiment_read)
 
     def _IAstraEvents_ExperimentWrite(self, experiment_id: int) -> None:
         """Event fired when experiment is write.
@@ -489,19 +1489,52 @@ class AstraEvents:
         Args:
             experiment_id (int): The experiment that is write.
         """
-        with rlock:
-            experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
-            if experiment is None:
-                assert (
-                    experiment_id in AstraAdmin().closing_experiments
-                ), "Experiment should exist in a callback."
-                return
+        def on_experiment_write():
+            with rlock:
+                experiment: Experiment = AstraAdmin().get_internal_experiment(experiment_id)
+                if experiment is None:
+                    assert (
+                        experiment_id in AstraAdmin().closing_experiments
+                    ), "Experiment should exist in a callback."
+                    return
+
+                experiment.status = ExperimentStatus.READY
+
+                self.write_event.set()
+                AstraAdmin.event_router.dispatch(experiment_id, ExperimentEventType.WRITE)
 
-            experiment.status = ExperimentStatus.READY
+                AstraAdmin().experiment_status_changed.notify_observers(experiment)
+
+        self.dispatcher.post(on_experiment_write)
+
+
+class AstraVersion(tuple):
+    """Version of ASTRA, e.g. AstraVersion("8.2.0.105"), compared number by number.
+    """
+
+    def __new__(cls, version: str):
+        instance = super().__new__(cls, (int(number) for number in re.findall(r"\d+", version)))
+        instance.vstring = version
+        return instance
 
-            self.write_event.set()
+    def __str__(self) -> str:
+        return self.vstring
 
-            AstraAdmin().experiment_status_changed.notify_observers(experiment)
+    def __repr__(self) -> str:
+        return f"AstraVersion('{self.vstring}')"
+
+
+class Connected:
+    """Class attribute of AstraAdmin set by "AstraAdmin.connect", which is called on first access.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner: type):
+        owner.connect()
+        # "connect" replaced this descriptor with the actual value.
+        return getattr(owner if instance is None else instance, self.name)
 
 
 class AstraAdmin:
@@ -514,26 +1547,40 @@ class AstraAdmin:
         _type_: _description_
     """
 
-    MinAstraVersion = LooseVersion("8.2.0.0")
-    Version_8_2_0_105 = LooseVersion("8.2.0.105")
+    MinAstraVersion = AstraVersion("8.2.0.0")
+    Version_8_2_0_105 = AstraVersion("8.2.0.105")
 
     should_show_error_message_box = True
+    # Last error of "try_get", "try_execute" or "try_execute_and_wait_experiment_run", when displayed rather than raised.
+    last_error: AstraError = None
 
     experiment_closed = ExperimentEventHandler()
     experiment_status_changed = ExperimentEventHandler()
     instrument_detected = InstrumentsDetectedEventHandler()
+    event_router = ExperimentEventRouter()
+    # Latencies of the calls made through "try_get", "try_execute" and "try_execute_and_wait_experiment_run".
+    call_metrics = MetricsRegistry()
+    # Timeline of the collections, see "astra_trace".
+    tracer = Tracer()
 
     closing_experiments: dict[int, Experiment] = {}
     _experiments: dict[int, Experiment] = {}
+    # Fraction results read by "get_fraction_table", by experiment ID then (start_index, count).
+    _fraction_tables: dict[int, dict[tuple, "FractionTable"]] = {}
 
-    astra_com = comtypes.client.CreateObject("WTC.ASTRA8.Application.1")
+    # All COM objects are created on and called from a dedicated thread, which also receives the ASTRA events.
+    # ASTRA is only started by "connect", on first use of these attributes.
+    com_thread: ComThread = Connected()
+    astra_com = Connected()
     events = AstraEvents()
-    connection = GetEvents(astra_com, events)
-    astra_sp_com = comtypes.client.CreateObject("Wyatt.AstraSP.1")
+    connection = Connected()
+    astra_sp_com = Connected()
+    _connect_lock = Lock()
+    _connected = False
     _entity_id = None
 
     # UvDeviceDetails class (if this ever fail, check uuid for Astra from Astra.idl file)
-    UvDeviceDetails = comtypes.gen._368D43B2_3A78_4EB0_93D1_5339084555E2_0_1_0.UvDeviceDetails
+    UvDeviceDetails = Connected()
 
     IsInstanceAlreadyInitialized = True
 
@@ -550,12 +1597,92 @@ class AstraAdmin:
     def __del__(self) -> None:
         self.dispose()
 
-    def astra_version(self) -> LooseVersion:
-        with rlock:
+    @classmethod
+    def connect(cls, restart: bool = False) -> None:
+        """Start ASTRA and the security pack SDK, and connect to the ASTRA events.
+        Called on first use of the COM objects, calling it beforehand moves the start-up cost to a chosen time.
+
+        Args:
+            restart (bool, optional): Create the COM objects again, e.g. after ASTRA was restarted. Defaults to False.
+        """
+        with cls._connect_lock:
+            if cls._connected and not restart:
+                return
+            com_thread = cls.__dict__["com_thread"] if cls._connected else ComThread()
+            astra_com = None
             try:
-                return LooseVersion(self.astra_com.GetVersion())
-            except:
-                return LooseVersion("0.0.0.0")
+                astra_com = com_thread.create_object("WTC.ASTRA8.Application.1")
+                connection = com_thread.get_events(astra_com, cls.events)
+                astra_sp_com = com_thread.create_object("Wyatt.AstraSP.1")
+                uv_device_details = backend.uv_device_details()
+            except Exception:
+                # Do not leave an ASTRA process behind.
+                if astra_com is not None:
+                    try:
+                        astra_com.RequestQuit()
+                    except Exception:
+                        pass
+                if not cls._connected:
+                    com_thread.stop()
+                raise
+
+            cls.com_thread = com_thread
+            cls.astra_com = astra_com
+            cls.connection = connection
+            cls.astra_sp_com = astra_sp_com
+            cls.UvDeviceDetails = uv_device_details
+            cls._connected = True
+
+    @classmethod
+    def is_connected(cls) -> bool:
+        """Have the COM objects been created yet?
+
+        Returns:
+            bool: True once "connect" succeeded, false otherwise.
+        """
+        return cls._connected
+
+    @classmethod
+    def connected_objects(cls) -> tuple:
+        """Get the objects of the ASTRA instance in use, e.g. to retire it.
+
+        Returns:
+            tuple: COM thread, ASTRA, security pack SDK and event connection, None if not connected yet.
+        """
+        with cls._connect_lock:
+            if not cls._connected:
+                return None
+            return tuple(cls.__dict__[name] for name in ("com_thread", "astra_com", "astra_sp_com", "connection"))
+
+    @classmethod
+    def attach(cls, com_thread: ComThread, astra_com: "ComThreadProxy", astra_sp_com: "ComThreadProxy") -> tuple:
+        """Switch to COM objects created beforehand on their own ComThread, e.g. the ASTRA instance launched by
+        "SdkHelper.recycle_astra", and connect to their events. Experiments opened in the previous instance are not carried over.
+
+        Args:
+            com_thread (ComThread): Thread owning "astra_com" and "astra_sp_com".
+            astra_com (ComThreadProxy): ASTRA.
+            astra_sp_com (ComThreadProxy): Security pack SDK.
+
+        Returns:
+            tuple: Previous COM thread, ASTRA, security pack SDK and event connection, None if not connected yet.
+        """
+        connection = com_thread.get_events(astra_com, cls.events)
+        previous = cls.connected_objects()
+        with cls._connect_lock:
+            cls.com_thread = com_thread
+            cls.astra_com = astra_com
+            cls.connection = connection
+            cls.astra_sp_com = astra_sp_com
+            cls.UvDeviceDetails = backend.uv_device_details()
+            cls._connected = True
+        return previous
+
+    def astra_version(self) -> AstraVersion:
+        try:
+            return AstraVersion(self.astra_com.GetVersion())
+        except:
+            return AstraVersion("0.0.0.0")
 
     def reset_astra(self) -> None:
         with rlock:
@@ -590,77 +1717,197 @@ class AstraAdmin:
         """Quit both Astra and security pack SDK.
         Should be called before a program exit.
         """
-        with rlock:
-            try:
-                self.astra_com.RequestQuit()
-                self.astra_sp_com.RequestQuit()
-            except Exception:
-                # Ignore. It might fail due to lack of licensing when using ASTRA 8.0.x or older.
-                pass
+        if not self.is_connected():
+            return
+        try:
+            self.astra_com.RequestQuit()
+            self.astra_sp_com.RequestQuit()
+        except Exception:
+            # Ignore. It might fail due to lack of licensing when using ASTRA 8.0.x or older.
+            pass
 
 
     def has_instrument_detection_completed(self) -> bool:
         """Have instruments been fully detected yet?
 
         Returns:
-            bool: True when all instruments have been detected, false otherwise.
+            bool: True when all instruments have been detected, false otherwise.
+        """
+        return self.try_get(lambda: self.astra_com.InstrumentsDetected == 1, False)
+
+    def wait_experiment_read(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until experiment is fully read. To be called after loading an experiment.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the experiment was read, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.read_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.READ, timeout)
+
+    def wait_experiment_write(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until experiment is fully written. To be called after saving an experiment.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the experiment was written, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.write_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.WRITE, timeout)
+
+    def wait_experiment_run(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until experiment is fully run. To be called after an operation that will render experiment not ready (e.g. a collection or a run of the experiment).
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the experiment was run, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.run_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.RUN, timeout)
+
+    def wait_for_instruments(self, timeout: float = None) -> bool:
+        """Wait for ASTRA to load all instruments.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if instruments were detected, false if the timeout expired.
+        """
+        if self.has_instrument_detection_completed():
+            return True
+        return self.wait_signal(AstraEvents.instrument_detected_signal, timeout)
+
+    def wait_experiment_closed(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until experiment is fully closed.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the experiment was closed, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.closed_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.CLOSED, timeout)
+
+    def wait_preparing_for_collection(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until collection is fully validated.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the collection was validated, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.preparing_for_collection_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.PREPARING_FOR_COLLECTION, timeout)
+
+    def wait_waiting_for_auto_inject(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until the waiting for auto-inject message is sent.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the message was sent, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.waiting_for_auto_inject_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.WAITING_FOR_AUTO_INJECT, timeout)
+
+    def wait_collection_started(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until collection starts.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the collection started, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.collection_started_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.COLLECTION_STARTED, timeout)
+
+    def wait_collection_finished(self, experiment_id: int = None, timeout: float = None) -> bool:
+        """Wait until collection is finished.
+
+        Args:
+            experiment_id (int, optional): ID of experiment. Defaults to None (any experiment).
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the collection finished, false if the timeout expired.
+        """
+        if experiment_id is None:
+            return self.wait_signal(AstraEvents.collection_finished_event, timeout)
+        return self.wait_experiment_event(experiment_id, ExperimentEventType.COLLECTION_FINISHED, timeout)
+
+    def wait_experiment_event(
+        self, experiment_id: int, event_type: ExperimentEventType, timeout: float = None
+    ) -> bool:
+        """Wait for the next event "event_type" of experiment with ID "experiment_id".
+        Must be called outside of the lock otherwise events cannot be processed.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            event_type (ExperimentEventType): Event to wait for.
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the event was received, false if the timeout expired.
         """
-        return self.try_get(lambda: self.astra_com.InstrumentsDetected == 1)
-
-    def wait_experiment_read(self) -> None:
-        """Wait until experiment is fully read. To be called after loading an experiment."""
-        while not AstraEvents.read_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.read_event.clear()
+        return self.wait_future(self.event_router.expect(experiment_id, event_type), timeout)
 
-    def wait_experiment_write(self) -> None:
-        """Wait until experiment is fully written. To be called after saving an experiment."""
-        while not AstraEvents.write_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.write_event.clear()
-
-    def wait_experiment_run(self) -> None:
-        """Wait until experiment is fully run. To be called after an operation that will render experiment not ready (e.g. a collection or a run of the experiment)."""
-        while not AstraEvents.run_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.run_event.clear()
+    def wait_future(self, future: Future, timeout: float = None) -> bool:
+        """Wait for a future returned by "event_router", dispatching COM messages in the meantime.
+        Must be called outside of the lock otherwise events cannot be processed.
 
-    def wait_for_instruments(self) -> None:
-        """Wait for ASTRA to load all instruments."""
-        if not self.has_instrument_detection_completed():
-            while not AstraEvents.instrument_detected_signal.wait(1.0):
-                PumpEvents(0.1)
-            AstraEvents.instrument_detected_signal.clear()
-
-    def wait_experiment_closed(self) -> None:
-        """Wait until experiment is fully closed."""
-        while not AstraEvents.closed_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.closed_event.clear()
+        Args:
+            future (Future): Future returned by "event_router.expect" or "event_router.arm".
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
 
-    def wait_preparing_for_collection(self) -> None:
-        """Wait until collection is fully validated."""
-        while not AstraEvents.preparing_for_collection_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.preparing_for_collection_event.clear()
+        Returns:
+            bool: True if the event was received, false if the timeout expired or the experiment was closed.
+        """
+        signal = AstraSignal()
+        future.add_done_callback(lambda _: signal.set())
+        if not signal.wait(timeout):
+            future.cancel()
+        return future.done() and not future.cancelled()
 
-    def wait_waiting_for_auto_inject(self) -> None:
-        """Wait until the waiting for auto-inject message is sent."""
-        while not AstraEvents.waiting_for_auto_inject_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.waiting_for_auto_inject_event.clear()
+    def wait_signal(self, signal: AstraSignal, timeout: float = None) -> bool:
+        """Wait for an event signaled by AstraEvents, then reset it so that it can be awaited again.
+        Must be called outside of the lock otherwise events cannot be processed.
 
-    def wait_collection_started(self) -> None:
-        """Wait until collection starts."""
-        while not AstraEvents.collection_started_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.collection_started_event.clear()
+        Args:
+            signal (AstraSignal): One of the AstraEvents signals.
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
 
-    def wait_collection_finished(self) -> None:
-        """Wait until collection is finished."""
-        while not AstraEvents.collection_finished_event.wait(1.0):
-            PumpEvents(0.1)
-        AstraEvents.collection_finished_event.clear()
+        Returns:
+            bool: True if the event was signaled, false if the timeout expired.
+        """
+        if not signal.wait(timeout):
+            return False
+        signal.clear()
+        return True
 
     def collect_data(
         self,
@@ -713,21 +1960,30 @@ class AstraAdmin:
         info = None
         if not request_method_at_end:
             info = method_info
-            self.set_sample(experiment_id, info.sample)
-            self.set_collection_duration(experiment_id, info.duration)
-            self.set_injected_volume(experiment_id, info.injectedVolume)
-            if info.flowRate >= 0:
-                self.set_pump_flow_rate(experiment_id, info.flowRate)
+            with self.tracer.span("apply_parameters", experiment_id):
+                batch = ExperimentParameterBatch(experiment_id)
+                batch.set_sample(info.sample).set_collection_duration(info.duration).set_injected_volume(info.injectedVolume)
+                if info.flowRate >= 0:
+                    batch.set_pump_flow_rate(info.flowRate)
+                batch.apply()
         # Run collection.
+        futures, event_times = self.arm_collection(experiment_id)
+        preparing_for_collection = futures[ExperimentEventType.PREPARING_FOR_COLLECTION]
+        waiting_for_auto_inject = futures[ExperimentEventType.WAITING_FOR_AUTO_INJECT]
+        collection_started = futures[ExperimentEventType.COLLECTION_STARTED]
+        collection_finished = futures[ExperimentEventType.COLLECTION_FINISHED]
+        experiment_run = futures[ExperimentEventType.RUN]
+
         progress_update("Collection starting...")
+        event_times["START_COLLECTION"] = monotonic()
         self.start_collection(experiment_id)
-        self.wait_preparing_for_collection()
+        self.wait_future(preparing_for_collection)
         progress_update("Preparing for collection...")
 
-        self.wait_waiting_for_auto_inject()
+        self.wait_future(waiting_for_auto_inject)
         progress_update("Waiting for auto-inject...")
 
-        self.wait_collection_started()
+        self.wait_future(collection_started)
         progress_update("Starting collecting data...")
 
         # Get the current time to calculate the actual duration of the collection.
@@ -741,44 +1997,70 @@ class AstraAdmin:
             """
             self.set_collection_duration(experiment_id, -1)
 
-        self.wait_collection_finished()
+        self.wait_future(collection_finished)
         # Duration of the collection in minutes.
         duration = (datetime.now() - date).total_seconds() / 60
 
         progress_update("Collection finished.")
 
         progress_update("Post-collection actions...")
-        self.wait_experiment_run()
+        self.wait_future(experiment_run)
+        self.tracer.record_collection(experiment_id, event_times)
 
         if request_method_at_end:
             """
-            Ask for about details on the experiment. Note that all this calls are causing a run
-            therefore we need to wait for the run event after each call before proceeding to the next,
-            otherwise you will get an exception about unable to change a running experiment.
+            Ask for about details on the experiment. Note that setting the sample, injected volume and
+            flow rate are causing a run therefore we need to wait for the run event after each call before
+            proceeding to the next, otherwise you will get an exception about unable to change a running experiment.
+            The batch only sends the values that differ from the current state and takes care of these waits.
+            The collection duration set to -1 above is known to the experiment, so it does not need to be read back.
             """
             info = method_info
-            self.set_sample(experiment_id, info.sample)
-            self.wait_experiment_run()
-            self.set_collection_duration(experiment_id, duration)
-            self.wait_experiment_run()
-            self.set_injected_volume(experiment_id, info.injectedVolume)
-            self.wait_experiment_run()
-            if info.flowRate >= 0:
-                self.set_pump_flow_rate(experiment_id, info.flowRate)
-                self.wait_experiment_run()
+            with self.tracer.span("apply_parameters", experiment_id):
+                batch = ExperimentParameterBatch(experiment_id)
+                batch.set_sample(info.sample).set_collection_duration(duration).set_injected_volume(info.injectedVolume)
+                if info.flowRate >= 0:
+                    batch.set_pump_flow_rate(info.flowRate)
+                batch.apply()
 
             # Save the experiment file.
-            progress_update(f'Saving experiment "{info.ExperimentPath}"...')
-            self.save_experiment(experiment_id, info.experimentPath)
+            progress_update(f'Saving experiment "{info.experimentPath}"...')
+            with self.tracer.span("save", experiment_id, path=info.experimentPath):
+                self.save_experiment(experiment_id, info.experimentPath)
 
             progress_update("Experiment saved.")
 
-            self.close_experiment(experiment_id)
+            with self.tracer.span("close", experiment_id):
+                self.close_experiment(experiment_id)
 
             # We have to clear all events that were received to start fresh when a new collection is performed
             self.reset_events()
             progress_update("Collection completed.")
 
+    def arm_collection(self, experiment_id: int) -> tuple[dict[ExperimentEventType, Future], dict[str, float]]:
+        """Expect all collection events of an experiment before starting its collection, so that none of them can be missed.
+
+        Args:
+            experiment_id (int): ID of experiment about to collect.
+
+        Returns:
+            tuple[dict[ExperimentEventType, Future], dict[str, float]]: Future of each event, and time each event is
+                received by event name, filled as the events arrive (see "Tracer.record_collection").
+        """
+        event_times = {}
+        futures = {}
+        for event_type in (
+            ExperimentEventType.PREPARING_FOR_COLLECTION,
+            ExperimentEventType.WAITING_FOR_AUTO_INJECT,
+            ExperimentEventType.COLLECTION_STARTED,
+            ExperimentEventType.COLLECTION_FINISHED,
+            ExperimentEventType.RUN,
+        ):
+            future = self.event_router.arm(experiment_id, event_type)
+            future.add_done_callback(lambda _, name=event_type.name: event_times.setdefault(name, monotonic()))
+            futures[event_type] = future
+        return futures, event_times
+
     def get_active_user(self) -> ActiveUserInfo:
         """Get active user in security pack mode. If no active user, a user with an empty userId.
 
@@ -787,9 +2069,9 @@ class AstraAdmin:
         """
         def func():
             active_user = self.try_get(lambda: self.astra_sp_com.GetActiveUserInfo())
-            return active_user if active_user.userId else ActiveUserInfo(userId="", fullUserName="", localDomain="")
+            return active_user if active_user and active_user.userId else ActiveUserInfo(userId="", fullUserName="", localDomain="")
 
-        return self.try_get(func)
+        return self.try_get(func, ActiveUserInfo(userId="", fullUserName="", localDomain=""))
 
     def shut_down(self) -> None:
         """Shutdown the current instance. It will close all open experiments and then perform a gracious shutdown of ASTRA."""
@@ -807,9 +2089,23 @@ class AstraAdmin:
         """
         with rlock:
             if experiment_id in self._experiments:
-                return deepcopy(self._experiments[experiment_id])
+                return self._experiments[experiment_id].clone()
             return None
 
+    def get_experiment_snapshot(self, experiment_id: int) -> ExperimentSnapshot:
+        """Get an immutable view of an opened experiment. Cheaper than "get_experiment" and meant for polling:
+        the same snapshot is returned until the experiment changes.
+
+        Args:
+            experiment_id (int): ID of experiment to get.
+
+        Returns:
+            ExperimentSnapshot: If an experiment with ID exists, its current state, null otherwise.
+        """
+        with rlock:
+            experiment = self._experiments.get(experiment_id)
+            return experiment.snapshot() if experiment is not None else None
+
     def get_internal_experiment(self, experiment_id: int) -> Experiment:
         """Get experiment wrapper for an opened experiment.
 
@@ -841,7 +2137,7 @@ class AstraAdmin:
         Returns:
             list: List of experiment templates.
         """
-        return self.try_get(self.astra_com.GetExperimentTemplates)
+        return self.try_get(lambda: self.astra_com.GetExperimentTemplates(), [])
 
     def get_data_database_directory(self, root_path: str) -> list:
         """Get list of directories from the Data database under rootPath.
@@ -852,7 +2148,7 @@ class AstraAdmin:
         Returns:
             list: List of directories under rootPath.
         """
-        return self.try_get(lambda: self.astra_com.GetDataDatabaseDirectory(root_path))
+        return self.try_get(lambda: self.astra_com.GetDataDatabaseDirectory(root_path), [])
 
     def new_experiment_from_template(self, template_path: str) -> int:
         """Create new experiment from template.
@@ -863,32 +2159,51 @@ class AstraAdmin:
         Returns:
             int: ID of a newly created experiment.
         """
-        experiment_id = int()
-        with rlock:
-            experiment_id = self.try_get(
-                lambda: self.astra_com.NewExperimentFromTemplate(template_path)
-            )
-
-            if type(experiment_id) is inspect._empty or experiment_id <= 0:
-                return -1
-            # Add Experiment wrapper to map of open experiments
-            experiment = Experiment(experiment_id)
-            experiment.status = ExperimentStatus.BUSY
-            self._experiments[experiment_id] = experiment
-
-            self.experiment_status_changed.notify_observers(experiment)
+        experiment_id = self.register_experiment(
+            lambda: self.astra_com.NewExperimentFromTemplate(template_path), ExperimentStatus.BUSY
+        )
+        if experiment_id <= 0:
+            return -1
 
         """
         Wait until experiment is fully loaded and ready before proceeding.
         This needs to be done outside of the lock otherwise events cannot be processed.
         """
-        self.wait_experiment_read()
-        self.wait_experiment_run()
+        self.wait_experiment_read(experiment_id)
+        self.wait_experiment_run(experiment_id)
+
+        self.refresh_loaded_experiment(experiment_id)
+        return experiment_id
+
+    def register_experiment(self, create: Callable, status: ExperimentStatus = None) -> int:
+        """Create or open an experiment and add its wrapper to the map of open experiments,
+        without waiting for the experiment to be read and run.
+
+        Args:
+            create (Callable): Wrapper around the API call returning the ID of the experiment.
+            status (ExperimentStatus, optional): Initial status of the experiment. Defaults to None (READY).
+
+        Returns:
+            int: ID of the experiment if successful, -1 otherwise.
+        """
+        def create_and_register() -> int:
+            experiment_id = create()
+            if experiment_id <= 0:
+                return experiment_id
+            # Add Experiment wrapper to map of open experiments. This is done on the COM thread,
+            # so that the wrapper exists before the events of the experiment are dispatched.
+            experiment = Experiment(experiment_id)
+            if status is not None:
+                experiment.status = status
+            with rlock:
+                self._experiments[experiment_id] = experiment
+            return experiment_id
 
+        experiment_id = self.try_get(create_and_register, -1)
+        if experiment_id <= 0:
+            return -1
         with rlock:
-            experiment = self.get_internal_experiment(experiment_id)
-            experiment.read()
-            self.experiment_status_changed.notify_observers(experiment)
+            self.experiment_status_changed.notify_observers(self.get_internal_experiment(experiment_id))
 
         return experiment_id
 
@@ -901,7 +2216,7 @@ class AstraAdmin:
         Returns:
             str: Name of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetExperimentName(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetExperimentName(experiment_id), "")
 
     def open_experiment(self, fileName: str) -> int:
         """Open an experiment from location "fileName".
@@ -912,29 +2227,18 @@ class AstraAdmin:
         Returns:
             int: ID of experiment if successfully opened, otherwise 0.
         """
-        experiment_id = int()
-        with rlock:
-            experiment_id = self.try_get(lambda: self.astra_com.OpenExperiment(fileName))
-            if type(experiment_id) is inspect._empty or experiment_id <= 0:
-                return -1
-            # Add Experiment wrapper to map of open experiments
-            experiment = Experiment(experiment_id)
-            self._experiments[experiment_id] = experiment
-
-            self.experiment_status_changed.notify_observers(experiment)
+        experiment_id = self.register_experiment(lambda: self.astra_com.OpenExperiment(fileName))
+        if experiment_id <= 0:
+            return -1
 
         """
         Wait until experiment is fully loaded and ready before proceeding.
         This needs to be done outside of the lock otherwise events cannot be processed.
         """
-        self.wait_experiment_read()
-        self.wait_experiment_run()
-
-        with rlock:
-            experiment = self.get_internal_experiment(experiment_id)
-            experiment.read()
-            self.experiment_status_changed.notify_observers(experiment)
+        self.wait_experiment_read(experiment_id)
+        self.wait_experiment_run(experiment_id)
 
+        self.refresh_loaded_experiment(experiment_id)
         return experiment_id
 
     def save_experiment(self, experiment_id: int, file_name: str) -> bool:
@@ -947,29 +2251,47 @@ class AstraAdmin:
         Returns:
             bool: True when file is successfully saved, false otherwise.
         """
-        date_time = datetime.now()
+        experiment_write = self.request_save_experiment(experiment_id, file_name)
+        if experiment_write is None:
+            return False
+
+        # Wait has to be done outside of the lock (SyncRoot) otherwise the ASTRA messages cannot be sent.
+        self.wait_future(experiment_write)
+
+        return True
+
+    def request_save_experiment(self, experiment_id: int, file_name: str) -> Future:
+        """Start saving experiment with ID "experimentID" to location "fileName", without waiting for it to be written.
+
+        Args:
+            experiment_id (int): ID of experiment to save.
+            file_name (str): File location where experiment should be saved.
+
+        Returns:
+            Future: Future completed when the experiment is written, None if the experiment could not be saved.
+        """
         with rlock:
             experiment = self.get_internal_experiment(experiment_id)
 
             if experiment is None:
-                return False
+                return None
 
             experiment.status = ExperimentStatus.BUSY
 
             self.experiment_status_changed.notify_observers(experiment)
 
-            if not self.try_execute(
-                lambda: self.astra_com.SaveExperiment(experiment_id, file_name)
-            ):
-                # Reset status of experiment and notify clients.
+        experiment_write = self.event_router.arm(experiment_id, ExperimentEventType.WRITE)
+        if not self.try_execute(
+            lambda: self.astra_com.SaveExperiment(experiment_id, file_name)
+        ):
+            experiment_write.cancel()
+            # Reset status of experiment and notify clients.
+            with rlock:
                 experiment.status = ExperimentStatus.READY
                 self.experiment_status_changed.notify_observers(experiment)
-                return False
-
-        # Wait has to be done outside of the lock (SyncRoot) otherwise the ASTRA messages cannot be sent.
-        self.wait_experiment_write()
+            return None
 
-        return True
+        return experiment_write
 
     def close_experiment(self, experiment_id: int) -> bool:
         """Close experiment with ID "experimentID".
@@ -980,14 +2302,32 @@ class AstraAdmin:
         Returns:
             bool: True upon successful close, false otherwise.
         """
+        experiment_closed = self.request_close_experiment(experiment_id)
+        if experiment_closed is None:
+            return False
+
+        self.wait_future(experiment_closed)
+        return True
+
+    def request_close_experiment(self, experiment_id: int) -> Future:
+        """Start closing experiment with ID "experimentID", without waiting for it to be closed.
+
+        Args:
+            experiment_id (int): ID of experiment to close.
+
+        Returns:
+            Future: Future completed when the experiment is closed, None if the experiment could not be closed.
+        """
         with rlock:
             self.closing_experiments[experiment_id] = self.get_internal_experiment(experiment_id)
             self._experiments.pop(experiment_id)
-            if not self.try_execute(lambda: self.astra_com.CloseExperiment(experiment_id)):
-                return False
+            self._fraction_tables.pop(experiment_id, None)
+        experiment_closed = self.event_router.arm(experiment_id, ExperimentEventType.CLOSED)
+        if not self.try_execute(lambda: self.astra_com.CloseExperiment(experiment_id)):
+            experiment_closed.cancel()
+            return None
 
-        self.wait_experiment_closed()
-        return True
+        return experiment_closed
 
     def is_running(self, experiment_id: int) -> bool:
         """Is experiment with ID "experimentID" currently running?
@@ -998,7 +2338,7 @@ class AstraAdmin:
         Returns:
             bool: True if running, false otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetIsExperimentRunning(experiment_id) != 0)
+        return self.try_get(lambda: self.astra_com.GetIsExperimentRunning(experiment_id) != 0, False)
 
     def get_collection_duration(self, experiment_id: int) -> float:
         """Get duration of collection for experiment with ID "experimentID".
@@ -1009,7 +2349,7 @@ class AstraAdmin:
         Returns:
             float: Duration in minutes.
         """
-        return self.try_get(lambda: self.astra_com.GetCollectionDuration(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetCollectionDuration(experiment_id), 0.0)
 
     def set_collection_duration(self, experiment_id: int, duration: float) -> bool:
         """Set duration of collection for experiment with ID "experimentID".
@@ -1021,9 +2361,12 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        return self.try_execute(
+        result = self.try_execute(
             lambda: self.astra_com.SetCollectionDuration(experiment_id, duration)
         )
+        if result:
+            self.synchronize_experiment(experiment_id, "collection_duration", duration)
+        return result
 
     def validate_experiment(self, experiment_id: int) -> tuple[str, bool]:
         """Validate experiment with ID "experimentID". Useful before starting a collection.
@@ -1041,7 +2384,7 @@ class AstraAdmin:
             details, result = self.astra_com.ValidateExperiment(experiment_id)
             return details, result == 1
 
-        return self.try_get(func)
+        return self.try_get(func, ("", False))
 
     def use_instrument_calibration_constant(self, experiment_id: int, state: bool) -> bool:
         """For experiment to use either the Instrument's calibration constant or the method's calibration constant.
@@ -1069,13 +2412,23 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
 
-        def func() -> None:
+        # Collection events left over from a previous collection must not be mistaken for this one.
+        for event_type in (
+            ExperimentEventType.PREPARING_FOR_COLLECTION,
+            ExperimentEventType.WAITING_FOR_AUTO_INJECT,
+            ExperimentEventType.COLLECTION_STARTED,
+            ExperimentEventType.COLLECTION_ABORTED,
+            ExperimentEventType.COLLECTION_FINISHED,
+        ):
+            self.event_router.discard(experiment_id, event_type)
+        if not self.try_execute(lambda: self.astra_com.StartCollection(experiment_id)):
+            return False
+
+        with rlock:
             experiment = self.get_internal_experiment(experiment_id)
-            self.astra_com.StartCollection(experiment_id)
             experiment.status = ExperimentStatus.BUSY
             self.experiment_status_changed.notify_observers(experiment)
-
-        return self.try_execute(func)
+        return True
 
     def stop_collection(self, experiment_id: int) -> bool:
         """Stop collection of experiment with ID.
@@ -1097,7 +2450,7 @@ class AstraAdmin:
         Returns:
             str: Description if call is successful, None otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetExperimentDescription(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetExperimentDescription(experiment_id), "")
 
     def set_experiment_description(self, experiment_id: int, description: str) -> bool:
         """Set the description of experiment with ID.
@@ -1112,6 +2465,8 @@ class AstraAdmin:
         result = self.try_execute(
             lambda: self.astra_com.SetExperimentDescription(experiment_id, description)
         )
+        if result:
+            self.synchronize_experiment(experiment_id, "description", description)
         return result
 
     def get_pump_flow_rate(self, experiment_id: int) -> float:
@@ -1123,7 +2478,7 @@ class AstraAdmin:
         Returns:
             float: Flow rate of pump in mL/min if successful, 0 otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetPumpFlowRate(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetPumpFlowRate(experiment_id), 0.0)
 
     def set_pump_flow_rate(self, experiment_id: int, flow_rate: float) -> bool:
         """Set flow rate on pump for experiment with ID.
@@ -1135,7 +2490,9 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetPumpFlowRate(experiment_id, flow_rate))
+        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetPumpFlowRate(experiment_id, flow_rate), experiment_id)
+        if result:
+            self.synchronize_experiment(experiment_id, "flow_rate", flow_rate)
         return result
 
     def get_injected_volume(self, experiment_id: int) -> float:
@@ -1147,7 +2504,7 @@ class AstraAdmin:
         Returns:
             float: Injected volume in mL if successful, 0 otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetInjectedVolume(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetInjectedVolume(experiment_id), 0.0)
 
     def set_injected_volume(self, experiment_id: int, injected_volume: float) -> bool:
         """Set injected volume of the injector for experiment with ID.
@@ -1160,8 +2517,10 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
         result = self.try_execute_and_wait_experiment_run(
-            lambda: self.astra_com.SetInjectedVolume(experiment_id, injected_volume)
+            lambda: self.astra_com.SetInjectedVolume(experiment_id, injected_volume), experiment_id
         )
+        if result:
+            self.synchronize_experiment(experiment_id, "injected_volume", injected_volume)
         return result
 
     def get_sample(self, experiment_id: int) -> SampleInfo:
@@ -1173,7 +2532,10 @@ class AstraAdmin:
         Returns:
             SampleInfo: Sample details of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSample(experiment_id))
+        return self.try_get(
+            lambda: self.astra_com.GetSample(experiment_id),
+            SampleInfo(name="", description="", dndc=0.0, a2=0.0, uvExtinction=0.0, concentration=0.0),
+        )
 
     def set_sample(self, experiment_id: int, sample: SampleInfo) -> bool:
         """Set sample for experiment with ID.
@@ -1186,6 +2548,8 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
         result = self.try_execute(lambda: self.astra_com.SetSample(experiment_id, sample))
+        if result:
+            self.synchronize_experiment(experiment_id, "sample", sample)
         return result
     
     def get_sample_name(self, experiment_id: int) -> str:
@@ -1197,7 +2561,7 @@ class AstraAdmin:
         Returns:
             str: Sample name of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleName(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleName(experiment_id), "")
 
     def set_sample_name(self, experiment_id: int, name: str) -> bool:
         """Set sample name for experiment with ID.
@@ -1210,6 +2574,8 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
         result = self.try_execute(lambda: self.astra_com.SetSampleName(experiment_id, name))
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.name", name)
         return result
     
     def get_sample_description(self, experiment_id: int) -> str:
@@ -1221,7 +2587,7 @@ class AstraAdmin:
         Returns:
             str: Sample description of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleDescription(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleDescription(experiment_id), "")
 
     def set_sample_description(self, experiment_id: int, description: str) -> bool:
         """Set sample description for experiment with ID.
@@ -1234,6 +2600,8 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
         result = self.try_execute(lambda: self.astra_com.SetSampleDescription(experiment_id, description))
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.description", description)
         return result
     
     def get_sample_dndc(self, experiment_id: int) -> float:
@@ -1245,7 +2613,7 @@ class AstraAdmin:
         Returns:
             float: Sample dndc details of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleDndc(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleDndc(experiment_id), 0.0)
 
     def set_sample_dndc(self, experiment_id: int, dndc: float) -> bool:
         """Set sample dndc for experiment with ID.
@@ -1257,7 +2625,9 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleDndc(experiment_id, dndc))
+        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleDndc(experiment_id, dndc), experiment_id)
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.dndc", dndc)
         return result
     
     def get_sample_a2(self, experiment_id: int) -> float:
@@ -1269,7 +2639,7 @@ class AstraAdmin:
         Returns:
             float: Sample a2 details of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleA2(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleA2(experiment_id), 0.0)
 
     def set_sample_a2(self, experiment_id: int, a2: float) -> bool:
         """Set sample a2 for experiment with ID.
@@ -1281,7 +2651,9 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleA2(experiment_id, a2))
+        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleA2(experiment_id, a2), experiment_id)
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.a2", a2)
         return result
     
     def get_sample_uv_extinction(self, experiment_id: int) -> float:
@@ -1293,7 +2665,7 @@ class AstraAdmin:
         Returns:
             float: Sample uv extinction details of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleUvExtinction(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleUvExtinction(experiment_id), 0.0)
 
     def set_sample_uv_extinction(self, experiment_id: int, uv_extinction: float) -> bool:
         """Set sample uv extinction for experiment with ID.
@@ -1305,7 +2677,9 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleUvExtinction(experiment_id, uv_extinction))
+        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleUvExtinction(experiment_id, uv_extinction), experiment_id)
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.uvExtinction", uv_extinction)
         return result
     
     def get_sample_concentration(self, experiment_id: int) -> float:
@@ -1317,7 +2691,7 @@ class AstraAdmin:
         Returns:
             float: Sample concentration details of experiment.
         """
-        return self.try_get(lambda: self.astra_com.GetSampleConcentration(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetSampleConcentration(experiment_id), 0.0)
 
     def set_sample_concentration(self, experiment_id: int, concentration: float) -> bool:
         """Set sample concentration for experiment with ID.
@@ -1329,7 +2703,9 @@ class AstraAdmin:
         Returns:
             bool: True if call was successful, false otherwise.
         """
-        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleConcentration(experiment_id, concentration))
+        result = self.try_execute_and_wait_experiment_run(lambda: self.astra_com.SetSampleConcentration(experiment_id, concentration), experiment_id)
+        if result:
+            self.synchronize_experiment(experiment_id, "sample.concentration", concentration)
         return result
 
     def has_vision_uv(self, experiment_id: int) -> bool:
@@ -1341,9 +2717,20 @@ class AstraAdmin:
         Returns:
             bool: True if experiment has a VISION UV profile, false otherwise.
         """
-        return self.try_get(lambda: self.astra_com.HasVisionUv(experiment_id) == 1)
+        return self.try_get(lambda: self.astra_com.HasVisionUv(experiment_id) == 1, False)
 
-    def setup_vision_uv(self, experiment_id: int, device_details: UvDeviceDetails) -> bool:
+    def has_collected_data(self, experiment_id: int) -> bool:
+        """Has experiment with ID "experimentID" collected some data?
+
+        Args:
+            experiment_id (int): ID of experiment.
+
+        Returns:
+            bool: True if experiment has some collected data, false otherwise.
+        """
+        return self.try_get(lambda: self.astra_com.HasCollectedData(experiment_id) != 0, False)
+
+    def setup_vision_uv(self, experiment_id: int, device_details: "UvDeviceDetails") -> bool:
         """Assuming experiment with ID "experimentID" has a VISION UV profile, set the details of the UV detector(s).
 
         Args:
@@ -1358,6 +2745,43 @@ class AstraAdmin:
         )
         return result
 
+    def push_vision_uv_data(self, experiment_id: int, channel_count: int, data) -> bool:
+        """Push UV data received during the collection of experiment with ID "experimentID".
+        Use "open_vision_uv_stream" to push data at detector rate.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            channel_count (int): Number of channels.
+            data (_type_): Sequence of doubles or NumPy array, "channel_count + 1" values per sample: the time of the sample,
+                then the value of each channel.
+
+        Returns:
+            bool: True if call was successful, false otherwise.
+        """
+        # NumPy arrays are marshalled as a single buffer rather than element by element.
+        data = backend.double_array(data)
+        return self.try_execute(lambda: self.astra_com.PushVisionUvData(experiment_id, channel_count, data))
+
+    def open_vision_uv_stream(
+        self, experiment_id: int, channel_count: int, batch_size: int = 256, max_latency: float = 0.1
+    ) -> "VisionUvStream":
+        """Open a stream buffering UV samples and pushing them to experiment with ID "experimentID" in batches.
+        Requires NumPy.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            channel_count (int): Number of channels.
+            batch_size (int, optional): Number of samples pushed per call. Defaults to 256.
+            max_latency (float, optional): Maximum time a sample is buffered, in seconds. Defaults to 0.1.
+
+        Returns:
+            VisionUvStream: Stream to push the samples to, to be closed at the end of the collection.
+        """
+        # Imported here so that NumPy is only needed by clients streaming UV data.
+        from vision_uv_stream import VisionUvStream
+
+        return VisionUvStream(self, experiment_id, channel_count, batch_size, max_latency)
+
     def get_baselines(self, experiment_id: int) -> list:
         """Get baselines of experiment with ID "experimentID".
 
@@ -1367,7 +2791,7 @@ class AstraAdmin:
         Returns:
             list: List of baselines if successful, null otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetBaselines(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetBaselines(experiment_id), [])
 
     def get_baseline_type_string(self, baseline_type: BaselineType) -> str:
         """String representation of a baseline's type.
@@ -1434,7 +2858,7 @@ class AstraAdmin:
         Returns:
             list: List of peaks if successful, null otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetPeakRanges(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetPeakRanges(experiment_id), [])
 
     def add_peak_range(self, experiment_id: int, start: float, end: float) -> bool:
         """Add a peak to experiment with ID "experimentID".
@@ -1485,7 +2909,25 @@ class AstraAdmin:
         Returns:
             str: XML representation if successful of the results, null otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetResults(experiment_id))
+        return self.try_get(lambda: self.astra_com.GetResults(experiment_id), "")
+
+    def read_results(self, experiment_id: int, procedures: list[str] = None, names: list[str] = None) -> list:
+        """Get results of experiment with ID "experimentID", read into typed results per procedure and per peak.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            procedures (list[str], optional): Names of the procedures to read. Defaults to None (all procedures).
+            names (list[str], optional): Names of the results to read, e.g. ["Mw", "Mn"]. Defaults to None (all results).
+
+        Returns:
+            list[ProcedureResults]: Results of each procedure if successful, null otherwise.
+        """
+        results = self.get_results(experiment_id)
+        if not results:
+            return None
+        from results_reader import read_results
+
+        return read_results(results, procedures, names)
 
     def save_results(self, experiment_id: int, file_name: str) -> bool:
         """Save results as XML for experiment with ID "experimentID".
@@ -1510,7 +2952,26 @@ class AstraAdmin:
         Returns:
             str: Dataset content as a formatted string, null otherwise.
         """
-        return self.try_get(lambda: self.astra_com.GetDataSet(experiment_id, definition_name))
+        return self.try_get(lambda: self.astra_com.GetDataSet(experiment_id, definition_name), "")
+
+    def get_data_set_array(self, experiment_id: int, definition_name: str):
+        """Get data associated to a dataset name "definitionName" for experiment with ID "experimentID",
+        parsed into columns. Requires NumPy.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            definition_name (str): Name of dataset to retrieve.
+
+        Returns:
+            DataSetArray: Dataset values with column names and units, null otherwise.
+        """
+        # Imported here so that NumPy is only needed by clients parsing datasets.
+        from data_set import parse_data_set
+
+        data_set = self.get_data_set(experiment_id, definition_name)
+        if not data_set:
+            return None
+        return parse_data_set(data_set)
 
     def save_data_set(self, experiment_id: int, definition_name: str, file_name: str) -> bool:
         """Save data associated to a dataset name "definitionName" for experiment with ID "experimentID".
@@ -1571,11 +3032,73 @@ class AstraAdmin:
         Returns:
             bool: True for success, false otherwise.
         """
+        with rlock:
+            self._fraction_tables.pop(experiment_id, None)
         result = self.try_execute(
             lambda: self.astra_com.AddFractionResult(experiment_id, index, fraction_result_json)
         )
         return result
 
+    def add_fraction_results(
+        self,
+        experiment_id: int,
+        fraction_results: Iterable[FractionResult],
+        start_index: int = 0,
+        max_in_flight: int = 64,
+    ) -> list[FractionResultError]:
+        """Add Fraction Results to the dataset of experiment with ID "experimentID", at consecutive indexes.
+        The calls are queued on the COM thread while the next fraction results are serialized, and
+        a failed fraction result does not prevent the following ones from being added.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            fraction_results (Iterable[FractionResult]): Fraction Results, or Fraction Results already serialized as json.
+            start_index (int, optional): Index of the first Fraction Result. Defaults to 0.
+            max_in_flight (int, optional): Maximum number of calls queued at once. Defaults to 64.
+
+        Returns:
+            list[FractionResultError]: Fraction Results that could not be added, empty for success.
+        """
+        with rlock:
+            self._fraction_tables.pop(experiment_id, None)
+        errors = []
+        pending = deque()
+
+        def wait_oldest() -> None:
+            index, fraction_result, future = pending.popleft()
+            try:
+                future.result()
+            except Exception as ex:
+                error = AstraError.from_exception(ex, "AddFractionResult")
+                self.last_error = error
+                errors.append(FractionResultError(index, fraction_result, error))
+
+        for index, fraction_result in enumerate(fraction_results, start_index):
+            try:
+                # Passed by value as a BSTR, like the json string of "add_fraction_result".
+                if isinstance(fraction_result, str):
+                    fraction_result_json = fraction_result
+                elif isinstance(fraction_result, FractionResult):
+                    fraction_result_json = fraction_result.to_json()
+                else:
+                    raise TypeError(f"Expected a FractionResult or json, got {type(fraction_result).__name__}")
+            except Exception as ex:
+                error = AstraError.from_exception(ex, "AddFractionResult")
+                self.last_error = error
+                errors.append(FractionResultError(index, fraction_result, error))
+                continue
+            future = self.submit_timed_call(
+                lambda index=index, fraction_result_json=fraction_result_json: self.astra_com.AddFractionResult(
+                    experiment_id, index, fraction_result_json
+                )
+            )
+            pending.append((index, fraction_result, future))
+            if len(pending) >= max_in_flight:
+                wait_oldest()
+        while pending:
+            wait_oldest()
+        return errors
+
     def get_fraction_result(self, experiment_id: int, index: int) -> str:
         """Get a single Fraction Result "fractionResultJson" to the dataset of experiment with ID "experimentID".
 
@@ -1586,7 +3109,99 @@ class AstraAdmin:
         Returns:
             str: String containing fraction result in JSON.
         """
-        return self.try_get(lambda: self.astra_com.GetFractionResult(experiment_id, index))
+        return self.try_get(lambda: self.astra_com.GetFractionResult(experiment_id, index), "")
+
+    def get_fraction_results(
+        self, experiment_id: int, start_index: int = 0, count: int = None, batch_size: int = 32
+    ) -> list[str]:
+        """Get the Fraction Results of the dataset of experiment with ID "experimentID", from "start_index".
+        The calls are queued on the COM thread "batch_size" at a time.
+
+        Without "count", the Fraction Results are read up to the first index that cannot be read, whatever the error
+        returned by ASTRA for an index past the end of the list. If "start_index" itself cannot be read, the error is
+        only reported if the experiment is not open, otherwise it has no Fraction Result from "start_index".
+
+        Args:
+            experiment_id (int): ID of experiment.
+            start_index (int, optional): Index of the first Fraction Result. Defaults to 0.
+            count (int, optional): Number of Fraction Results to read, each one having to be read. Defaults to None (up to the end of the list).
+            batch_size (int, optional): Number of calls queued at once. Defaults to 32.
+
+        Returns:
+            list[str]: Fraction results in JSON, by index from "start_index", null if they could not be read.
+        """
+        fraction_results = []
+        end = None if count is None else start_index + count
+        index = start_index
+        while end is None or index < end:
+            stop = index + batch_size if end is None else min(index + batch_size, end)
+            futures = [
+                self.submit_timed_call(lambda index=index: self.astra_com.GetFractionResult(experiment_id, index))
+                for index in range(index, stop)
+            ]
+            for position, future in enumerate(futures):
+                error = None
+                try:
+                    fraction_result = future.result()
+                except AstraError as ex:
+                    error = ex
+                    fraction_result = None
+                if fraction_result:
+                    fraction_results.append(fraction_result)
+                    continue
+
+                for future in futures[position + 1:]:
+                    future.cancel()
+                if count is None and (error is None or fraction_results or self._is_experiment_open(experiment_id)):
+                    # End of the list.
+                    return fraction_results
+                if error is None:
+                    error = AstraError("GetFractionResult", None, f"Fraction result {index + position} is empty")
+                self.last_error = error
+                if not self.should_show_error_message_box:
+                    raise error
+                return None
+            index = stop
+        return fraction_results
+
+    def _is_experiment_open(self, experiment_id: int) -> bool:
+        try:
+            self.timed_call(lambda: self.astra_com.GetExperimentName(experiment_id))
+            return True
+        except AstraError:
+            return False
+
+    def get_fraction_table(
+        self, experiment_id: int, start_index: int = 0, count: int = None, refresh: bool = False
+    ) -> "FractionTable":
+        """Get the Fraction Results of the dataset of experiment with ID "experimentID" as a columnar table,
+        to select fractions by time window or peak detector. Requires NumPy.
+        The table is read once and kept until fraction results are added or the experiment is closed.
+
+        Args:
+            experiment_id (int): ID of experiment.
+            start_index (int, optional): Index of the first Fraction Result. Defaults to 0.
+            count (int, optional): Number of Fraction Results to read. Defaults to None (up to the end of the list).
+            refresh (bool, optional): Read the fraction results again. Defaults to False.
+
+        Returns:
+            FractionTable: Fraction Results read as by "get_fraction_results", null if they could not be read.
+        """
+        # Imported here so that NumPy is only needed by clients reading fraction tables.
+        from fraction_table import parse_fraction_results
+
+        key = (start_index, count)
+        with rlock:
+            table = self._fraction_tables.get(experiment_id, {}).get(key)
+        if table is not None and not refresh:
+            return table
+        fraction_results = self.get_fraction_results(experiment_id, start_index, count)
+        if fraction_results is None:
+            return None
+        table = parse_fraction_results(range(start_index, start_index + len(fraction_results)), fraction_results)
+        with rlock:
+            self._fraction_tables.setdefault(experiment_id, {})[key] = table
+        return table
 
     def is_security_pack_active(self) -> bool:
         """Is security pack active? If true, then "ValidateLogon" should be called to identify the user
@@ -1595,7 +3210,7 @@ class AstraAdmin:
         Returns:
             bool: True if security pack is enabled, false otherwise.
         """
-        return self.try_get(lambda: self.astra_sp_com.IsSecurityPackActive() != 0)
+        return self.try_get(lambda: self.astra_sp_com.IsSecurityPackActive() != 0, False)
 
     def is_logged_in(self) -> bool:
         """Is a user logged in?
@@ -1603,7 +3218,7 @@ class AstraAdmin:
         Returns:
             bool: True if security pack is enabled and a user logged in, false otherwise.
         """
-        return self.try_get(lambda: self.astra_sp_com.IsLoggedIn() != 0)
+        return self.try_get(lambda: self.astra_sp_com.IsLoggedIn() != 0, False)
 
     def validate_logon(self, user_id: str, password: str, domain: str) -> LogonResult:
         """Validate logon of client with ASTRA.
@@ -1631,7 +3246,7 @@ class AstraAdmin:
             else:
                 return LogonResult(isValid=0, errorDetails="", errorMessage="")
 
-        return self.try_get(func)
+        return self.try_get(func, LogonResult(isValid=0, errorDetails="", errorMessage=""))
 
     def run_experiment(self, experiment_id: int) -> bool:
         """Run experiment with ID "experimentID".
@@ -1643,12 +3258,13 @@ class AstraAdmin:
             bool: True if call was successful, false otherwise.
         """
         AstraEvents.run_event.clear()
-        success = self.try_execute(lambda: self.astra_com.RunExperiment(experiment_id))
-        self.wait_experiment_run()
-        return success
+        return self.try_execute_and_wait_experiment_run(
+            lambda: self.astra_com.RunExperiment(experiment_id), experiment_id
+        )
 
     def reset_events(self) -> None:
-        """Reset all events. Recommended between 2 collections to ensure all events can be awaited for the next collection."""
+        """Reset all events. Recommended between 2 collections to ensure all events can be awaited for the next collection.
+        Only affects waits done without an experiment ID, events routed per experiment are discarded when the experiment is closed."""
         AstraEvents.ready_event.clear()
         AstraEvents.read_event.clear()
         AstraEvents.write_event.clear()
@@ -1659,31 +3275,70 @@ class AstraAdmin:
         AstraEvents.collection_finished_event.clear()
         AstraEvents.waiting_for_auto_inject_event.clear()
 
-    def try_get(self, func: Callable):
+    def observer_dispatch_stats(self) -> DispatchStats:
+        """Get the counters of the dispatcher notifying the experiment and instrument observers.
+
+        Returns:
+            DispatchStats: Queue depth and dispatch latency of observer notifications.
+        """
+        return observer_dispatcher.stats()
+
+    def metrics(self) -> MetricsSnapshot:
+        """Get the latencies of the calls made to ASTRA, see "astra_metrics".
+        Serve them to Prometheus with "astra_metrics.serve_metrics(AstraAdmin.call_metrics)".
+
+        Returns:
+            MetricsSnapshot: Time waiting for the COM thread, in ASTRA and waiting for events, by ASTRA method.
+        """
+        return self.call_metrics.snapshot()
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Queue a call on the COM thread and return without waiting for it, so that
+        a multithreaded client can keep several requests in flight.
+
+        Args:
+            func (Callable): Function to execute, typically an AstraAdmin method or an API call.
+            args: Arguments of "func".
+
+        Returns:
+            Future: Future holding the return value or the exception raised by "func".
+        """
+        return self.com_thread.submit(func, *args)
+
+    def try_get(self, func: Callable, default=None):
         """Helper function to display the underlying API errors.
+        "func" is executed on the COM thread, it must not acquire the lock.
 
         Args:
             func (Callable): Wrapper around an API call to be executed.
+            default (_type_, optional): Value returned if "func" fails and errors are displayed rather than raised.
+                Defaults to None.
 
         Returns:
-            _type_: Value of "func" upon successful completion.
+            _type_: Value of "func" upon successful completion, "default" otherwise.
         """
         if func is None:
             raise TypeError
         try:
-            with rlock:
-                return func()
-        except Exception as ex:
+            return self.timed_call(func)
+        except AstraError as ex:
+            self.last_error = ex
             if self.should_show_error_message_box:
                 # show message box
                 pass
             else:
                 raise ex
-        # return the default value of return type of func()
-        return inspect.signature(func).return_annotation()
+        except Exception as ex:
+            # Not a COM error, e.g. ctypes.ArgumentError: reported rather than raised, like the API errors.
+            self.last_error = AstraError.from_exception(ex, call_name(func))
+            if not self.should_show_error_message_box:
+                raise
+            traceback.print_exc()
+        return default
 
     def try_execute(self, action: Callable):
         """Helper function to display the underlying API errors upon failure.
+        "action" is executed on the COM thread, it must not acquire the lock.
 
         Args:
             action (function): Wrapper around an API call to be executed.
@@ -1694,24 +3349,31 @@ class AstraAdmin:
         if action is None:
             raise TypeError
         try:
-            with rlock:
-                action()
-                return True
-        except Exception as ex:
+            self.timed_call(action)
+            return True
+        except AstraError as ex:
+            self.last_error = ex
             if self.should_show_error_message_box:
                 # show message box
                 # Error messages can be disabled setting 'AstraAdmin.should_show_error_message_box' to False";
                 pass
             else:
                 raise ex
+        except Exception as ex:
+            # Not a COM error, e.g. ctypes.ArgumentError: reported rather than raised, like the API errors.
+            self.last_error = AstraError.from_exception(ex, call_name(action))
+            if not self.should_show_error_message_box:
+                raise
+            traceback.print_exc()
         return False
     
-    def try_execute_and_wait_experiment_run(self, action: Callable):
+    def try_execute_and_wait_experiment_run(self, action: Callable, experiment_id: int = None):
         """Helper function to display the underlying API errors upon failure.
         And wait for experiment to finish running then continue.
 
         Args:
             action (function): Wrapper around an API call to be executed.
+            experiment_id (int, optional): ID of experiment that will run. Defaults to None (any experiment).
 
         Returns:
             _type_: True if "action" completes without a failure, false otherwise.
@@ -1719,33 +3381,159 @@ class AstraAdmin:
         success = False
         if action is None:
             raise TypeError
+        experiment_run = None
+        if experiment_id is not None:
+            experiment_run = self.event_router.arm(experiment_id, ExperimentEventType.RUN)
         try:
-            with rlock:
-                action()
-                success = True
-        except Exception as ex:
+            self.timed_call(action)
+            success = True
+        except AstraError as ex:
+            self.last_error = ex
             if self.should_show_error_message_box:
                 # show message box
                 # Error messages can be disabled setting 'AstraAdmin.should_show_error_message_box' to False";
                 pass
             else:
                 raise ex
+        finally:
+            if not success and experiment_run is not None:
+                experiment_run.cancel()
         if success:
-            self.wait_experiment_run()
+            start = monotonic()
+            if experiment_run is None:
+                self.wait_experiment_run()
+            else:
+                self.wait_future(experiment_run)
+            if self.call_metrics.enabled:
+                self.call_metrics.observe(call_name(action), EVENT_WAIT, monotonic() - start)
             return True
         return False
 
-    def refresh_experiment(self, experiment_id: int) -> None:
+    def timed_call(self, func: Callable):
+        """Execute a call on the COM thread, recording in "call_metrics" the time spent waiting for the thread and in the call.
+
+        Args:
+            func (Callable): Wrapper around an API call to be executed.
+
+        Raises:
+            AstraError: The call failed with an HRESULT, e.g. one of "AstraErrorCode".
+
+        Returns:
+            _type_: Value returned by "func".
+        """
+        try:
+            return self._timed_call(func)
+        except AstraError:
+            raise
+        except Exception as ex:
+            if AstraError.hresult_of(ex) is None:
+                raise
+            raise AstraError.from_exception(ex, call_name(func)) from ex
+
+    def submit_timed_call(self, func: Callable) -> Future:
+        """Queue a call on the COM thread like "timed_call", without waiting for it.
+
+        Args:
+            func (Callable): Wrapper around an API call to be executed.
+
+        Returns:
+            Future: Future holding the value returned by "func", or the AstraError raised by the call.
+        """
+        name = call_name(func)
+        metrics = self.call_metrics
+        queued = monotonic()
+
+        def timed():
+            start = monotonic()
+            try:
+                return func()
+            except AstraError:
+                raise
+            except Exception as ex:
+                if AstraError.hresult_of(ex) is None:
+                    raise
+                raise AstraError.from_exception(ex, name) from ex
+            finally:
+                if metrics.enabled:
+                    metrics.observe(name, LOCK_WAIT, start - queued)
+                    metrics.observe(name, COM_CALL, monotonic() - start)
+
+        if not self.com_thread.is_current():
+            return self.com_thread.submit(timed)
+        # Waiting for a queued call on the COM thread would never return, the call is executed now.
+        future = Future()
+        try:
+            future.set_result(timed())
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    def _timed_call(self, func: Callable):
+        metrics = self.call_metrics
+        if not metrics.enabled:
+            return self.com_thread.call(func)
+        times = []
+
+        def timed():
+            times.append(monotonic())
+            try:
+                return func()
+            finally:
+                times.append(monotonic())
+
+        queued = monotonic()
+        try:
+            return self.com_thread.call(timed)
+        finally:
+            if times:
+                name = call_name(func)
+                metrics.observe(name, LOCK_WAIT, times[0] - queued)
+                metrics.observe(name, COM_CALL, times[-1] - times[0])
+
+    def refresh_experiment(self, experiment_id: int, names: list[str] = None) -> None:
         """Update experiment with its current state
 
         Args:
             experiment_id (int): The experiment to update
+            names (list[str], optional): Settings to read, see "Experiment.read". Defaults to None (all settings).
         """
+        experiment = self.get_internal_experiment(experiment_id)
+        experiment.read(names)
         with rlock:
-            experiment = self.get_internal_experiment(experiment_id)
-            experiment.read()
             self.experiment_status_changed.notify_observers(experiment)
 
+    def refresh_loaded_experiment(self, experiment_id: int) -> None:
+        """Update an experiment registered by "register_experiment" once it is read and run.
+        Its Read and Run events may have been handled before its wrapper was registered, it is marked ready.
+
+        Args:
+            experiment_id (int): The experiment to update
+        """
+        with rlock:
+            experiment = self.get_internal_experiment(experiment_id)
+            if experiment is not None and experiment.status == ExperimentStatus.BUSY:
+                experiment.status = ExperimentStatus.READY
+        self.refresh_experiment(experiment_id)
+
+    def synchronize_experiment(self, experiment_id: int, name: str, value) -> None:
+        """Record a setting successfully sent to ASTRA in the open experiment, so that it does not
+        have to be read back nor sent again by "Experiment.apply".
+
+        Args:
+            experiment_id (int): ID of experiment.
+            name (str): Name of the setting, see "Experiment.dirty_fields".
+            value (_type_): Value sent to ASTRA.
+        """
+        with rlock:
+            experiment = self.get_internal_experiment(experiment_id)
+            if experiment is None:
+                return
+            if name == "sample":
+                for field in fields(SampleInfo):
+                    experiment.synchronize(f"sample.{field.name}", getattr(value, field.name))
+            else:
+                experiment.synchronize(name, value)
+
     def bool_to_int(self, state: bool) -> int:
         """Helper function to convert boolean value to integer
 
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Errors reported by ASTRA, see "Appendix A: ASTRA Error Codes" of the ASTRA Automation API.
+"""
+from enum import IntEnum
+
+
+class AstraErrorCode(IntEnum):
+    """ASTRA-specific HRESULTs, as exported in the type library."""
+    E_EXP_TMPLNOTFOUND = 0x80040201
+    E_EXP_BADHANDLE = 0x80040202
+    E_EXP_INVALID = 0x80040203
+    E_EXP_RUNNING = 0x80040204
+    E_EXP_FLOWMODEONLY = 0x80040205
+    E_EXP_NOCONFIG = 0x80040206
+    E_EXP_NOPUMP = 0x80040207
+    E_EXP_NOINJECTOR = 0x80040208
+    E_EXP_NOSAMPLE = 0x80040209
+    E_SYS_INSTRUMENTS = 0x8004020A
+    E_SYS_ACCESSDENIED = 0x8004020B
+    E_LIC_DISABLED = 0x8004020C
+    E_FILE_CORRUPT = 0x8004020D
+    E_DB_NOT_MIGRATED = 0x8004020E
+    E_UV_NOT_DETECTED = 0x8004020F
+    E_UV_INVALID_CONFIG = 0x80040210
+    E_UV_INVALID_DATA = 0x80040211
+    E_FILE_NAME_EXISTS = 0x80040212
+    E_FILE_CHECKED_OUT = 0x80040213
+    E_FILE_SAVE_FAILED = 0x80040214
+    E_EXP_NO_COLLECTED_DATA = 0x80040215
+    E_EXP_NO_RESULTS = 0x80040216
+    E_EXP_RESULTS_SAVE_FAILED = 0x80040217
+    E_EXP_NO_DATASET = 0x80040218
+    E_EXP_DATASET_SAVE_FAILED = 0x80040219
+    E_EXP_RUN_EXPERIMENT_FAILED = 0x8004021A
+    E_EXP_AUTOFIND_BASELINES_FAILED = 0x8004021B
+    E_EXP_AUTOFIND_PEAKS_FAILED = 0x8004021C
+    E_ASTRA_NOT_SHOWN = 0x8004021D
+    E_REQUEST_OUT_OF_SEQUENCE = 0x8004021E
+    E_EXP_FAILED_TO_OPEN = 0x8004021F
+    E_UNEXPECTED_ASTRA_ERROR = 0x80040220
+    E_EXP_CONFIGURATION_UPDATE_FAILED = 0x80040221
+    E_NULL_ARGUMENT = 0x80040222
+    E_SYS_LOAD_METHODS_FAILED = 0x80040223
+    E_EXP_CREATION_FAILED = 0x80040224
+    E_EXP_GET_INFO_FAILED = 0x80040225
+    E_EXP_BASIC_COLLECTION_NOT_FOUND = 0x80040226
+    E_EXP_CANNOT_VIEW_BASIC_COLLECTION = 0x80040227
+    E_EXP_PROCEDURE_UPDATE_FAILED = 0x80040228
+    E_EXP_STOP_COLLECTION_FAILED = 0x80040229
+    E_NOT_ENOUGH_MEMORY = 0x8004022A
+    E_ASTRA_ALREADY_IN_USE = 0x8004022B
+    E_SIZE_MISMATCH = 0x8004022C
+
+    @property
+    def description(self) -> str:
+        return error_descriptions[self]
+
+
+error_descriptions = {
+    AstraErrorCode.E_EXP_TMPLNOTFOUND: "Method not found.",
+    AstraErrorCode.E_EXP_BADHANDLE: "Invalid experiment ID.",
+    AstraErrorCode.E_EXP_INVALID: "Experiment validation failure.",
+    AstraErrorCode.E_EXP_RUNNING: "Cannot modify running experiment.",
+    AstraErrorCode.E_EXP_FLOWMODEONLY: "Operation requires flow mode experiment.",
+    AstraErrorCode.E_EXP_NOCONFIG: "Experiment configuration not found.",
+    AstraErrorCode.E_EXP_NOPUMP: "Pump not found in configuration.",
+    AstraErrorCode.E_EXP_NOINJECTOR: "Injector not found in configuration.",
+    AstraErrorCode.E_EXP_NOSAMPLE: "Injected sample not found in configuration.",
+    AstraErrorCode.E_SYS_INSTRUMENTS: "Instrument hardware detection not finished.",
+    AstraErrorCode.E_SYS_ACCESSDENIED: "Insufficient privileges to perform operation.",
+    AstraErrorCode.E_LIC_DISABLED: "Missing license feature activation key.",
+    AstraErrorCode.E_FILE_CORRUPT: "Cannot read file. File is either from a new version of ASTRA or corrupt.",
+    AstraErrorCode.E_DB_NOT_MIGRATED: "ASTRA system database is currently migrating. Wait a few moments and try again.",
+    AstraErrorCode.E_UV_NOT_DETECTED: "No VISION UV instrument was found in configuration.",
+    AstraErrorCode.E_UV_INVALID_CONFIG: "Invalid configuration provided for the VISION UV.",
+    AstraErrorCode.E_UV_INVALID_DATA: "UV data does not match expected input.",
+    AstraErrorCode.E_FILE_NAME_EXISTS: "An attempt was made to save and the file name already existed.",
+    AstraErrorCode.E_FILE_CHECKED_OUT: "This file is locked for editing by another user.",
+    AstraErrorCode.E_FILE_SAVE_FAILED: "Unexpected file save failure.",
+    AstraErrorCode.E_EXP_NO_COLLECTED_DATA: "Experiment did not collect any data.",
+    AstraErrorCode.E_EXP_NO_RESULTS: "Failed to extract results from experiment.",
+    AstraErrorCode.E_EXP_RESULTS_SAVE_FAILED: "Failed to save results.",
+    AstraErrorCode.E_EXP_NO_DATASET: "Cannot find dataset from experiment.",
+    AstraErrorCode.E_EXP_DATASET_SAVE_FAILED: "Failed to save dataset.",
+    AstraErrorCode.E_EXP_RUN_EXPERIMENT_FAILED: "Failed to run experiment.",
+    AstraErrorCode.E_EXP_AUTOFIND_BASELINES_FAILED: "Failed to autofind baselines.",
+    AstraErrorCode.E_EXP_AUTOFIND_PEAKS_FAILED: "Failed to autofind peaks.",
+    AstraErrorCode.E_ASTRA_NOT_SHOWN: "Failed to show ASTRA main window.",
+    AstraErrorCode.E_REQUEST_OUT_OF_SEQUENCE: "Before using this ASTRA functionality, you need to call SetAutomationIdentity.",
+    AstraErrorCode.E_EXP_FAILED_TO_OPEN: "Failed to allocate experiment's slot before opening it.",
+    AstraErrorCode.E_UNEXPECTED_ASTRA_ERROR: "ASTRA failed for an unknown reason. Check the ASTRA log file for more details.",
+    AstraErrorCode.E_EXP_CONFIGURATION_UPDATE_FAILED: "Failed to update configuration with new parameters.",
+    AstraErrorCode.E_NULL_ARGUMENT: "Got a null argument when a non-null one was expected.",
+    AstraErrorCode.E_SYS_LOAD_METHODS_FAILED: "Failed to load methods from the ASTRA system database.",
+    AstraErrorCode.E_EXP_CREATION_FAILED: "Failed to create a new experiment from a method.",
+    AstraErrorCode.E_EXP_GET_INFO_FAILED: "Failed to retrieve some experiment details (such as name, pump flow, injected volume, ...).",
+    AstraErrorCode.E_EXP_BASIC_COLLECTION_NOT_FOUND: "Could not find the Basic Collection Procedure in experiment.",
+    AstraErrorCode.E_EXP_CANNOT_VIEW_BASIC_COLLECTION: "Could not view the Basic Collection Procedure.",
+    AstraErrorCode.E_EXP_PROCEDURE_UPDATE_FAILED: "Could not update procedure to force waiting on auto-inject signal.",
+    AstraErrorCode.E_EXP_STOP_COLLECTION_FAILED: "Failed to stop the collection.",
+    AstraErrorCode.E_NOT_ENOUGH_MEMORY: "Not enough memory to complete current operation.",
+    AstraErrorCode.E_ASTRA_ALREADY_IN_USE: "ASTRA is already in use by another client. Please close the other client or ASTRA and restart this ASTRA client.",
+    AstraErrorCode.E_SIZE_MISMATCH: "Source and destination size does not match.",
+}
+
+
+class AstraError(Exception):
+    """Failure of a call to ASTRA, raised by "AstraAdmin.try_get" and "AstraAdmin.try_execute"
+    with the original error (e.g. "comtypes.COMError") as its cause.
+    """
+
+    def __init__(self, method: str, hresult: int = None, message: str = "", details: str = None) -> None:
+        """Constructor.
+
+        Args:
+            method (str): Name of the ASTRA method that failed.
+            hresult (int, optional): HRESULT of the failure, as an unsigned value. Defaults to None (not a COM error).
+            message (str, optional): Description of the failure. Defaults to "".
+            details (str, optional): Additional details reported by the server. Defaults to None.
+        """
+        self.method = method
+        self.hresult = hresult
+        self.details = details
+        try:
+            self.code = AstraErrorCode(hresult)
+        except ValueError:
+            self.code = None
+        if not message and self.code is not None:
+            message = self.code.description
+        self.message = message
+        super().__init__(f"{method} failed: {message}" if hresult is None else f"{method} failed (0x{hresult:08X}): {message}")
+
+    @classmethod
+    def from_exception(cls, ex: Exception, method: str) -> "AstraError":
+        """Describe the error raised by a call to ASTRA.
+
+        Args:
+            ex (Exception): Error raised by the call, e.g. "comtypes.COMError".
+            method (str): Name of the ASTRA method called.
+
+        Returns:
+            AstraError: Error with the HRESULT and the ASTRA error code of "ex", if any.
+        """
+        if isinstance(ex, AstraError):
+            return ex
+        hresult = cls.hresult_of(ex)
+        if hresult is None:
+            return cls(method, None, str(ex) or type(ex).__name__)
+        text = getattr(ex, "text", None) or (ex.args[1] if len(ex.args) > 1 and isinstance(ex.args[1], str) else "")
+        details = getattr(ex, "details", None) or (ex.args[2] if len(ex.args) > 2 else None)
+        return cls(method, hresult, text, details)
+
+    @staticmethod
+    def hresult_of(ex: Exception) -> int:
+        """Get the HRESULT of a COM error.
+
+        Args:
+            ex (Exception): Error raised by a call to ASTRA.
+
+        Returns:
+            int: HRESULT as an unsigned value, None if "ex" is not a COM error.
+        """
+        # comtypes.COMError and the errors of the fake and replay backends have the arguments (hresult, text, details).
+        hresult = getattr(ex, "hresult", None)
+        if hresult is None and ex.args and isinstance(ex.args[0], int):
+            hresult = ex.args[0]
+        if not isinstance(hresult, int) or isinstance(hresult, bool):
+            return None
+        return hresult & 0xFFFFFFFF
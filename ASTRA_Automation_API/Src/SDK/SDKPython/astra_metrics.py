@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Latency histograms of the calls made to ASTRA by "AstraAdmin".
+
+Each call is split in three phases:
+    - lock_wait: time waiting for the COM thread, which serializes all calls to ASTRA,
+    - com_call: time spent in ASTRA,
+    - event_wait: time waiting for the event ending the call, e.g. ExperimentRun after a setting changed.
+
+The histograms are read with "AstraAdmin.metrics", or scraped in the Prometheus text format
+from the endpoint started by "serve_metrics".
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import partial
+from threading import Lock, Thread
+from typing import Callable
+
+LOCK_WAIT = "lock_wait"
+COM_CALL = "com_call"
+EVENT_WAIT = "event_wait"
+
+PHASES = (LOCK_WAIT, COM_CALL, EVENT_WAIT)
+
+# Upper bounds of the histogram buckets, in seconds.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+@dataclass
+class HistogramSnapshot:
+    """Counters of a histogram. "counts[i]" is the number of observations in (bounds[i - 1], bounds[i]],
+    the last count being the number of observations above the last bound.
+    """
+    bounds: tuple[float, ...]
+    counts: list[int]
+    count: int = 0
+    sum: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile, interpolating linearly within its bucket.
+
+        Args:
+            q (float): Quantile, between 0 and 1.
+
+        Returns:
+            float: Estimated value in seconds, 0 if there is no observation.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / count, self.max)
+            cumulative += count
+        return self.max
+
+
+class Histogram:
+    """Histogram of durations, with fixed buckets. Not thread safe, see "MetricsRegistry"."""
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self.bounds, list(self.counts), self.count, self.sum, self.max)
+
+
+@dataclass
+class CallMetrics:
+    """Latencies of the calls to an ASTRA method, by phase."""
+    lock_wait: HistogramSnapshot
+    com_call: HistogramSnapshot
+    event_wait: HistogramSnapshot
+
+
+@dataclass
+class MetricsSnapshot:
+    """Latencies of the calls to ASTRA, by method name."""
+    calls: dict[str, CallMetrics] = field(default_factory=dict)
+
+    def total(self, phase: str) -> float:
+        """Get the time spent in a phase across all methods.
+
+        Args:
+            phase (str): LOCK_WAIT, COM_CALL or EVENT_WAIT.
+
+        Returns:
+            float: Total time in seconds.
+        """
+        return sum(getattr(metrics, phase).sum for metrics in self.calls.values())
+
+
+class MetricsRegistry:
+    """Histograms of the call latencies, by method name and phase. Thread safe."""
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        # Set to False to skip the measurements.
+        self.enabled = True
+        self._lock = Lock()
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+
+    def observe(self, name: str, phase: str, duration: float) -> None:
+        """Record the duration of a phase of a call.
+
+        Args:
+            name (str): Name of the ASTRA method called.
+            phase (str): LOCK_WAIT, COM_CALL or EVENT_WAIT.
+            duration (float): Duration in seconds.
+        """
+        key = (name, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.bounds)
+            histogram.observe(duration)
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Get a copy of all histograms.
+
+        Returns:
+            MetricsSnapshot: Latencies by method name, phases without observation being empty.
+        """
+        with self._lock:
+            copies = {key: histogram.snapshot() for key, histogram in self._histograms.items()}
+        snapshot = MetricsSnapshot()
+        for name in sorted({name for name, _ in copies}):
+            snapshot.calls[name] = CallMetrics(
+                *(copies.get((name, phase)) or Histogram(self.bounds).snapshot() for phase in PHASES)
+            )
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+def call_name(func: Callable) -> str:
+    """Get the name of the ASTRA method called by a wrapper such as "lambda: self.astra_com.GetSample(experiment_id)".
+
+    Args:
+        func (Callable): Function passed to "AstraAdmin.try_get" or "AstraAdmin.try_execute".
+
+    Returns:
+        str: Name of the first method called on "astra_com" or "astra_sp_com", name of "func" otherwise.
+    """
+    if isinstance(func, partial):
+        func = func.func
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return getattr(func, "__name__", type(func).__name__)
+    name = _call_names.get(code)
+    if name is None:
+        name = code.co_name
+        names = code.co_names
+        for index, attribute in enumerate(names[:-1]):
+            if attribute in ("astra_com", "astra_sp_com"):
+                name = names[index + 1]
+                break
+        _call_names[code] = name
+    return name
+
+
+_call_names: dict = {}
+
+
+def prometheus_text(snapshot: MetricsSnapshot, prefix: str = "astra_call") -> str:
+    """Format a snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot (MetricsSnapshot): Latencies to format.
+        prefix (str, optional): Prefix of the metric names. Defaults to "astra_call".
+
+    Returns:
+        str: One "<prefix>_<phase>_seconds" histogram per phase, labelled by method.
+    """
+    lines = []
+    for phase in PHASES:
+        metric = f"{prefix}_{phase}_seconds"
+        lines.append(f"# HELP {metric} Duration of the {phase.replace('_', ' ')} phase of the calls to ASTRA.")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, metrics in snapshot.calls.items():
+            histogram: HistogramSnapshot = getattr(metrics, phase)
+            if histogram.count == 0:
+                continue
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{method="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{method="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{method="{name}"}} {histogram.sum}')
+            lines.append(f'{metric}_count{{method="{name}"}} {histogram.count}')
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(registry: MetricsRegistry, port: int = 9464, address: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve the histograms of a registry in the Prometheus text format, on a background thread.
+
+    Args:
+        registry (MetricsRegistry): Registry to serve, e.g. "AstraAdmin.call_metrics".
+        port (int, optional): Port to listen on. Defaults to 9464.
+        address (str, optional): Address to listen on, "" for all interfaces. Defaults to "127.0.0.1" (this machine only).
+
+    Returns:
+        ThreadingHTTPServer: Running server, call "shutdown" to stop it.
+    """
+    # Imported here rather than with the module, which is imported by astra_admin.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = prometheus_text(registry.snapshot()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    Thread(target=server.serve_forever, name="AstraMetrics", daemon=True).start()
+    return server
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Timeline of the phases of collections and of the work around them.
+
+"AstraAdmin.tracer" records a span for each phase of a collection (start_collection,
+preparing_for_collection, waiting_for_auto_inject, collecting, post_run) and for the preparation,
+save and close of the experiments. Spans use "time.monotonic" timestamps and carry the ID of their
+experiment. They can be exported to the Chrome trace format (chrome://tracing, Perfetto) or to
+OpenTelemetry JSON (OTLP), e.g.:
+
+    AstraAdmin.tracer.save_chrome_trace("sequence.trace.json")
+"""
+import json
+import os
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock, current_thread
+from time import monotonic, time
+from typing import Iterator
+
+# Phases of a collection, each one running from the first event to the second one (names of ExperimentEventType).
+COLLECTION_PHASES = (
+    ("start_collection", "START_COLLECTION", "PREPARING_FOR_COLLECTION"),
+    ("preparing_for_collection", "PREPARING_FOR_COLLECTION", "WAITING_FOR_AUTO_INJECT"),
+    ("waiting_for_auto_inject", "WAITING_FOR_AUTO_INJECT", "COLLECTION_STARTED"),
+    ("collecting", "COLLECTION_STARTED", "COLLECTION_FINISHED"),
+    ("post_run", "COLLECTION_FINISHED", "RUN"),
+)
+
+
+@dataclass
+class Span:
+    """Phase of the work on an experiment, timestamps being "time.monotonic" values in seconds."""
+    name: str
+    start: float
+    end: float
+    experiment_id: int = None
+    thread: str = None
+    attributes: dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """Record spans in memory. Thread safe."""
+
+    def __init__(self, max_spans: int = 100000) -> None:
+        """Constructor.
+
+        Args:
+            max_spans (int, optional): Number of spans kept, the oldest ones are dropped beyond that. Defaults to 100000.
+        """
+        # Set to False to skip the recording.
+        self.enabled = True
+        self._lock = Lock()
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        # Offset from "time.monotonic" to the Unix time, for the exports.
+        self._epoch = time() - monotonic()
+        # Experiment IDs are reused across ASTRA sessions, OpenTelemetry trace IDs also depend on the tracer.
+        self._trace_prefix = os.urandom(8).hex()
+
+    def record(self, name: str, start: float, end: float, experiment_id: int = None, **attributes) -> None:
+        """Add a span measured by the caller.
+
+        Args:
+            name (str): Name of the phase.
+            start (float): Start of the phase, "time.monotonic" value.
+            end (float): End of the phase, "time.monotonic" value.
+            experiment_id (int, optional): ID of the experiment. Defaults to None.
+            attributes: Values describing the phase, e.g. the path of a saved experiment.
+        """
+        if not self.enabled:
+            return
+        span = Span(name, start, end, experiment_id, current_thread().name, attributes)
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, experiment_id: int = None, **attributes) -> Iterator[dict]:
+        """Record the duration of a block as a span.
+
+        Example:
+            with tracer.span("save", experiment_id, path=path):
+                admin.save_experiment(experiment_id, path)
+
+        Args:
+            name (str): Name of the phase.
+            experiment_id (int, optional): ID of the experiment. Defaults to None.
+            attributes: Values describing the phase.
+
+        Yields:
+            dict: Attributes of the span, that the block can complete.
+        """
+        start = monotonic()
+        try:
+            yield attributes
+        finally:
+            self.record(name, start, monotonic(), experiment_id, **attributes)
+
+    def record_collection(self, experiment_id: int, event_times: dict[str, float]) -> None:
+        """Add the spans of the phases of a collection, see "COLLECTION_PHASES".
+
+        Args:
+            experiment_id (int): ID of the experiment.
+            event_times (dict[str, float]): Time each event was received, by ExperimentEventType name,
+                "START_COLLECTION" being the time StartCollection was called. Phases with a missing event are skipped.
+        """
+        for name, first, second in COLLECTION_PHASES:
+            if first in event_times and second in event_times:
+                self.record(name, event_times[first], event_times[second], experiment_id)
+
+    def spans(self, experiment_id: int = None) -> list[Span]:
+        """Get the recorded spans.
+
+        Args:
+            experiment_id (int, optional): Only get the spans of this experiment. Defaults to None (all spans).
+
+        Returns:
+            list[Span]: Spans, in the order they ended.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        if experiment_id is not None:
+            spans = [span for span in spans if span.experiment_id == experiment_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def to_chrome_trace(self) -> dict:
+        """Export the spans to the Chrome trace event format, one row per experiment.
+
+        Returns:
+            dict: Trace, to be serialized as JSON.
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            args = dict(span.attributes, thread=span.thread)
+            if span.experiment_id is not None:
+                args["experiment_id"] = span.experiment_id
+            events.append({
+                "name": span.name,
+                "cat": "astra",
+                "ph": "X",
+                "ts": (span.start + self._epoch) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.experiment_id if span.experiment_id is not None else 0,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otel(self, service_name: str = "astra-sdk") -> dict:
+        """Export the spans to OpenTelemetry JSON (OTLP), one trace per experiment.
+
+        Args:
+            service_name (str, optional): Name of the service emitting the spans. Defaults to "astra-sdk".
+
+        Returns:
+            dict: Spans, to be serialized as JSON.
+        """
+        spans = []
+        for span in self.spans():
+            attributes = [_otel_attribute("thread.name", span.thread)]
+            if span.experiment_id is not None:
+                attributes.append(_otel_attribute("astra.experiment_id", span.experiment_id))
+            attributes += [_otel_attribute(key, value) for key, value in span.attributes.items()]
+            spans.append({
+                "traceId": f"{self._trace_prefix}{(span.experiment_id or 0) & 0xFFFFFFFFFFFFFFFF:016x}",
+                "spanId": os.urandom(8).hex(),
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(int((span.start + self._epoch) * 1e9)),
+                "endTimeUnixNano": str(int((span.end + self._epoch) * 1e9)),
+                "attributes": attributes,
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otel_attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": "astra_trace"}, "spans": spans}],
+            }]
+        }
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Save the spans to a Chrome trace file.
+
+        Args:
+            path (str): Location of the file.
+        """
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+    def save_otel(self, path: str, service_name: str = "astra-sdk") -> None:
+        """Save the spans to an OpenTelemetry JSON file.
+
+        Args:
+            path (str): Location of the file.
+            service_name (str, optional): Name of the service emitting the spans. Defaults to "astra-sdk".
+        """
+        with open(path, "w") as file:
+            json.dump(self.to_otel(service_name), file)
+
+
+def _otel_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio front-end of the ASTRA Automation API.
+"""
+import asyncio
+
+from concurrent.futures import Future
+from typing import Callable
+
+from astra_admin import AstraAdmin, ExperimentEventType, ExperimentStatus
+
+
+class AsyncAstraAdmin:
+    """Coroutine version of the long-running AstraAdmin operations.
+
+    COM calls are queued on the AstraAdmin COM thread and ASTRA events are awaited through
+    the per-experiment futures of "AstraAdmin.event_router", so no thread is blocked while
+    an experiment is being read, run, saved or collected.
+    """
+
+    def __init__(self, admin: AstraAdmin = None) -> None:
+        """Constructor.
+
+        Args:
+            admin (AstraAdmin, optional): AstraAdmin to use. Defaults to None (the AstraAdmin singleton).
+        """
+        self.admin = admin if admin is not None else AstraAdmin()
+
+    async def call(self, func: Callable, *args):
+        """Execute "func" on the COM thread. Should only be used for calls that do not wait for an ASTRA event.
+
+        Args:
+            func (Callable): Function to execute, typically an AstraAdmin method.
+            args: Arguments of "func".
+
+        Returns:
+            _type_: Value returned by "func".
+        """
+        return await asyncio.wrap_future(self.admin.submit(func, *args))
+
+    async def wait_future(self, future: Future, timeout: float = None) -> bool:
+        """Wait for a future returned by "AstraAdmin.event_router".
+
+        Args:
+            future (Future): Future returned by "event_router.expect" or "event_router.arm".
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the event was received, false if the timeout expired or the experiment was closed.
+        """
+        wrapped = asyncio.wrap_future(future)
+        done, _ = await asyncio.wait({wrapped}, timeout=timeout)
+        if not done:
+            # Also cancels "future" so that it does not claim a later event.
+            wrapped.cancel()
+            return False
+        return not wrapped.cancelled()
+
+    async def wait_experiment_event(
+        self, experiment_id: int, event_type: ExperimentEventType, timeout: float = None
+    ) -> bool:
+        """Wait for the next event "event_type" of experiment with ID "experiment_id".
+
+        Args:
+            experiment_id (int): ID of experiment.
+            event_type (ExperimentEventType): Event to wait for.
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the event was received, false if the timeout expired.
+        """
+        return await self.wait_future(self.admin.event_router.expect(experiment_id, event_type), timeout)
+
+    async def new_experiment_from_template(self, template_path: str, timeout: float = None) -> int:
+        """Create new experiment from template.
+
+        Args:
+            template_path (str): Location of template in system database.
+            timeout (float, optional): Maximum time to wait for the experiment to be loaded, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            int: ID of a newly created experiment, -1 if it could not be created or loaded in time.
+        """
+        experiment_id = await self.call(
+            self.admin.register_experiment,
+            lambda: self.admin.astra_com.NewExperimentFromTemplate(template_path),
+            ExperimentStatus.BUSY,
+        )
+        return await self._wait_experiment_loaded(experiment_id, timeout)
+
+    async def open_experiment(self, file_name: str, timeout: float = None) -> int:
+        """Open an experiment from location "file_name".
+
+        Args:
+            file_name (str): Location of experiment to open.
+            timeout (float, optional): Maximum time to wait for the experiment to be loaded, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            int: ID of experiment if successfully opened, -1 otherwise.
+        """
+        experiment_id = await self.call(
+            self.admin.register_experiment, lambda: self.admin.astra_com.OpenExperiment(file_name)
+        )
+        return await self._wait_experiment_loaded(experiment_id, timeout)
+
+    async def _wait_experiment_loaded(self, experiment_id: int, timeout: float) -> int:
+        if experiment_id <= 0:
+            return -1
+        if not await self.wait_experiment_event(experiment_id, ExperimentEventType.READ, timeout):
+            return -1
+        if not await self.wait_experiment_event(experiment_id, ExperimentEventType.RUN, timeout):
+            return -1
+        await self.call(self.admin.refresh_loaded_experiment, experiment_id)
+        return experiment_id
+
+    async def save_experiment(self, experiment_id: int, file_name: str, timeout: float = None) -> bool:
+        """Save experiment with ID "experiment_id" to location "file_name".
+
+        Args:
+            experiment_id (int): ID of experiment to save.
+            file_name (str): File location where experiment should be saved.
+            timeout (float, optional): Maximum time to wait for the experiment to be written, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True when file is successfully saved, false otherwise.
+        """
+        experiment_write = await self.call(self.admin.request_save_experiment, experiment_id, file_name)
+        if experiment_write is None:
+            return False
+        return await self.wait_future(experiment_write, timeout)
+
+    async def close_experiment(self, experiment_id: int, timeout: float = None) -> bool:
+        """Close experiment with ID "experiment_id".
+
+        Args:
+            experiment_id (int): ID of experiment to close.
+            timeout (float, optional): Maximum time to wait for the experiment to be closed, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True upon successful close, false otherwise.
+        """
+        experiment_closed = await self.call(self.admin.request_close_experiment, experiment_id)
+        if experiment_closed is None:
+            return False
+        return await self.wait_future(experiment_closed, timeout)
+
+    async def start_collection(self, experiment_id: int) -> bool:
+        """Start the collection of experiment with ID "experiment_id". Use the collection waits to follow its progress.
+
+        Args:
+            experiment_id (int): ID of experiment.
+
+        Returns:
+            bool: True if call was successful, false otherwise.
+        """
+        return await self.call(self.admin.start_collection, experiment_id)
+
+    async def stop_collection(self, experiment_id: int) -> bool:
+        """Stop collection of experiment with ID "experiment_id".
+
+        Args:
+            experiment_id (int): ID of experiment.
+
+        Returns:
+            bool: True if call was successful, false otherwise.
+        """
+        return await self.call(self.admin.stop_collection, experiment_id)
+
+    async def run_experiment(self, experiment_id: int, timeout: float = None) -> bool:
+        """Run experiment with ID "experiment_id".
+
+        Args:
+            experiment_id (int): ID of experiment.
+            timeout (float, optional): Maximum time to wait for the run to complete, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if call was successful, false otherwise.
+        """
+        experiment_run = self.admin.event_router.arm(experiment_id, ExperimentEventType.RUN)
+        if not await self.call(
+            self.admin.try_execute, lambda: self.admin.astra_com.RunExperiment(experiment_id)
+        ):
+            experiment_run.cancel()
+            return False
+        return await self.wait_future(experiment_run, timeout)
+
+    async def wait_experiment_run(self, experiment_id: int, timeout: float = None) -> bool:
+        """Wait until experiment is fully run, e.g. after the end of a collection."""
+        return await self.wait_experiment_event(experiment_id, ExperimentEventType.RUN, timeout)
+
+    async def wait_preparing_for_collection(self, experiment_id: int, timeout: float = None) -> bool:
+        """Wait until collection is fully validated."""
+        return await self.wait_experiment_event(experiment_id, ExperimentEventType.PREPARING_FOR_COLLECTION, timeout)
+
+    async def wait_waiting_for_auto_inject(self, experiment_id: int, timeout: float = None) -> bool:
+        """Wait until the waiting for auto-inject message is sent."""
+        return await self.wait_experiment_event(experiment_id, ExperimentEventType.WAITING_FOR_AUTO_INJECT, timeout)
+
+    async def wait_collection_started(self, experiment_id: int, timeout: float = None) -> bool:
+        """Wait until collection starts."""
+        return await self.wait_experiment_event(experiment_id, ExperimentEventType.COLLECTION_STARTED, timeout)
+
+    async def wait_collection_finished(self, experiment_id: int, timeout: float = None) -> bool:
+        """Wait until collection is finished (or aborted)."""
+        return await self.wait_experiment_event(experiment_id, ExperimentEventType.COLLECTION_FINISHED, timeout)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Backends creating the objects behind "AstraAdmin".
+
+The "com" backend talks to ASTRA through COM and requires Windows and comtypes. The "fake"
+backend (see "fake_astra") runs an in-process stand-in of ASTRA, so that the wrapper can be
+exercised and benchmarked without ASTRA or instruments. The "replay" backend (see "session_journal")
+plays back a recorded session, read from "ASTRA_REPLAY_JOURNAL" at the speed "ASTRA_REPLAY_SPEED"
+(as fast as possible if not set). The backend is selected by the "ASTRA_BACKEND" environment
+variable, "com" by default.
+"""
+import os
+import sys
+
+
+class ComBackend:
+    """Backend using the ASTRA COM servers.
+    """
+
+    name = "com"
+
+    # Waiting on the thread owning the COM objects has to dispatch COM messages.
+    pumps_messages = True
+
+    def initialize(self) -> None:
+        """Initialize COM on the calling thread, as a single-threaded apartment."""
+        import comtypes
+
+        comtypes.CoInitialize()
+
+    def uninitialize(self) -> None:
+        """Uninitialize COM on the calling thread."""
+        import comtypes
+
+        comtypes.CoUninitialize()
+
+    def create_object(self, prog_id: str):
+        """Create a COM object.
+
+        Args:
+            prog_id (str): ProgID of the COM class.
+
+        Returns:
+            _type_: The COM object.
+        """
+        import comtypes.client
+
+        return comtypes.client.CreateObject(prog_id)
+
+    def get_events(self, source, sink):
+        """Connect "sink" to the events of "source".
+
+        Args:
+            source (_type_): COM object firing events.
+            sink (_type_): Object implementing the event handlers.
+
+        Returns:
+            _type_: Connection to keep alive as long as events should be received.
+        """
+        from comtypes.client import GetEvents
+
+        return GetEvents(source, sink)
+
+    # Has the NumPy support of comtypes been enabled?
+    _numpy_enabled = False
+
+    def double_array(self, values):
+        """Prepare a SAFEARRAY(double) argument. NumPy arrays are passed as a contiguous float64 buffer,
+        which comtypes copies into the SAFEARRAY at once instead of creating a VARIANT per element.
+
+        Args:
+            values (_type_): Sequence of doubles, or NumPy array.
+
+        Returns:
+            _type_: Flat float64 NumPy array, a view of "values" when it already is one; "values" if it is not a NumPy array.
+        """
+        numpy = sys.modules.get("numpy")
+        if numpy is None or not isinstance(values, numpy.ndarray):
+            return values
+        if not ComBackend._numpy_enabled:
+            try:
+                from comtypes import npsupport
+
+                npsupport.enable()
+            except (ImportError, AttributeError):
+                # Versions of comtypes before 1.2 support NumPy arrays as soon as NumPy is importable.
+                pass
+            ComBackend._numpy_enabled = True
+        return numpy.ascontiguousarray(values, dtype=numpy.float64).ravel()
+
+    def uv_device_details(self) -> type:
+        """Get the UvDeviceDetails structure of the ASTRA type library.
+
+        Returns:
+            type: UvDeviceDetails class.
+        """
+        import comtypes.gen
+
+        # If this ever fail, check uuid for Astra from Astra.idl file.
+        return comtypes.gen._368D43B2_3A78_4EB0_93D1_5339084555E2_0_1_0.UvDeviceDetails
+
+
+def get_backend(name: str = None):
+    """Get a backend by name.
+
+    Args:
+        name (str, optional): "com", "fake" or "replay". Defaults to None (value of "ASTRA_BACKEND", "com" if not set).
+
+    Returns:
+        _type_: The backend.
+    """
+    if name is None:
+        name = os.environ.get("ASTRA_BACKEND", ComBackend.name)
+    name = name.lower()
+    if name == ComBackend.name:
+        return ComBackend()
+    if name == "fake":
+        from fake_astra import FakeBackend
+
+        return FakeBackend()
+    if name == "replay":
+        from session_journal import ReplayBackend
+
+        speed = os.environ.get("ASTRA_REPLAY_SPEED")
+        return ReplayBackend(os.environ["ASTRA_REPLAY_JOURNAL"], float(speed) if speed else None)
+    raise ValueError(f"Unknown ASTRA backend '{name}'")
@@ -6,6 +6,8 @@ import uuid
 from threading import Thread
 
 from astra_admin import AstraAdmin, BaselineDetails, BaselineType, PeakRange, SampleInfo, AstraMethodInfo
+from sequence_journal import SequenceJournal
+from sequence_runner import PipelinedSequenceRunner, read_sequence_csv
 
 class SdkCommandLineApp:
     """Example program of the ASTRA Automation API, showing how to collect data, get and set peaks and baselines and get results and data sets.
@@ -114,52 +116,18 @@ class SdkCommandLineApp:
         while not os.path.exists(export_path):
             export_path = input("Directory does not exist.\nEnter path:")
 
-        lines = open(path, 'r').readlines()
-        for line in lines:
-            if len(line) == 0:
-                continue
-
-            # values store data from a row in the csv file, where
-            # values[0]: Enable
-            # values[1]: Name
-            # values[2]: Description
-            # values[3]: Injection
-            # values[4]: Method
-            # values[5]: Duration (minutes)
-            # values[6]: Injection Volume (microL)
-            # values[7]: dn/dc (mL/g)
-            # values[8]: A2 (mol mL/g^2)
-            # values[9]: UV Ext (mL/(mg cm)))
-            # values[10]: Concentration (mg/mL)
-            # values [11]: Flow Rate (mL/min)
-            values = line.split(',')
-
-            if len(values) != 12 or values[0] == "FALSE":
-                continue
-
-            injection = int(values[3])
-
-            for i in range(1, injection+1):
-                # Run sequence row data collection, which creates experiment from template and then runs the experiment
-                template = values[4]
-                duration = float(values[5])
-                injected_volume = float(values[6])
-                flow_rate = float(values[11])
-
-                sample_info = SampleInfo(
-                    name=values[1],
-                    description=values[2],
-                    dndc=float(values[7]),
-                    a2=float(values[8]),
-                    uvExtinction=float(values[9]),
-                    concentration=float(values[10])
-                )
-
-                exp_file_name = sample_info.name if len(sample_info.name) > 0 else "untitled"
-                if injection > 1:
-                    exp_file_name += f" ({i} of {injection})"
-
-                AstraAdmin().collect_data(template, os.path.join(export_path, exp_file_name), sample_info, duration, injected_volume, flow_rate, print)
+        # Progress is journaled next to the experiments, running the same sequence again resumes it.
+        journal_path = os.path.join(export_path, f"{os.path.splitext(os.path.basename(path))[0]}.journal")
+        if os.path.exists(journal_path):
+            answer = input("This sequence was already started, resume it? [Y/n]:")
+            if answer.strip().lower() in ("n", "no"):
+                os.remove(journal_path)
+
+        # Experiments of the next rows are created while the current one is collecting,
+        # and saved in the background once collected.
+        rows = read_sequence_csv(path, export_path)
+        with SequenceJournal(journal_path) as journal:
+            PipelinedSequenceRunner(progress_update=print, journal=journal).run(rows)
 
     def start_collection_and_provide_info_at_the_end(self) -> None:
         """Run a sequence from configuration given in a CSV file, then save to experiment files.
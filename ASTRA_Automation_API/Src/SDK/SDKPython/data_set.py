@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar parser for the datasets returned by "AstraAdmin.get_data_set".
+Requires NumPy.
+"""
+import io
+import re
+import warnings
+
+from dataclasses import dataclass, field
+
+import numpy
+
+
+# "rms radius (nm)" -> ("rms radius", "nm")
+_column_pattern = re.compile(r"^\s*(.*?)\s*\(([^()]*)\)\s*$")
+
+
+@dataclass
+class DataSetArray:
+    """Dataset as a 2D array of values, one column per dataset column.
+    """
+    names: list[str]
+    units: list[str]
+    values: numpy.ndarray
+    header: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def __getitem__(self, name: str) -> numpy.ndarray:
+        """Get a column by name, with or without its unit, e.g. "rms radius" or "rms radius (nm)".
+
+        Args:
+            name (str): Name of the column.
+
+        Returns:
+            numpy.ndarray: Values of the column, a view on "values".
+        """
+        return self.values[:, self.index(name)]
+
+    def index(self, name: str) -> int:
+        """Get the index of a column.
+
+        Args:
+            name (str): Name of the column, with or without its unit.
+
+        Returns:
+            int: Index of the column in "values".
+        """
+        for index, (column_name, unit) in enumerate(zip(self.names, self.units)):
+            if name == column_name or (unit and name == f"{column_name} ({unit})"):
+                return index
+        raise KeyError(name)
+
+    def as_dict(self) -> dict[str, numpy.ndarray]:
+        """Get the dataset as a dictionary of columns.
+
+        Returns:
+            dict[str, numpy.ndarray]: Values of each column, keyed by column name.
+        """
+        return {name: self.values[:, index] for index, name in enumerate(self.names)}
+
+
+def parse_column(column: str) -> tuple[str, str]:
+    """Split a column title into its name and unit.
+
+    Args:
+        column (str): Column title, e.g. "volume (mL)".
+
+    Returns:
+        tuple[str, str]: Name and unit of the column, the unit is empty if the title has none.
+    """
+    match = _column_pattern.match(column)
+    if match is None:
+        return column.strip(), ""
+    return match.group(1), match.group(2)
+
+
+def parse_data_set(text: str) -> DataSetArray:
+    """Parse a dataset in one pass over its numeric part.
+
+    The lines preceding the first numeric line are the header, the last of them holding the column
+    titles, and the lines following the last numeric line are skipped. Empty values, and the values
+    missing at the end of a short row, are read as NaN.
+
+    Args:
+        text (str): Dataset, values delimited by comma.
+
+    Returns:
+        DataSetArray: Parsed dataset.
+    """
+    text = text.replace("\r", "")
+    lines = text.split("\n", 64)
+
+    # Locate the first numeric line without splitting the whole text.
+    header_size = 0
+    offset = 0
+    for line in lines[:-1]:
+        if _is_numeric(line):
+            break
+        header_size += 1
+        offset += len(line) + 1
+    header = lines[:header_size]
+    body = text[offset:].strip("\n")
+
+    titles = header[-1].split(",") if header else []
+    columns = [parse_column(title) for title in titles]
+    column_count = len(columns) if columns else (body.split("\n", 1)[0].count(",") + 1 if body else 0)
+    if not columns:
+        columns = [(f"column {index}", "") for index in range(column_count)]
+
+    values = _parse_values(body, column_count)
+    return DataSetArray(
+        names=[name for name, _ in columns],
+        units=[unit for _, unit in columns],
+        values=values,
+        header=header[:-1],
+    )
+
+
+def _is_numeric(line: str) -> bool:
+    first = line.split(",", 1)[0].strip()
+    if not first:
+        return False
+    try:
+        float(first)
+        return True
+    except ValueError:
+        return False
+
+
+def _parse_values(body: str, column_count: int) -> numpy.ndarray:
+    if not body or column_count == 0:
+        return numpy.empty((0, column_count))
+
+    row_count = body.count("\n") + 1
+    # Fast path: all values present, the whole body is parsed as a single flat sequence.
+    values = None
+    if ",," not in body:
+        with warnings.catch_warnings():
+            # Text that cannot be read to its end is handled below: NumPy warned about it before 2.3, and raises since.
+            warnings.simplefilter("ignore", DeprecationWarning)
+            try:
+                values = numpy.fromstring(body.replace("\n", ","), sep=",")
+            except ValueError:
+                values = None
+    if values is not None and values.size == row_count * column_count:
+        return values.reshape(row_count, column_count)
+
+    # Missing values, trailing delimiters or footer lines. The footer lines, e.g. "End of data", are skipped
+    # and short rows are padded, so that every numeric line gives a row.
+    lines = [line for line in body.split("\n") if line.strip()]
+    while lines and not _is_numeric(lines[-1]):
+        lines.pop()
+    if not lines:
+        return numpy.empty((0, column_count))
+    lines = [line + "," * (column_count - 1 - line.count(",")) if line.count(",") < column_count - 1 else line for line in lines]
+    values = numpy.genfromtxt(io.StringIO("\n".join(lines)), delimiter=",", usecols=range(column_count), dtype=float)
+    return values.reshape(-1, column_count)
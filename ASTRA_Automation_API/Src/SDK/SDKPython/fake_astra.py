@@ -0,0 +1,800 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in of the ASTRA automation servers, used by the "fake" backend.
+
+"FakeAstra" implements the documented IAstra methods on in-memory experiments and fires the
+"_IAstraEvents_*" events in the same order as ASTRA, after configurable latencies, from its own
+thread. Collected experiments return synthetic datasets and results. It requires neither Windows
+nor ASTRA, so that "AstraAdmin" can be exercised and benchmarked anywhere:
+
+    ASTRA_BACKEND=fake python my_benchmark.py
+"""
+import heapq
+import math
+import os
+import traceback
+
+from dataclasses import dataclass, field, replace
+from itertools import count
+from threading import Condition, Lock, Thread
+from time import monotonic, sleep
+from typing import Callable
+from xml.etree import ElementTree
+
+from astra_errors import AstraErrorCode, error_descriptions
+
+
+# ASTRA error codes used by the fake servers.
+E_EXP_TMPLNOTFOUND = AstraErrorCode.E_EXP_TMPLNOTFOUND
+E_EXP_BADHANDLE = AstraErrorCode.E_EXP_BADHANDLE
+E_EXP_RUNNING = AstraErrorCode.E_EXP_RUNNING
+E_SYS_INSTRUMENTS = AstraErrorCode.E_SYS_INSTRUMENTS
+E_UV_NOT_DETECTED = AstraErrorCode.E_UV_NOT_DETECTED
+E_UV_INVALID_DATA = AstraErrorCode.E_UV_INVALID_DATA
+E_EXP_NO_COLLECTED_DATA = AstraErrorCode.E_EXP_NO_COLLECTED_DATA
+E_EXP_NO_RESULTS = AstraErrorCode.E_EXP_NO_RESULTS
+E_EXP_NO_DATASET = AstraErrorCode.E_EXP_NO_DATASET
+E_REQUEST_OUT_OF_SEQUENCE = AstraErrorCode.E_REQUEST_OUT_OF_SEQUENCE
+E_ASTRA_ALREADY_IN_USE = AstraErrorCode.E_ASTRA_ALREADY_IN_USE
+E_SIZE_MISMATCH = AstraErrorCode.E_SIZE_MISMATCH
+
+
+class FakeComError(Exception):
+    """Error raised by the fake servers, with the same arguments as "comtypes.COMError":
+    HRESULT (signed), text and details.
+    """
+
+    def __init__(self, code: int, details: str = None) -> None:
+        hresult = code - (1 << 32) if code & 0x80000000 else code
+        text = error_descriptions.get(code, "Unspecified error")
+        super().__init__(hresult, text, details)
+        self.hresult = hresult
+        self.text = text
+        self.details = details
+
+
+# Structures of the ASTRA type library.
+@dataclass
+class SampleInfo:
+    name: str = ""
+    description: str = ""
+    dndc: float = 0.0
+    a2: float = 0.0
+    uvExtinction: float = 0.0
+    concentration: float = 0.0
+
+
+@dataclass
+class BaselinePoint:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@dataclass
+class BaselineDetails:
+    seriesName: str = ""
+    type: str = "Automatic"
+    start: BaselinePoint = field(default_factory=BaselinePoint)
+    end: BaselinePoint = field(default_factory=BaselinePoint)
+
+
+@dataclass
+class PeakRange:
+    number: int = 0
+    start: float = 0.0
+    end: float = 0.0
+
+
+@dataclass
+class UvChannelDetails:
+    useChannel: int = 1
+    waveLength: float = 280.0
+    bandwidth: float = 4.0
+    useReference: int = 0
+    refWaveLength: float = 0.0
+    refBandwidth: float = 0.0
+
+
+@dataclass
+class UvDeviceDetails:
+    deviceName: str = ""
+    deviceModel: str = ""
+    supportsPeakWidth: int = 0
+    peakWidth: float = 0.0
+    supportsSlitWidth: int = 0
+    slitWidth: float = 0.0
+    supportsRequireLampUV: int = 0
+    requireLampUV: int = 0
+    supportsRequireLampVis: int = 0
+    requireLampVis: int = 0
+    uvChannels: list = field(default_factory=list)
+
+
+@dataclass
+class LogonResult:
+    isValid: int = 1
+    errorMessage: str = ""
+    errorDetails: str = ""
+
+
+@dataclass
+class ActiveUserInfo:
+    userId: str = ""
+    fullUserName: str = ""
+    localDomain: str = ""
+
+
+@dataclass
+class FakeLatencies:
+    """Time, in seconds, taken by the fake ASTRA before firing each event, and added to every method call.
+    """
+    call: float = 0.0
+    instrument_detection: float = 0.0
+    read: float = 0.0
+    run: float = 0.0
+    write: float = 0.0
+    close: float = 0.0
+    preparing_for_collection: float = 0.0
+    waiting_for_auto_inject: float = 0.0
+    collection_started: float = 0.0
+    # Time per minute of collection duration, i.e. 0.0 finishes collections right away and 60.0 in real time.
+    collection_minute: float = 0.0
+
+
+@dataclass
+class _FakeExperiment:
+    id: int
+    name: str
+    description: str = ""
+    collection_duration: float = 30.0
+    flow_rate: float = 0.5
+    injected_volume: float = 0.1
+    sample: SampleInfo = field(default_factory=lambda: SampleInfo(name="BSA", dndc=0.185, concentration=1.0))
+    running: bool = False
+    collecting: bool = False
+    has_data: bool = False
+    use_instrument_calibration_constant: int = 1
+    auto_autofind_baselines: int = 1
+    auto_autofind_peaks: int = 1
+    baselines: list[BaselineDetails] = field(default_factory=list)
+    peaks: list[PeakRange] = field(default_factory=list)
+    fraction_results: dict[int, str] = field(default_factory=dict)
+    vision_uv: UvDeviceDetails = None
+    vision_uv_points: int = 0
+    # Incremented when a collection is started or stopped, so that events of a stopped collection are dropped.
+    generation: int = 0
+    data_set: str = None
+
+
+class EventScheduler:
+    """Single thread calling functions at a given time, in order."""
+
+    def __init__(self, name: str) -> None:
+        self._queue = []
+        self._sequence = count()
+        self._condition = Condition()
+        self._stopped = False
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay: float, func: Callable, *args) -> None:
+        with self._condition:
+            heapq.heappush(self._queue, (monotonic() + delay, next(self._sequence), func, args))
+            self._condition.notify()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._queue:
+                        wait_time = self._queue[0][0] - monotonic()
+                        if wait_time <= 0:
+                            break
+                    else:
+                        wait_time = None
+                    self._condition.wait(wait_time)
+                if self._stopped:
+                    return
+                _, _, func, args = heapq.heappop(self._queue)
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+
+
+class FakeConnection:
+    """Connection of an event sink, returned by "FakeBackend.get_events"."""
+
+    def __init__(self, source: "FakeAstra", sink) -> None:
+        self.source = source
+        self.sink = sink
+
+    def disconnect(self) -> None:
+        self.source._sinks.discard(self.sink)
+
+    def __del__(self) -> None:
+        self.disconnect()
+
+
+class FakeAstra:
+    """Stand-in of "WTC.ASTRA8.Application.1".
+    """
+
+    templates = [
+        "//localhost/System/Methods/Light Scattering/Online/Default",
+        "//localhost/System/Methods/Light Scattering/Online/Conformation",
+        "//localhost/System/Methods/Protein Conjugate/Online/Default",
+    ]
+
+    # Methods that can be called before "SetAutomationIdentity".
+    _anonymous_methods = {"GetVersion", "RequestQuit", "SetAutomationIdentity", "Show", "IsEmbedded"}
+
+    def __init__(
+        self,
+        latencies: FakeLatencies = None,
+        data_points: int = 1000,
+        detectors: tuple[str, ...] = ("LS 90°", "RI", "UV"),
+        vision_uv: bool = False,
+        require_identity: bool = True,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            latencies (FakeLatencies, optional): Latencies of calls and events. Defaults to None (no latency).
+            data_points (int, optional): Number of rows of the datasets. Defaults to 1000.
+            detectors (tuple[str, ...], optional): Name of the detector columns of the datasets. Defaults to light scattering, RI and UV.
+            vision_uv (bool, optional): Do experiments have a VISION UV detector? Defaults to False.
+            require_identity (bool, optional): Fail calls made before "SetAutomationIdentity", as ASTRA does. Defaults to True.
+        """
+        self.latencies = latencies if latencies is not None else FakeLatencies()
+        self.data_points = data_points
+        self.detectors = detectors
+        self.vision_uv = vision_uv
+        self.require_identity = require_identity
+
+        self.InstrumentsDetected = 0
+        # Set by "RequestQuit", another instance can then be created.
+        self.quit_requested = False
+        self._identity = None
+        self._experiments: dict[int, _FakeExperiment] = {}
+        self._next_id = count(1)
+        self._lock = Lock()
+        self._sinks = set()
+        self._scheduler = EventScheduler("FakeAstraEvents")
+        self._scheduler.schedule(self.latencies.instrument_detection, self._on_instruments_detected)
+
+    def __getattribute__(self, name: str):
+        # Every IAstra method (capitalized) goes through the identity check and the call latency.
+        if name[:1].isupper() and name != "InstrumentsDetected":
+            if self.require_identity and self._identity is None and name not in self._anonymous_methods:
+                raise FakeComError(E_REQUEST_OUT_OF_SEQUENCE)
+            if self.latencies.call > 0:
+                sleep(self.latencies.call)
+        return super().__getattribute__(name)
+
+    # Events
+    def connect(self, sink) -> FakeConnection:
+        self._sinks.add(sink)
+        return FakeConnection(self, sink)
+
+    def _fire(self, event: str, *args) -> None:
+        for sink in list(self._sinks):
+            handler = getattr(sink, f"_IAstraEvents_{event}", None)
+            if handler is not None:
+                handler(*args)
+
+    def _on_instruments_detected(self) -> None:
+        self.InstrumentsDetected = 1
+        self._fire("InstrumentDetectionCompleted")
+
+    def _schedule_run(self, experiment: _FakeExperiment, delay: float = 0.0) -> None:
+        experiment.running = True
+        self._scheduler.schedule(delay + self.latencies.run, self._on_run, experiment)
+
+    def _on_run(self, experiment: _FakeExperiment) -> None:
+        experiment.running = False
+        self._fire("ExperimentRun", experiment.id)
+
+    def _schedule_load(self, experiment: _FakeExperiment) -> None:
+        experiment.running = True
+
+        def on_read():
+            self._fire("ExperimentRead", experiment.id)
+            self._schedule_run(experiment)
+
+        self._scheduler.schedule(self.latencies.read, on_read)
+
+    def _get(self, experiment_id: int) -> _FakeExperiment:
+        experiment = self._experiments.get(experiment_id)
+        if experiment is None:
+            raise FakeComError(E_EXP_BADHANDLE, f"Experiment {experiment_id} is not opened.")
+        return experiment
+
+    def _get_idle(self, experiment_id: int) -> _FakeExperiment:
+        experiment = self._get(experiment_id)
+        if experiment.running:
+            raise FakeComError(E_EXP_RUNNING)
+        return experiment
+
+    def _add_experiment(self, name: str, has_data: bool) -> _FakeExperiment:
+        with self._lock:
+            experiment = _FakeExperiment(id=next(self._next_id), name=name, has_data=has_data)
+            self._experiments[experiment.id] = experiment
+        if has_data:
+            self._autofind(experiment)
+        if self.vision_uv:
+            experiment.vision_uv = UvDeviceDetails(deviceName="VISION UV", uvChannels=[UvChannelDetails()])
+        return experiment
+
+    def _autofind(self, experiment: _FakeExperiment) -> None:
+        end = experiment.collection_duration
+        if experiment.auto_autofind_baselines:
+            experiment.baselines = [
+                BaselineDetails(seriesName=detector, start=BaselinePoint(0.05 * end, 0.0), end=BaselinePoint(0.95 * end, 0.0))
+                for detector in self.detectors
+            ]
+        if experiment.auto_autofind_peaks:
+            experiment.peaks = [PeakRange(number=1, start=0.4 * end, end=0.6 * end)]
+
+    # Application
+    def GetVersion(self) -> str:
+        return "8.2.0.105"
+
+    def SetAutomationIdentity(self, name, version, pid, uid, enabled, *args) -> None:
+        self._identity = (name, version, pid, uid, enabled)
+
+    def GetAutomationUid(self) -> str:
+        return self._identity[3]
+
+    def GetAutomationClientInfo(self) -> str:
+        return f"{self._identity[0]} {self._identity[1]}"
+
+    def GetAutomationClientProcessId(self) -> int:
+        return self._identity[2]
+
+    def GetWindowHandle(self) -> int:
+        return 0
+
+    def IsEmbedded(self) -> int:
+        return 1
+
+    def Show(self, show: int) -> None:
+        pass
+
+    def RequestQuit(self) -> None:
+        self.quit_requested = True
+        self._scheduler.stop()
+
+    def ValidateLogon(self, user_id: str, password: str, domain: str) -> LogonResult:
+        return LogonResult()
+
+    def GetDataDatabaseDirectory(self, root_path: str) -> list[str]:
+        return []
+
+    def GetExperimentTemplates(self) -> list[str]:
+        return list(self.templates)
+
+    # Experiments
+    def NewExperimentFromTemplate(self, template_path: str) -> int:
+        if template_path not in self.templates:
+            raise FakeComError(E_EXP_TMPLNOTFOUND, template_path)
+        experiment = self._add_experiment(os.path.basename(template_path.replace("\\", "/")), has_data=False)
+        self._schedule_load(experiment)
+        return experiment.id
+
+    def OpenExperiment(self, file_name: str) -> int:
+        name = os.path.splitext(os.path.basename(file_name.replace("\\", "/")))[0]
+        experiment = self._add_experiment(name, has_data=True)
+        self._schedule_load(experiment)
+        return experiment.id
+
+    def RunExperiment(self, experiment_id: int) -> None:
+        self._schedule_run(self._get(experiment_id))
+
+    def SaveExperiment(self, experiment_id: int, file_name: str) -> None:
+        experiment = self._get(experiment_id)
+        experiment.name = os.path.splitext(os.path.basename(file_name.replace("\\", "/")))[0]
+        self._scheduler.schedule(self.latencies.write, self._fire, "ExperimentWrite", experiment_id)
+
+    def SaveExperimentWithDescription(self, experiment_id: int, file_name: str, description: str) -> None:
+        self._get(experiment_id).description = description
+        self.SaveExperiment(experiment_id, file_name)
+
+    def CloseExperiment(self, experiment_id: int) -> None:
+        with self._lock:
+            experiment = self._get(experiment_id)
+            del self._experiments[experiment_id]
+        # Drop the events of a collection in progress.
+        experiment.generation += 1
+        self._scheduler.schedule(self.latencies.close, self._fire, "ExperimentClosed", experiment_id)
+
+    def GetExperimentName(self, experiment_id: int) -> str:
+        return self._get(experiment_id).name
+
+    def GetExperimentDescription(self, experiment_id: int) -> str:
+        return self._get(experiment_id).description
+
+    def SetExperimentDescription(self, experiment_id: int, description: str) -> None:
+        self._get_idle(experiment_id).description = description
+
+    def GetIsExperimentRunning(self, experiment_id: int) -> int:
+        return int(self._get(experiment_id).running)
+
+    def HasCollectedData(self, experiment_id: int) -> int:
+        return int(self._get(experiment_id).has_data)
+
+    def ValidateExperiment(self, experiment_id: int) -> tuple[str, int]:
+        self._get(experiment_id)
+        return "", 1
+
+    def UseInstrumentCalibrationConstant(self, experiment_id: int, state: int) -> None:
+        self._get_idle(experiment_id).use_instrument_calibration_constant = state
+
+    def GetCollectionDuration(self, experiment_id: int) -> float:
+        return self._get(experiment_id).collection_duration
+
+    def SetCollectionDuration(self, experiment_id: int, duration: float) -> None:
+        experiment = self._get(experiment_id)
+        if not experiment.collecting:
+            experiment = self._get_idle(experiment_id)
+        # -1 during a collection: collect until StopCollection.
+        experiment.collection_duration = duration
+
+    def GetPumpFlowRate(self, experiment_id: int) -> float:
+        return self._get(experiment_id).flow_rate
+
+    def SetPumpFlowRate(self, experiment_id: int, flow_rate: float) -> None:
+        experiment = self._get_idle(experiment_id)
+        experiment.flow_rate = flow_rate
+        self._schedule_run(experiment)
+
+    def GetInjectedVolume(self, experiment_id: int) -> float:
+        return self._get(experiment_id).injected_volume
+
+    def SetInjectedVolume(self, experiment_id: int, injected_volume: float) -> None:
+        experiment = self._get_idle(experiment_id)
+        experiment.injected_volume = injected_volume
+        self._schedule_run(experiment)
+
+    # Sample
+    def GetSample(self, experiment_id: int) -> SampleInfo:
+        return replace(self._get(experiment_id).sample)
+
+    def SetSample(self, experiment_id: int, sample) -> None:
+        experiment = self._get_idle(experiment_id)
+        experiment.sample = SampleInfo(
+            name=sample.name,
+            description=sample.description,
+            dndc=sample.dndc,
+            a2=sample.a2,
+            uvExtinction=sample.uvExtinction,
+            concentration=sample.concentration,
+        )
+        self._schedule_run(experiment)
+
+    def _set_sample_field(self, experiment_id: int, name: str, value, run: bool) -> None:
+        experiment = self._get_idle(experiment_id)
+        setattr(experiment.sample, name, value)
+        if run:
+            self._schedule_run(experiment)
+
+    def GetSampleName(self, experiment_id: int) -> str:
+        return self._get(experiment_id).sample.name
+
+    def SetSampleName(self, experiment_id: int, name: str) -> None:
+        self._set_sample_field(experiment_id, "name", name, run=False)
+
+    def GetSampleDescription(self, experiment_id: int) -> str:
+        return self._get(experiment_id).sample.description
+
+    def SetSampleDescription(self, experiment_id: int, description: str) -> None:
+        self._set_sample_field(experiment_id, "description", description, run=False)
+
+    def GetSampleDndc(self, experiment_id: int) -> float:
+        return self._get(experiment_id).sample.dndc
+
+    def SetSampleDndc(self, experiment_id: int, dndc: float) -> None:
+        self._set_sample_field(experiment_id, "dndc", dndc, run=True)
+
+    def GetSampleA2(self, experiment_id: int) -> float:
+        return self._get(experiment_id).sample.a2
+
+    def SetSampleA2(self, experiment_id: int, a2: float) -> None:
+        self._set_sample_field(experiment_id, "a2", a2, run=True)
+
+    def GetSampleUvExtinction(self, experiment_id: int) -> float:
+        return self._get(experiment_id).sample.uvExtinction
+
+    def SetSampleUvExtinction(self, experiment_id: int, uv_extinction: float) -> None:
+        self._set_sample_field(experiment_id, "uvExtinction", uv_extinction, run=True)
+
+    def GetSampleConcentration(self, experiment_id: int) -> float:
+        return self._get(experiment_id).sample.concentration
+
+    def SetSampleConcentration(self, experiment_id: int, concentration: float) -> None:
+        self._set_sample_field(experiment_id, "concentration", concentration, run=True)
+
+    # Collection
+    def StartCollection(self, experiment_id: int) -> None:
+        if not self.InstrumentsDetected:
+            raise FakeComError(E_SYS_INSTRUMENTS)
+        experiment = self._get_idle(experiment_id)
+        experiment.running = True
+        experiment.collecting = True
+        experiment.generation += 1
+        generation = experiment.generation
+        latencies = self.latencies
+
+        def step(event: str, delay: float, next_step: Callable = None) -> Callable:
+            def fire():
+                if experiment.generation != generation:
+                    return
+                self._fire(event, experiment.id)
+                if next_step is not None:
+                    next_step()
+
+            return lambda: self._scheduler.schedule(delay, fire)
+
+        def on_finished():
+            experiment.collecting = False
+            experiment.has_data = True
+            experiment.data_set = None
+            self._autofind(experiment)
+
+        def finish():
+            if experiment.generation != generation or experiment.collection_duration < 0:
+                return
+            on_finished()
+            self._fire("CollectionFinished", experiment.id)
+            self._schedule_run(experiment)
+
+        collection_time = experiment.collection_duration * latencies.collection_minute
+        start = step(
+            "PreparingForCollection",
+            latencies.preparing_for_collection,
+            step(
+                "WaitingForAutoInject",
+                latencies.waiting_for_auto_inject,
+                step(
+                    "CollectionStarted",
+                    latencies.collection_started,
+                    lambda: self._scheduler.schedule(collection_time, finish),
+                ),
+            ),
+        )
+        start()
+
+    def StopCollection(self, experiment_id: int) -> None:
+        experiment = self._get(experiment_id)
+        if not experiment.collecting:
+            return
+        experiment.generation += 1
+        experiment.collecting = False
+        # Data collected so far is kept and the experiment is run, as at the end of a collection.
+        experiment.has_data = True
+        experiment.data_set = None
+        self._autofind(experiment)
+        self._scheduler.schedule(0.0, self._fire, "CollectionAborted", experiment_id)
+        self._schedule_run(experiment)
+
+    # VISION UV
+    def HasVisionUv(self, experiment_id: int) -> int:
+        return int(self._get(experiment_id).vision_uv is not None)
+
+    def SetupVisionUv(self, experiment_id: int, device_details) -> None:
+        experiment = self._get_idle(experiment_id)
+        if experiment.vision_uv is None:
+            raise FakeComError(E_UV_NOT_DETECTED)
+        experiment.vision_uv = device_details
+        self._schedule_run(experiment)
+
+    def PushVisionUvData(self, experiment_id: int, channel_count: int, data) -> None:
+        experiment = self._get(experiment_id)
+        if experiment.vision_uv is None:
+            raise FakeComError(E_UV_NOT_DETECTED)
+        # Each sample is the time followed by the value of each channel.
+        if channel_count <= 0 or len(data) % (channel_count + 1) != 0:
+            raise FakeComError(E_UV_INVALID_DATA)
+        experiment.vision_uv_points += len(data) // (channel_count + 1)
+
+    # Baselines and peaks
+    def SetAutoAutofindBaselines(self, experiment_id: int, state: int) -> None:
+        self._get(experiment_id).auto_autofind_baselines = state
+
+    def SetAutoAutofindPeaks(self, experiment_id: int, state: int) -> None:
+        self._get(experiment_id).auto_autofind_peaks = state
+
+    def GetBaselines(self, experiment_id: int) -> list[BaselineDetails]:
+        return [
+            replace(baseline, start=replace(baseline.start), end=replace(baseline.end))
+            for baseline in self._get(experiment_id).baselines
+        ]
+
+    def UpdateBaselines(self, experiment_id: int, baselines: list) -> None:
+        experiment = self._get_idle(experiment_id)
+        if len(baselines) != len(experiment.baselines):
+            raise FakeComError(E_SIZE_MISMATCH)
+        experiment.baselines = [
+            BaselineDetails(
+                seriesName=baseline.seriesName,
+                type=baseline.type,
+                start=BaselinePoint(baseline.start.x, baseline.start.y),
+                end=BaselinePoint(baseline.end.x, baseline.end.y),
+            )
+            for baseline in baselines
+        ]
+
+    def GetPeakRanges(self, experiment_id: int) -> list[PeakRange]:
+        return [replace(peak) for peak in self._get(experiment_id).peaks]
+
+    def AddPeakRange(self, experiment_id: int, start: float, end: float) -> None:
+        experiment = self._get_idle(experiment_id)
+        experiment.peaks.append(PeakRange(number=len(experiment.peaks) + 1, start=start, end=end))
+
+    def UpdatePeakRange(self, experiment_id: int, peak) -> None:
+        experiment = self._get_idle(experiment_id)
+        for index, existing in enumerate(experiment.peaks):
+            if existing.number == peak.number:
+                experiment.peaks[index] = PeakRange(number=peak.number, start=peak.start, end=peak.end)
+                return
+        raise FakeComError(E_SIZE_MISMATCH, f"Peak {peak.number} not found.")
+
+    def RemovePeakRange(self, experiment_id: int, peak_number: int) -> None:
+        experiment = self._get_idle(experiment_id)
+        experiment.peaks = [peak for peak in experiment.peaks if peak.number != peak_number]
+        for number, peak in enumerate(experiment.peaks, 1):
+            peak.number = number
+
+    # Data
+    def GetDataSet(self, experiment_id: int, definition_name: str) -> str:
+        experiment = self._get(experiment_id)
+        if not experiment.has_data:
+            raise FakeComError(E_EXP_NO_DATASET, definition_name)
+        if experiment.data_set is None:
+            experiment.data_set = self._make_data_set(experiment)
+        return experiment.data_set
+
+    def SaveDataSet(self, experiment_id: int, definition_name: str, file_name: str) -> None:
+        data_set = self.GetDataSet(experiment_id, definition_name)
+        with open(file_name, "w", encoding="utf-8") as file:
+            file.write(data_set)
+
+    def GetResults(self, experiment_id: int) -> str:
+        experiment = self._get(experiment_id)
+        if not experiment.has_data:
+            raise FakeComError(E_EXP_NO_RESULTS)
+        return self._make_results(experiment)
+
+    def GetResultsSnapshot(self, experiment_id: int) -> str:
+        return self.GetResults(experiment_id)
+
+    def SaveResults(self, experiment_id: int, file_name: str) -> None:
+        results = self.GetResults(experiment_id)
+        with open(file_name, "w", encoding="utf-8") as file:
+            file.write(results)
+
+    def AddFractionResult(self, experiment_id: int, index: int, fraction_result_json: str) -> None:
+        self._get(experiment_id).fraction_results[int(index)] = fraction_result_json
+
+    def GetFractionResult(self, experiment_id: int, index: int) -> str:
+        result = self._get(experiment_id).fraction_results.get(int(index))
+        if result is None:
+            raise FakeComError(E_EXP_NO_RESULTS, f"Fraction result {index} not found.")
+        return result
+
+    # Synthetic data: a single gaussian peak eluting at mid-collection, with a log-linear calibration.
+    def _molar_mass(self, experiment: _FakeExperiment, time: float) -> float:
+        return 10 ** (7.0 - 4.0 * time / experiment.collection_duration)
+
+    def _make_data_set(self, experiment: _FakeExperiment) -> str:
+        duration = experiment.collection_duration
+        center = 0.5 * duration
+        width = 0.05 * duration
+        scale = experiment.sample.concentration * experiment.injected_volume
+        rows = [experiment.name, ",".join(["time (min)"] + [f"{name} (V)" for name in self.detectors] + ["molar mass (g/mol)"])]
+        step = duration / max(self.data_points - 1, 1)
+        for index in range(self.data_points):
+            time = index * step
+            signal = scale * math.exp(-0.5 * ((time - center) / width) ** 2)
+            values = [time] + [signal * (detector_index + 1) for detector_index in range(len(self.detectors))]
+            values.append(self._molar_mass(experiment, time))
+            rows.append(",".join(f"{value:.6g}" for value in values))
+        return "\n".join(rows) + "\n"
+
+    def _make_results(self, experiment: _FakeExperiment) -> str:
+        root = ElementTree.Element("results", {"experiment": experiment.name})
+        procedure = ElementTree.SubElement(root, "procedure", {"name": "Molar Mass & Radius from LS"})
+        for peak in experiment.peaks:
+            element = ElementTree.SubElement(procedure, "peak", {"number": str(peak.number)})
+            mw = self._molar_mass(experiment, 0.45 * peak.start + 0.55 * peak.end)
+            mn = self._molar_mass(experiment, 0.5 * (peak.start + peak.end)) * 0.9
+            for name, unit, value in (
+                ("Mw", "g/mol", mw),
+                ("Mn", "g/mol", mn),
+                ("Mw/Mn", "", mw / mn),
+                ("rh(avg)", "nm", 0.02 * mw ** 0.45),
+            ):
+                ElementTree.SubElement(
+                    element, "result", {"name": name, "unit": unit, "value": f"{value:.6g}", "uncertainty": "0.1"}
+                )
+        return ElementTree.tostring(root, encoding="unicode")
+
+
+class FakeAstraSP:
+    """Stand-in of "Wyatt.AstraSP.1", the security pack being disabled.
+    """
+
+    def __init__(self) -> None:
+        self.security_pack_active = 0
+
+    def SetAutomationIdentity(self, *args) -> None:
+        pass
+
+    def IsSecurityPackActive(self) -> int:
+        return self.security_pack_active
+
+    def EnableSecurityPack(self, state: int) -> None:
+        self.security_pack_active = state
+
+    def SetupDatabaseConnection(self, database_name: str, username: str, password: str) -> None:
+        pass
+
+    def IsLoggedIn(self) -> int:
+        return 1
+
+    def ValidateLogon(self, user_id: str, password: str, domain: str) -> LogonResult:
+        return LogonResult()
+
+    def GetActiveUserInfo(self) -> ActiveUserInfo:
+        return ActiveUserInfo()
+
+    def RequestQuit(self) -> None:
+        pass
+
+
+class FakeBackend:
+    """Backend creating the fake servers. Class attributes configure the next "FakeAstra" created,
+    e.g. "FakeBackend.latencies = FakeLatencies(run=0.05)" before importing "astra_admin".
+    """
+
+    name = "fake"
+
+    # Events are fired from the FakeAstra thread, no message has to be dispatched.
+    pumps_messages = False
+
+    latencies: FakeLatencies = None
+    astra_options: dict = {}
+    # Instance of ASTRA created last.
+    _running: FakeAstra = None
+
+    def initialize(self) -> None:
+        pass
+
+    def uninitialize(self) -> None:
+        pass
+
+    def create_object(self, prog_id: str):
+        if prog_id.startswith("WTC.ASTRA"):
+            # Only one instance of ASTRA can be running at a time, until it is asked to quit.
+            running = FakeBackend._running
+            if running is not None and not running.quit_requested:
+                raise FakeComError(E_ASTRA_ALREADY_IN_USE)
+            FakeBackend._running = FakeAstra(latencies=self.latencies, **self.astra_options)
+            return FakeBackend._running
+        if prog_id.startswith("Wyatt.AstraSP"):
+            return FakeAstraSP()
+        raise FakeComError(0x80040154, f"Class not registered: {prog_id}")
+
+    def get_events(self, source: FakeAstra, sink) -> FakeConnection:
+        return source.connect(sink)
+
+    def double_array(self, values):
+        return values
+
+    def uv_device_details(self) -> type:
+        return UvDeviceDetails
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Fraction results added to the data set of an experiment by "AstraAdmin.add_fraction_result(s)".
+
+ASTRA stores each fraction result as a JSON document, e.g.:
+
+    { "DeviceId":"f9d574e2-...","Id":1,"Location":"Vial 1","VolumeSpecified":true,"Volume":0.500667,
+      "StartTime":60.02,"EndTime":90.06,"StartReason":"TimeBasedTimeSlice","EndReason":"Unknown",
+      "PeakDetectorInfos":[{"PeakDetector":{"ID":"G7121A:DEAE304354 P","DeviceType":"G7121A",
+      "SerialNumber":"DEAE304354"},"DelayTime":0.0,"PeakDetected":false}]}
+"""
+import json
+
+from dataclasses import dataclass, field
+
+from astra_errors import AstraError
+
+# Compact and without the circular reference check, the documents being built from dataclasses.
+_encoder = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(",", ":"))
+
+
+@dataclass
+class PeakDetector:
+    """Detector signaling the peaks that trigger the fractions."""
+    id: str
+    device_type: str = ""
+    serial_number: str = ""
+
+
+@dataclass
+class PeakDetectorInfo:
+    """State of a peak detector during a fraction."""
+    peak_detector: PeakDetector
+    delay_time: float = 0.0
+    peak_detected: bool = False
+
+
+@dataclass
+class FractionResult:
+    """Fraction collected during an experiment, as reported by the fraction collector."""
+    id: int
+    location: str
+    start_time: float
+    end_time: float
+    volume: float = 0.0
+    volume_specified: bool = False
+    device_id: str = ""
+    start_reason: str = "Unknown"
+    end_reason: str = "Unknown"
+    peak_detector_infos: list[PeakDetectorInfo] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Convert to the JSON object expected by ASTRA.
+
+        Returns:
+            dict: Fraction result with the ASTRA key names.
+        """
+        return {
+            "DeviceId": self.device_id,
+            "Id": self.id,
+            "Location": self.location,
+            "VolumeSpecified": self.volume_specified,
+            "Volume": self.volume,
+            "StartTime": self.start_time,
+            "EndTime": self.end_time,
+            "StartReason": self.start_reason,
+            "EndReason": self.end_reason,
+            "PeakDetectorInfos": [
+                {
+                    "PeakDetector": {
+                        "ID": info.peak_detector.id,
+                        "DeviceType": info.peak_detector.device_type,
+                        "SerialNumber": info.peak_detector.serial_number,
+                    },
+                    "DelayTime": info.delay_time,
+                    "PeakDetected": info.peak_detected,
+                }
+                for info in self.peak_detector_infos
+            ],
+        }
+
+    def to_json(self) -> str:
+        return _encoder.encode(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, value: dict) -> "FractionResult":
+        """Convert a JSON object returned by ASTRA.
+
+        Args:
+            value (dict): Fraction result with the ASTRA key names.
+
+        Returns:
+            FractionResult: Fraction result, missing keys taking their default value.
+        """
+        infos = []
+        for info in value.get("PeakDetectorInfos") or ():
+            detector = info.get("PeakDetector") or {}
+            infos.append(PeakDetectorInfo(
+                PeakDetector(detector.get("ID", ""), detector.get("DeviceType", ""), detector.get("SerialNumber", "")),
+                info.get("DelayTime", 0.0),
+                info.get("PeakDetected", False),
+            ))
+        return cls(
+            value.get("Id", 0),
+            value.get("Location", ""),
+            value.get("StartTime", 0.0),
+            value.get("EndTime", 0.0),
+            value.get("Volume", 0.0),
+            value.get("VolumeSpecified", False),
+            value.get("DeviceId", ""),
+            value.get("StartReason", "Unknown"),
+            value.get("EndReason", "Unknown"),
+            infos,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "FractionResult":
+        return cls.from_dict(json.loads(text))
+
+
+@dataclass
+class FractionResultError:
+    """Fraction result that could not be added by "AstraAdmin.add_fraction_results"."""
+    index: int
+    fraction_result: "FractionResult | str"
+    error: AstraError
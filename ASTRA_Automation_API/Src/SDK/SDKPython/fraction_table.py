@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar table of the fraction results of an experiment, returned by "AstraAdmin.get_fraction_table".
+Requires NumPy.
+"""
+import json
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy
+
+
+@dataclass
+class FractionTable:
+    """Fraction results as one array per field, row "i" of each array describing the same fraction.
+    "peak_detected[i, j]" tells whether "detectors[j]" detected a peak during fraction "i".
+    """
+    indexes: numpy.ndarray
+    ids: numpy.ndarray
+    locations: numpy.ndarray
+    volumes: numpy.ndarray
+    start_times: numpy.ndarray
+    end_times: numpy.ndarray
+    detectors: list[str] = field(default_factory=list)
+    peak_detected: numpy.ndarray = None
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def select(self, rows) -> "FractionTable":
+        """Get a subset of the fractions.
+
+        Args:
+            rows (_type_): Boolean mask or positions of the rows.
+
+        Returns:
+            FractionTable: Table with the selected rows and the same detectors.
+        """
+        return FractionTable(
+            self.indexes[rows],
+            self.ids[rows],
+            self.locations[rows],
+            self.volumes[rows],
+            self.start_times[rows],
+            self.end_times[rows],
+            self.detectors,
+            self.peak_detected[rows],
+        )
+
+    def in_window(self, start: float, end: float) -> "FractionTable":
+        """Get the fractions overlapping a time window.
+
+        Args:
+            start (float): Start of the window.
+            end (float): End of the window.
+
+        Returns:
+            FractionTable: Fractions ending after "start" and starting before "end".
+        """
+        return self.select((self.start_times < end) & (self.end_times > start))
+
+    def detected(self, detector_id: str) -> numpy.ndarray:
+        """Get the peak detection flags of a detector.
+
+        Args:
+            detector_id (str): ID of the peak detector, e.g. "G7165A:DEAC800888 P".
+
+        Returns:
+            numpy.ndarray: True for the fractions during which the detector detected a peak,
+                false for all fractions if the detector is unknown.
+        """
+        try:
+            return self.peak_detected[:, self.detectors.index(detector_id)]
+        except ValueError:
+            return numpy.zeros(len(self), dtype=bool)
+
+    def detected_by(self, detector_id: str) -> "FractionTable":
+        """Get the fractions during which a detector detected a peak.
+
+        Args:
+            detector_id (str): ID of the peak detector.
+
+        Returns:
+            FractionTable: Fractions flagged by the detector.
+        """
+        return self.select(self.detected(detector_id))
+
+
+def parse_fraction_results(indexes: Iterable[int], fraction_results_json: Iterable[str]) -> FractionTable:
+    """Decode fraction results returned by "AstraAdmin.get_fraction_result" into a table.
+
+    Args:
+        indexes (Iterable[int]): Index of each fraction result in the dataset.
+        fraction_results_json (Iterable[str]): Fraction results as json.
+
+    Returns:
+        FractionTable: One row per fraction result, one detector column per peak detector found.
+    """
+    indexes = list(indexes)
+    ids = []
+    locations = []
+    volumes = []
+    start_times = []
+    end_times = []
+    detectors: dict[str, int] = {}
+    flags = []
+    for fraction_result_json in fraction_results_json:
+        value = json.loads(fraction_result_json)
+        ids.append(value.get("Id", 0))
+        locations.append(value.get("Location", ""))
+        volumes.append(value.get("Volume", numpy.nan))
+        start_times.append(value.get("StartTime", numpy.nan))
+        end_times.append(value.get("EndTime", numpy.nan))
+        detected = []
+        for info in value.get("PeakDetectorInfos") or ():
+            # Detectors get a column in the order they are first seen, even if they never detect a peak.
+            column = detectors.setdefault((info.get("PeakDetector") or {}).get("ID", ""), len(detectors))
+            if info.get("PeakDetected"):
+                detected.append(column)
+        flags.append(detected)
+
+    peak_detected = numpy.zeros((len(flags), len(detectors)), dtype=bool)
+    for row, detected in enumerate(flags):
+        peak_detected[row, detected] = True
+    return FractionTable(
+        numpy.array(indexes, dtype=numpy.int64),
+        numpy.array(ids, dtype=numpy.int64),
+        numpy.array(locations, dtype=object),
+        numpy.array(volumes, dtype=numpy.float64),
+        numpy.array(start_times, dtype=numpy.float64),
+        numpy.array(end_times, dtype=numpy.float64),
+        list(detectors),
+        peak_detected,
+    )
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Reprocess a directory of experiments in a worker process driving ASTRA.
+
+Only one instance of ASTRA can be running at a time (see "Starting ASTRA" in the Getting Started guide),
+so the experiments are reprocessed one after the other by a single worker process, which starts ASTRA
+on its first experiment. The calling process must not be connected to ASTRA itself. To reprocess faster,
+split the experiments across several machines, each one running its own ASTRA instance.
+
+The worker isolates the caller from ASTRA: if it dies, e.g. ASTRA crashed, the experiment is reported as
+failed, the ASTRA processes left running are terminated, and the next experiment starts a new worker.
+The work done on each file is the one of "SdkCommandLineApp.process_experiment": open the experiment,
+update its baselines and peaks, run it, then save its results and dataset.
+
+    python reprocess.py C:\\Experiments C:\\Export
+"""
+import argparse
+import atexit
+import glob
+import multiprocessing
+import os
+import uuid
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Iterator
+
+from astra_admin import AstraAdmin, BaselineDetails, BaselineType
+from sdk_helper import get_astra_pids, terminate_astra
+
+
+@dataclass
+class ReprocessOptions:
+    """What to change and export for each experiment.
+    """
+    # Baselines to set, matched by series name. None keeps the baselines of the experiment.
+    baselines: list[BaselineDetails] = None
+    # Peak ranges (start, end) replacing those of the experiment. None keeps the peaks of the experiment.
+    peaks: list[tuple[float, float]] = None
+    # Dataset to save next to the results. None to skip the dataset.
+    data_set_definition: str = "mean square radius vs volume"
+    # Save the reprocessed experiment in the output directory.
+    save_experiment: bool = False
+    # Read the results into "ReprocessResult.results".
+    read_results: bool = False
+
+
+@dataclass
+class ReprocessResult:
+    """Outcome of the reprocessing of an experiment.
+    """
+    path: str
+    success: bool
+    error: str = ""
+    results_path: str = None
+    data_set_path: str = None
+    experiment_path: str = None
+    results: list = field(default_factory=list)
+    duration: float = 0.0
+    worker_pid: int = None
+
+
+# Set once ASTRA is started in the worker process.
+_worker_started = False
+
+
+def _start_worker(entity_name: str) -> None:
+    global _worker_started
+    if _worker_started:
+        return
+    admin = AstraAdmin()
+    admin.should_show_error_message_box = False
+    admin.set_automation_identity(entity_name, "1.0.0.0", os.getpid(), f"{uuid.uuid4()}", 1)
+    admin.wait_for_instruments()
+    atexit.register(admin.dispose)
+    _worker_started = True
+
+
+def _reprocess_in_worker(path: str, output_dir: str, options: ReprocessOptions, entity_name: str) -> ReprocessResult:
+    try:
+        _start_worker(entity_name)
+    except Exception as ex:
+        # Reported with this experiment, starting ASTRA is tried again with the next one.
+        return ReprocessResult(path=path, success=False, error=f"Could not start ASTRA: {ex}", worker_pid=os.getpid())
+    return reprocess_experiment(path, output_dir, options)
+
+
+def reprocess_experiment(path: str, output_dir: str, options: ReprocessOptions = None) -> ReprocessResult:
+    """Reprocess a single experiment with the ASTRA instance of the calling process.
+
+    Args:
+        path (str): Location of the experiment.
+        output_dir (str): Directory where results, dataset and experiment are saved.
+        options (ReprocessOptions, optional): Changes and exports. Defaults to None (default options).
+
+    Returns:
+        ReprocessResult: Outcome of the reprocessing.
+    """
+    options = options if options is not None else ReprocessOptions()
+    admin = AstraAdmin()
+    result = ReprocessResult(path=path, success=False, worker_pid=os.getpid())
+    start = monotonic()
+    name = os.path.splitext(os.path.basename(path))[0]
+    experiment_id = -1
+    try:
+        experiment_id = admin.open_experiment(path)
+        if experiment_id <= 0:
+            raise RuntimeError("Could not open experiment")
+
+        if options.baselines is not None:
+            _update_baselines(admin, experiment_id, options.baselines)
+        if options.peaks is not None:
+            _replace_peaks(admin, experiment_id, options.peaks)
+
+        # Changes are only reflected in the results once the experiment is run.
+        if not admin.run_experiment(experiment_id):
+            raise RuntimeError("Could not run experiment")
+
+        result.results_path = os.path.join(output_dir, f"{name}.xml")
+        if not admin.save_results(experiment_id, result.results_path):
+            raise RuntimeError("Could not save results")
+        if options.data_set_definition is not None:
+            result.data_set_path = os.path.join(output_dir, f"{name}.csv")
+            if not admin.save_data_set(experiment_id, options.data_set_definition, result.data_set_path):
+                raise RuntimeError(f"Could not save data set '{options.data_set_definition}'")
+        if options.read_results:
+            result.results = admin.read_results(experiment_id) or []
+        if options.save_experiment:
+            result.experiment_path = os.path.join(output_dir, os.path.basename(path))
+            if not admin.save_experiment(experiment_id, result.experiment_path):
+                raise RuntimeError("Could not save experiment")
+        result.success = True
+    except Exception as ex:
+        result.error = str(ex)
+    finally:
+        if experiment_id > 0:
+            try:
+                admin.close_experiment(experiment_id)
+            except Exception:
+                pass
+        result.duration = monotonic() - start
+    return result
+
+
+def _update_baselines(admin: AstraAdmin, experiment_id: int, baselines: list[BaselineDetails]) -> None:
+    by_series = {baseline.seriesName: baseline for baseline in baselines}
+    current = admin.get_baselines(experiment_id)
+    changed = False
+    for baseline in current:
+        new = by_series.get(baseline.seriesName)
+        if new is None:
+            continue
+        baseline.start.x, baseline.start.y = new.start.x, new.start.y
+        baseline.end.x, baseline.end.y = new.end.x, new.end.y
+        baseline.type = new.type.value if isinstance(new.type, BaselineType) else new.type
+        changed = True
+    if changed and not admin.update_baselines(experiment_id, current):
+        raise RuntimeError("Could not update baselines")
+
+
+def _replace_peaks(admin: AstraAdmin, experiment_id: int, peaks: list[tuple[float, float]]) -> None:
+    # Peaks are renumbered when one is removed, always remove the last one.
+    for peak in reversed(admin.get_peak_ranges(experiment_id)):
+        admin.remove_peak_range(experiment_id, peak.number)
+    for start, end in peaks:
+        if not admin.add_peak_range(experiment_id, start, end):
+            raise RuntimeError(f"Could not add peak range ({start}, {end})")
+
+
+def find_experiments(directory: str, patterns: tuple[str, ...] = ("*.afe7", "*.afe8")) -> list[str]:
+    """List the experiment files of a directory.
+
+    Args:
+        directory (str): Directory to search.
+        patterns (tuple[str, ...], optional): File patterns. Defaults to ASTRA 7 and ASTRA 8 experiments.
+
+    Returns:
+        list[str]: Sorted paths of the experiments.
+    """
+    return sorted(path for pattern in patterns for path in glob.glob(os.path.join(directory, pattern)))
+
+
+def iter_reprocess(
+    paths: list[str],
+    output_dir: str,
+    options: ReprocessOptions = None,
+    entity_name: str = "ASTRA Reprocessing",
+    quit_timeout: float = 10.0,
+) -> Iterator[ReprocessResult]:
+    """Reprocess experiments one after the other in a worker process, yielding each outcome as soon as it is available.
+
+    Args:
+        paths (list[str]): Locations of the experiments.
+        output_dir (str): Directory where results, datasets and experiments are saved.
+        options (ReprocessOptions, optional): Changes and exports. Defaults to None (default options).
+        entity_name (str, optional): Name of the client set by the worker. Defaults to "ASTRA Reprocessing".
+        quit_timeout (float, optional): Time given to the ASTRA instance of a dead worker to exit before it is killed,
+            in seconds. Defaults to 10.0.
+
+    Yields:
+        ReprocessResult: Outcome of each experiment, in the order of "paths".
+    """
+    # The worker is spawned rather than forked: the event threads of astra_admin would not survive a fork.
+    context = multiprocessing.get_context("spawn")
+    executor = None
+    try:
+        for path in paths:
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+            try:
+                # Submitted one at a time, so that a worker dying only fails the experiment it was reprocessing.
+                result = executor.submit(_reprocess_in_worker, path, output_dir, options, entity_name).result()
+            except BrokenProcessPool as ex:
+                # The worker died, e.g. ASTRA crashed, the next experiment starts a new one. The ASTRA instance it
+                # started may still be running, and only one can run at a time: it is terminated first.
+                executor.shutdown(wait=False)
+                executor = None
+                terminate_astra(get_astra_pids(), quit_timeout)
+                result = ReprocessResult(path=path, success=False, error=repr(ex))
+            except Exception as ex:
+                result = ReprocessResult(path=path, success=False, error=repr(ex))
+            yield result
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def reprocess_directory(directory: str, output_dir: str, options: ReprocessOptions = None) -> list[ReprocessResult]:
+    """Reprocess all experiments of a directory, see "iter_reprocess".
+
+    Args:
+        directory (str): Directory of the experiments.
+        output_dir (str): Directory where results, datasets and experiments are saved.
+        options (ReprocessOptions, optional): Changes and exports. Defaults to None (default options).
+
+    Returns:
+        list[ReprocessResult]: Outcome of each experiment, in the order of the files.
+    """
+    return list(iter_reprocess(find_experiments(directory), output_dir, options))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprocess a directory of ASTRA experiments.")
+    parser.add_argument("directory", help="Directory of the experiments")
+    parser.add_argument("output_dir", help="Directory where results and datasets are saved")
+    parser.add_argument("--data-set", default=ReprocessOptions.data_set_definition, help="Dataset definition to save")
+    parser.add_argument("--save-experiments", action="store_true", help="Save the reprocessed experiments")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output_dir, exist_ok=True)
+    options = ReprocessOptions(data_set_definition=arguments.data_set, save_experiment=arguments.save_experiments)
+    paths = find_experiments(arguments.directory)
+    failed = 0
+    for result in iter_reprocess(paths, arguments.output_dir, options):
+        failed += not result.success
+        status = "done" if result.success else f"failed: {result.error}"
+        print(f"{os.path.basename(result.path)} {status} ({result.duration:.1f} s)")
+    print(f"{len(paths) - failed}/{len(paths)} experiment(s) reprocessed.")
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental reader for the results XML returned by "AstraAdmin.get_results".
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+from xml.etree.ElementTree import Element, XMLPullParser
+
+
+@dataclass
+class ResultValue:
+    """Single result, e.g. the weight average molar mass of a peak.
+    """
+    name: str
+    value: float
+    unit: str = ""
+    uncertainty: float = None
+
+
+@dataclass
+class PeakResults:
+    """Results of a peak.
+    """
+    number: str
+    values: dict[str, ResultValue] = field(default_factory=dict)
+
+    def get(self, *names: str) -> ResultValue:
+        """Get the first result found among "names", ignoring case.
+
+        Args:
+            names (str): Names of the result, e.g. "Mw".
+
+        Returns:
+            ResultValue: Result if found, None otherwise.
+        """
+        for name in names:
+            value = self.values.get(name.lower())
+            if value is not None:
+                return value
+        return None
+
+    @property
+    def mw(self) -> ResultValue:
+        return self.get("Mw")
+
+    @property
+    def mn(self) -> ResultValue:
+        return self.get("Mn")
+
+    @property
+    def pdi(self) -> ResultValue:
+        return self.get("Mw/Mn", "Polydispersity", "PDI")
+
+    @property
+    def rh(self) -> ResultValue:
+        return self.get("rh(avg)", "rh(w)", "rh")
+
+
+@dataclass
+class ProcedureResults:
+    """Results of a procedure, per peak, and the ones that are not related to a peak.
+    """
+    name: str
+    peaks: list[PeakResults] = field(default_factory=list)
+    values: dict[str, ResultValue] = field(default_factory=dict)
+
+    def peak(self, number: str) -> PeakResults:
+        """Get the results of a peak.
+
+        Args:
+            number (str): Number of the peak, e.g. "1".
+
+        Returns:
+            PeakResults: Results of the peak if found, None otherwise.
+        """
+        for peak in self.peaks:
+            if peak.number == str(number):
+                return peak
+        return None
+
+
+# Children holding the parts of a result, rather than results of their own.
+_value_tags = {"value", "uncertainty", "unit", "units"}
+
+
+def iter_results(
+    xml: str, procedures: Iterable[str] = None, names: Iterable[str] = None, chunk_size: int = 1 << 16
+) -> Iterator[ProcedureResults]:
+    """Read the results XML incrementally, yielding each procedure as soon as it has been read.
+    Elements are discarded once read, the tree of the whole document is never built.
+
+    A procedure is an element whose tag ends with "procedure", a peak an element whose tag ends with "peak",
+    and a result any element with a numeric value, given by a "value" attribute, a "value" child, or its text.
+
+    Args:
+        xml (str): Results XML.
+        procedures (Iterable[str], optional): Names of the procedures to read, ignoring case. Defaults to None (all).
+        names (Iterable[str], optional): Names of the results to read, ignoring case. Defaults to None (all).
+        chunk_size (int, optional): Number of characters parsed at once. Defaults to 64k.
+
+    Yields:
+        ProcedureResults: Results of each procedure, in document order. Results found outside of
+            any procedure are yielded last, in a procedure with an empty name.
+    """
+    wanted_procedures = {name.lower() for name in procedures} if procedures is not None else None
+    wanted_names = {name.lower() for name in names} if names is not None else None
+
+    parser = XMLPullParser(events=("start", "end"))
+    procedure: ProcedureResults = None
+    peak: PeakResults = None
+    # Depth of the procedure being skipped, if any.
+    skipped_depth = None
+    depth = 0
+    orphan = ProcedureResults(name="")
+
+    for start in range(0, len(xml), chunk_size):
+        parser.feed(xml[start:start + chunk_size])
+        for event, element in parser.read_events():
+            tag = _local_name(element.tag)
+            if event == "start":
+                depth += 1
+                if skipped_depth is not None:
+                    continue
+                if tag.endswith("procedure"):
+                    procedure = ProcedureResults(name=_attribute(element, "name", "type") or tag)
+                    if wanted_procedures is not None and procedure.name.lower() not in wanted_procedures:
+                        procedure = None
+                        skipped_depth = depth
+                elif tag.endswith("peak"):
+                    peak = PeakResults(number=_attribute(element, "number", "id", "index", "name") or "")
+                continue
+
+            depth -= 1
+            if skipped_depth is not None:
+                if depth < skipped_depth:
+                    skipped_depth = None
+                element.clear()
+                continue
+
+            if tag.endswith("procedure"):
+                if procedure is not None:
+                    yield procedure
+                procedure = None
+                element.clear()
+            elif tag.endswith("peak"):
+                if peak is not None:
+                    (procedure or orphan).peaks.append(peak)
+                peak = None
+                element.clear()
+            elif tag not in _value_tags:
+                result = _read_value(element)
+                if result is not None:
+                    if wanted_names is None or result.name.lower() in wanted_names:
+                        values = peak.values if peak is not None else (procedure or orphan).values
+                        values[result.name.lower()] = result
+                    element.clear()
+    parser.close()
+
+    if orphan.peaks or orphan.values:
+        yield orphan
+
+
+def read_results(xml: str, procedures: Iterable[str] = None, names: Iterable[str] = None) -> list[ProcedureResults]:
+    """Read the results XML, see "iter_results".
+
+    Args:
+        xml (str): Results XML.
+        procedures (Iterable[str], optional): Names of the procedures to read, ignoring case. Defaults to None (all).
+        names (Iterable[str], optional): Names of the results to read, ignoring case. Defaults to None (all).
+
+    Returns:
+        list[ProcedureResults]: Results of each procedure.
+    """
+    return list(iter_results(xml, procedures, names))
+
+
+def _local_name(tag: str) -> str:
+    # Drop the namespace, if any.
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _attribute(element: Element, *names: str) -> str:
+    attributes = {key.lower(): value for key, value in element.attrib.items()}
+    for name in names:
+        if name in attributes:
+            return attributes[name]
+    return None
+
+
+def _to_float(text: str) -> float:
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _read_value(element: Element) -> ResultValue:
+    parts = {_local_name(child.tag): child.text for child in element}
+    value = _to_float(_attribute(element, "value"))
+    if value is None:
+        value = _to_float(parts.get("value"))
+    if value is None and len(element) == 0:
+        value = _to_float(element.text)
+    if value is None:
+        return None
+
+    return ResultValue(
+        name=_attribute(element, "name") or element.tag.rsplit("}", 1)[-1],
+        value=value,
+        unit=_attribute(element, "unit", "units") or parts.get("unit") or parts.get("units") or "",
+        uncertainty=_first(_to_float(_attribute(element, "uncertainty")), _to_float(parts.get("uncertainty"))),
+    )
+
+
+def _first(*values):
+    return next((value for value in values if value is not None), None)
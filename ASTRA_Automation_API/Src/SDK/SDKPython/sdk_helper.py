@@ -1,12 +1,139 @@
-import comtypes.client
 import uuid
 import os
 import psutil
-from astra_admin import AstraAdmin
-from comtypes.client import GetEvents
+from concurrent.futures import Future
+from threading import Thread
+from astra_admin import AstraAdmin, AstraEvents, ComThread
 
 admin = AstraAdmin()
 
+astra_process_names = ("astra.exe", "AstraSecurityPackSdk.exe")
+
+
+def get_astra_pids() -> set[int]:
+    """Get the IDs of the running ASTRA and security pack SDK processes.
+
+    Returns:
+        set[int]: Process IDs.
+    """
+    return {proc.pid for proc in psutil.process_iter(["name"]) if proc.info["name"] in astra_process_names}
+
+
+class AstraLaunch:
+    """ASTRA and the security pack SDK started in the background on their own COM thread, with their automation identity set.
+
+    Only one instance of ASTRA can be running at a time (see "Starting ASTRA" in the Getting Started guide),
+    so the instance in use has to be retired before launching a new one, see "SdkHelper.recycle_astra".
+    """
+
+    def __init__(self, entity_name: str = "SDK Testing", entity_version: str = "1.0.0.0") -> None:
+        """Constructor: start launching ASTRA in the background.
+
+        Args:
+            entity_name (str, optional): Name of the client. Defaults to "SDK Testing".
+            entity_version (str, optional): Version of the client. Defaults to "1.0.0.0".
+        """
+        self.entity_name = entity_name
+        self.entity_version = entity_version
+        self.entity_guid = f"{uuid.uuid4()}"
+        self.com_thread = ComThread(name="AstraLaunch")
+        self.astra_com = None
+        self.astra_sp_com = None
+        self.started: Future = self.com_thread.submit(self._start)
+
+    def _start(self) -> None:
+        # Runs on the COM thread of the launch.
+        self.astra_com = self.com_thread.create_object("WTC.ASTRA8.Application.1")
+        self.astra_sp_com = self.com_thread.create_object("Wyatt.AstraSP.1")
+        self.astra_com.SetAutomationIdentity(
+            self.entity_name, self.entity_version, os.getpid(), self.entity_guid, 1, []
+        )
+        self.astra_sp_com.SetAutomationIdentity(
+            self.entity_name, self.entity_version, os.getpid(), f"{uuid.uuid4().hex}", 1
+        )
+
+    def wait_started(self, timeout: float = None) -> bool:
+        """Wait until ASTRA is launched and its identity set.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Raises:
+            Exception: The error raised while launching ASTRA, e.g. "E_ASTRA_ALREADY_IN_USE".
+
+        Returns:
+            bool: True if ASTRA is launched, false if the timeout expired.
+        """
+        try:
+            self.started.result(timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def quit(self) -> Thread:
+        """Quit the launched instance without using it.
+
+        Returns:
+            Thread: Thread retiring the instance.
+        """
+        return retire_astra((self.com_thread, self.astra_com, self.astra_sp_com, None), get_astra_pids())
+
+
+def retire_astra(instance: tuple, pids: set[int], timeout: float = 30.0) -> Thread:
+    """Quit an ASTRA instance in the background, killing its processes if it does not quit in time, e.g. when hung.
+
+    Args:
+        instance (tuple): COM thread, ASTRA, security pack SDK and event connection, as returned by "AstraAdmin.attach".
+        pids (set[int]): IDs of the processes of the instance.
+        timeout (float, optional): Time given to ASTRA to quit, in seconds. Defaults to 30.0.
+
+    Returns:
+        Thread: Thread retiring the instance.
+    """
+    com_thread, astra_com, astra_sp_com, connection = instance
+
+    def request_quit():
+        # Runs on the thread owning the COM objects.
+        nonlocal connection
+        connection = None
+        for com_object in (astra_com, astra_sp_com):
+            if com_object is not None:
+                try:
+                    com_object.RequestQuit()
+                except Exception:
+                    pass
+
+    def retire():
+        quit_requested = com_thread.submit(request_quit)
+        com_thread.stop()
+        try:
+            quit_requested.result(timeout)
+        except Exception:
+            pass
+        terminate_astra(pids, timeout)
+
+    thread = Thread(target=retire, name="AstraRetire", daemon=True)
+    thread.start()
+    return thread
+
+
+def terminate_astra(pids: set[int], timeout: float = 30.0) -> None:
+    """Wait for ASTRA processes to exit, killing the ones still running after "timeout".
+
+    Args:
+        pids (set[int]): IDs of the processes, e.g. from "get_astra_pids".
+        timeout (float, optional): Time given to the processes to exit, in seconds. Defaults to 30.0.
+    """
+    try:
+        psutil.wait_procs([psutil.Process(pid) for pid in pids if psutil.pid_exists(pid)], timeout=timeout)
+    except psutil.Error:
+        pass
+    for pid in pids:
+        try:
+            psutil.Process(pid).kill()
+        except psutil.Error:
+            pass
+
 class SdkHelper:
     # Singleton class
     def __new__(cls) -> None:
@@ -18,6 +145,61 @@ class SdkHelper:
     def __init__(self) -> None:
         pass
 
+    def recycle_astra(
+        self,
+        timeout: float = None,
+        quit_timeout: float = 30.0,
+        entity_name: str = "SDK Testing",
+        entity_version: str = "1.0.0.0",
+    ) -> bool:
+        """Replace the ASTRA instance in use, e.g. when an experiment hangs.
+
+        Only one instance of ASTRA can be running at a time, so the instance in use is retired first:
+        RequestQuit is sent from its own COM thread, and its processes are killed if they have not exited
+        within "quit_timeout", e.g. when hung. The new instance is launched on a new COM thread, so that
+        a COM thread blocked by the hung call does not hold it up, and its identity is set before
+        AstraAdmin switches to it. Experiments opened in the previous instance are not carried over.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the new instance and its instruments in seconds. Defaults to None (wait forever).
+            quit_timeout (float, optional): Time given to the previous instance to quit, in seconds. Defaults to 30.0.
+            entity_name (str, optional): Name of the client. Defaults to "SDK Testing".
+            entity_version (str, optional): Version of the client. Defaults to "1.0.0.0".
+
+        Returns:
+            bool: True once the instruments of the new instance are detected, false if the timeout expired.
+        """
+        previous = AstraAdmin.connected_objects()
+        if previous is not None:
+            # All ASTRA processes belong to the instance in use.
+            retire_astra(previous, get_astra_pids(), quit_timeout).join()
+
+        launch = AstraLaunch(entity_name, entity_version)
+        try:
+            started = launch.wait_started(timeout)
+        except Exception:
+            launch.quit()
+            raise
+        if not started:
+            launch.quit()
+            return False
+
+        self._forget_experiments()
+        admin.reset_events()
+        AstraAdmin.attach(launch.com_thread, launch.astra_com, launch.astra_sp_com)
+        admin._entity_id = launch.entity_guid
+        # Instruments detected before AstraAdmin was connected to the events of the new instance.
+        if admin.has_instrument_detection_completed():
+            AstraEvents.instrument_detected_signal.set()
+        return admin.wait_for_instruments(timeout)
+
+    def _forget_experiments(self) -> None:
+        # Experiment IDs of the previous instance may be reused by the new one.
+        for experiment_id in list(admin._experiments) + list(admin.closing_experiments):
+            admin.event_router.forget(experiment_id)
+        admin.closing_experiments = {}
+        admin._experiments = {}
+
     def restart_astra(self) -> None:
         admin.dispose()
         for proc in psutil.process_iter():
@@ -30,10 +212,8 @@ class SdkHelper:
         admin.closing_experiment = {}
         admin._experiments = {}
 
-        admin.astra_com = comtypes.client.CreateObject("WTC.ASTRA8.Application.1")
         admin.reset_events()
-        admin.connection = GetEvents(admin.astra_com, admin.events)
-        admin.astra_sp_com = comtypes.client.CreateObject("Wyatt.AstraSP.1")
+        AstraAdmin.connect(restart=True)
 
     def restart_astra_and_wait(self):
         self.restart_astra()
@@ -7,12 +7,26 @@ The tests name have to start with "test_[number]", where number indicate the ord
 """
 
 import os
+import tempfile
+import time
 import unittest
-
-import comtypes
-import comtypes.safearray
-
-from astra_admin import AstraAdmin, BaselineType, SampleInfo
+import uuid
+
+try:
+    import comtypes
+    import comtypes.safearray
+except ImportError:
+    # Only needed by the tests against ASTRA, the C_ tests run with "ASTRA_BACKEND=fake" on any platform.
+    comtypes = None
+
+import numpy
+
+import astra_admin
+from astra_admin import AstraAdmin, BaselineType, ExperimentParameterBatch, SampleInfo, observer_dispatcher
+from astra_errors import AstraErrorCode
+from data_set import parse_data_set
+from fraction_results import FractionResult, PeakDetector, PeakDetectorInfo
+from session_journal import EventRecord, ReplayObject, ReplaySession, SessionRecorder, read_journal
 from sdk_helper import SdkHelper
 from known_path import KnownPaths
 from pathlib import Path
@@ -345,6 +359,52 @@ class A_SdkUnitTests(unittest.TestCase):
 
         self.assertTrue(success)
 
+    def test_13_get_data_set_array(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+
+        definition_name = "mean square radius vs volume"
+        results = admin.get_data_set(exp_id, definition_name)
+        data_set = admin.get_data_set_array(exp_id, definition_name)
+
+        self.assertLess(0, len(data_set))
+        self.assertEqual(len(data_set.names), data_set.values.shape[1])
+        self.assertIn("mL", data_set.units)
+        first_row = results.replace("\r", "").split("\n")[len(data_set.header) + 1].split(",")
+        self.assertAlmostEqual(float(first_row[0]), data_set.values[0, 0])
+
+
+    def test_14_read_results(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+
+        procedures = admin.read_results(exp_id)
+        values = [
+            result.value
+            for procedure in procedures
+            for results in [procedure.values] + [peak.values for peak in procedure.peaks]
+            for result in results.values()
+        ]
+        self.assertIn(3.043288841e+04, values)
+
+        selected = admin.read_results(exp_id, procedures=[procedures[0].name], names=["Mw"])
+        self.assertEqual(procedures[0].name, selected[0].name)
+        for peak in selected[0].peaks:
+            self.assertLessEqual(set(peak.values), {"mw"})
+
+    def test_15_add_fraction_results_bulk(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+
+        # Plain strings, as passed to AddFractionResult by "add_fraction_result", and a value that is not a fraction result.
+        fraction_results = list(self.fraction_results_json) + [{"Id": 1}]
+        errors = admin.add_fraction_results(exp_id, fraction_results)
+
+        self.assertEqual(1, len(errors))
+        self.assertEqual(len(self.fraction_results_json), errors[0].index)
+        self.assertIsInstance(errors[0].error, astra_admin.AstraError)
+        for i, fraction_result in enumerate(self.fraction_results_json):
+            self.assertEqual(fraction_result, admin.get_fraction_result(exp_id, i))
 
 class B_SdkApiUnitTests(unittest.TestCase):
     def __init__(self, method_name: str = "SdkApiUnitTests") -> None:
@@ -896,6 +956,679 @@ class B_SdkApiUnitTests(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertFalse(got_error)
 
+    def test_69_observers_notified_without_blocking(self):
+        SdkHelper().restart_astra_and_wait()
+        notified = []
+
+        def slow_observer(experiment):
+            time.sleep(1)
+            notified.append(experiment.id)
+
+        admin.experiment_status_changed.add_experiment_observer(slow_observer)
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        start = time.monotonic()
+        exp_id = admin.open_experiment(exp_file_path)
+        admin.close_experiment(exp_id)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(observer_dispatcher.flush(30))
+        self.assertLess(0, len(notified))
+        self.assertLess(elapsed, len(notified))
+        stats = admin.observer_dispatch_stats()
+        self.assertEqual(0, stats.queue_depth)
+        self.assertLessEqual(len(notified), stats.dispatched)
+
+
+    def test_70_apply_parameter_batch(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+        got_error = False
+        result = False
+        try:
+            result = ExperimentParameterBatch(exp_id) \
+                .set_sample_dndc(0.12) \
+                .set_sample_concentration(0.0013) \
+                .set_injected_volume(0.12) \
+                .apply()
+        except Exception:
+            got_error = True
+
+        self.assertTrue(result)
+        self.assertEqual(0.12, admin.get_sample_dndc(exp_id))
+        self.assertEqual(0.0013, admin.get_sample_concentration(exp_id))
+        self.assertEqual(0.12, admin.get_injected_volume(exp_id))
+        self.assertFalse(admin.is_running(exp_id))
+        self.assertFalse(got_error)
+
+
+    def test_71_apply_dirty_fields_only(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+        experiment = admin.get_experiment(exp_id)
+
+        self.assertFalse(experiment.is_dirty())
+        experiment.sample.dndc = 0.13
+        experiment.flow_rate = experiment.flow_rate + 1e-9
+        self.assertEqual(["sample.dndc"], experiment.dirty_fields())
+
+        self.assertTrue(experiment.apply())
+        self.assertFalse(experiment.is_dirty())
+        self.assertEqual(0.13, admin.get_sample_dndc(exp_id))
+        self.assertEqual(0.13, admin.get_experiment(exp_id).sample.dndc)
+
+    def test_72_get_experiment_snapshot(self):
+        exp_file_path = KnownPaths().get_experiment_data("30k polystyrene treos + rex.afe7")
+        exp_id = admin.open_experiment(exp_file_path)
+        snapshot = admin.get_experiment_snapshot(exp_id)
+
+        self.assertEqual(exp_id, snapshot.id)
+        self.assertEqual(admin.get_sample_dndc(exp_id), snapshot.sample.dndc)
+        self.assertIs(snapshot, admin.get_experiment_snapshot(exp_id))
+        with self.assertRaises(AttributeError):
+            snapshot.sample.dndc = 0.14
+
+        admin.set_sample_dndc(exp_id, 0.14)
+        updated = admin.get_experiment_snapshot(exp_id)
+        self.assertIsNot(snapshot, updated)
+        self.assertEqual(0.14, updated.sample.dndc)
+        self.assertIsNone(admin.get_experiment_snapshot(-1))
+
+@unittest.skipUnless(astra_admin.backend.name == "fake", "requires ASTRA_BACKEND=fake")
+class C_SdkBackendUnitTests(unittest.TestCase):
+    """Tests of the wrapper against the fake ASTRA backend, e.g.:
+
+        ASTRA_BACKEND=fake python -m unittest sdk_test.C_SdkBackendUnitTests
+    """
+
+    def __init__(self, method_name: str = "SdkBackendUnitTests") -> None:
+        super().__init__(method_name)
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        admin.should_show_error_message_box = False
+        admin.set_automation_identity("SDK Testing", "1.0.0.0", os.getpid(), f"{uuid.uuid4()}", 1)
+        admin.wait_for_instruments(30)
+
+    def new_experiment(self) -> int:
+        exp_id = admin.new_experiment_from_template(admin.get_experiment_templates()[0])
+        self.assertLess(0, exp_id)
+        return exp_id
+
+    def test_80_fake_experiment_from_template(self):
+        exp_id = self.new_experiment()
+
+        self.assertTrue(admin.set_sample_dndc(exp_id, 0.15))
+        self.assertEqual(0.15, admin.get_sample_dndc(exp_id))
+        self.assertFalse(admin.is_running(exp_id))
+        self.assertTrue(admin.close_experiment(exp_id))
+
+    def test_81_fake_collection(self):
+        exp_id = self.new_experiment()
+        collection_finished = admin.event_router.arm(exp_id, astra_admin.ExperimentEventType.COLLECTION_FINISHED)
+
+        self.assertFalse(admin.has_collected_data(exp_id))
+        self.assertTrue(admin.start_collection(exp_id))
+        self.assertTrue(admin.wait_future(collection_finished, 30))
+        self.assertTrue(admin.has_collected_data(exp_id))
+        admin.close_experiment(exp_id)
+
+    def test_82_parse_ragged_data_set(self):
+        data_set = parse_data_set("volume (mL),rms radius (nm)\n1.0,\n3.0,4.0\n5.0,6.0,\nEnd of data")
+
+        self.assertEqual(["volume", "rms radius"], data_set.names)
+        self.assertEqual((3, 2), data_set.values.shape)
+        self.assertTrue(numpy.isnan(data_set.values[0, 1]))
+        self.assertEqual([3.0, 4.0], data_set.values[1].tolist())
+        self.assertEqual([5.0, 6.0], data_set.values[2].tolist())
+        self.assertEqual([4.0, 6.0], data_set["rms radius (nm)"][1:].tolist())
+
+        # Short rows are padded with NaN rather than dropped.
+        values = parse_data_set("x,y,z\n1,2,3\n2,,4\n3\n4,5,6").values
+        self.assertEqual((4, 3), values.shape)
+        self.assertEqual([1.0, 2.0, 3.0], values[0].tolist())
+        self.assertTrue(numpy.isnan(values[1, 1]))
+        self.assertEqual(3.0, values[2, 0])
+        self.assertTrue(numpy.isnan(values[2, 1:]).all())
+        self.assertEqual([4.0, 5.0, 6.0], values[3].tolist())
+
+    def test_83_record_and_replay_session(self):
+        exp_id = self.new_experiment()
+        journal_path = os.path.join(tempfile.mkdtemp(), "session.journal")
+
+        with SessionRecorder(journal_path):
+            dndc = admin.get_sample_dndc(exp_id)
+            admin.set_sample_dndc(exp_id, dndc + 0.01)
+        admin.close_experiment(exp_id)
+
+        records = read_journal(journal_path)
+        self.assertIn("GetSampleDndc", [record.name for record in records])
+        self.assertIn("ExperimentRun", [record.name for record in records if isinstance(record, EventRecord)])
+        session = ReplaySession(journal_path)
+        try:
+            self.assertEqual(dndc, ReplayObject(session, "astra").GetSampleDndc(exp_id))
+        finally:
+            session.close()
+
+    def test_84_reconnect_after_recording(self):
+        with SessionRecorder(os.path.join(tempfile.mkdtemp(), "session.journal")):
+            admin.get_experiment_templates()
+
+        # The recorder must not leave instance attributes hiding the ones replaced by "connect".
+        self.assertNotIn("astra_com", vars(admin))
+        self.assertNotIn("connection", vars(admin))
+        previous = admin.astra_com
+        admin.dispose()
+        AstraAdmin.connect(restart=True)
+        self.assertIsNot(previous, admin.astra_com)
+        self.setUpClass()
+        self.assertLess(0, self.new_experiment())
+
+    def test_85_recycle_astra(self):
+        from sdk_helper import AstraLaunch
+
+        previous = admin.astra_com
+        self.assertTrue(SdkHelper().recycle_astra(timeout=30, quit_timeout=5))
+
+        # The instance in use quits before the new one is launched, its COM thread is stopped.
+        self.assertTrue(previous.com_object.quit_requested)
+        self.assertIsNot(previous, admin.astra_com)
+        self.assertLess(0, self.new_experiment())
+
+        # Only one instance of ASTRA can be running at a time.
+        launch = AstraLaunch()
+        with self.assertRaises(Exception) as context:
+            launch.wait_started(30)
+        self.assertEqual(AstraErrorCode.E_ASTRA_ALREADY_IN_USE, context.exception.hresult & 0xFFFFFFFF)
+        launch.quit().join()
+        self.assertFalse(admin.astra_com.com_object.quit_requested)
+
+    def test_86_reprocess_in_worker(self):
+        from reprocess import ReprocessOptions, iter_reprocess
+
+        # The worker runs the fake ASTRA of its own process, the one-instance rule applies per process.
+        directory = tempfile.mkdtemp()
+        paths = [os.path.join(directory, f"sample {number}.afe8") for number in (1, 2)]
+        options = ReprocessOptions(peaks=[(10.0, 12.0)], read_results=True)
+        results = list(iter_reprocess(paths, directory, options))
+
+        self.assertEqual(paths, [result.path for result in results])
+        for result in results:
+            self.assertTrue(result.success, result.error)
+            self.assertTrue(os.path.isfile(result.results_path))
+            self.assertTrue(os.path.isfile(result.data_set_path))
+            self.assertNotEqual(os.getpid(), result.worker_pid)
+        # Both experiments are reprocessed by the same worker, hence the same ASTRA instance.
+        self.assertEqual(results[0].worker_pid, results[1].worker_pid)
+
+    def test_99_reprocess_after_worker_died(self):
+        import multiprocessing
+        import unittest.mock
+        from reprocess import iter_reprocess
+
+        directory = tempfile.mkdtemp()
+        paths = [os.path.join(directory, f"sample {number}.afe8") for number in (1, 2, 3)]
+        results = []
+        with unittest.mock.patch("reprocess.terminate_astra") as terminate_astra:
+            for result in iter_reprocess(paths, directory):
+                results.append(result)
+                if len(results) == 1:
+                    # The worker dies, e.g. ASTRA crashed it, in the middle of the run.
+                    for worker in multiprocessing.active_children():
+                        worker.kill()
+                        worker.join()
+
+        self.assertEqual(paths, [result.path for result in results])
+        self.assertEqual([True, False, True], [result.success for result in results])
+        self.assertIn("BrokenProcessPool", results[1].error)
+        # The ASTRA instance of the dead worker is terminated before a new worker starts its own.
+        terminate_astra.assert_called_once()
+        self.assertNotEqual(results[0].worker_pid, results[2].worker_pid)
+
+    def test_87_metrics_endpoint(self):
+        import urllib.request
+        from astra_metrics import serve_metrics
+
+        admin.get_experiment_templates()
+        server = serve_metrics(AstraAdmin.call_metrics, port=0)
+        try:
+            # Only reachable from this machine by default.
+            address, port = server.server_address
+            self.assertEqual("127.0.0.1", address)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=10) as response:
+                self.assertEqual(200, response.status)
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("# TYPE astra_call_com_call_seconds histogram", text)
+        self.assertIn('astra_call_com_call_seconds_bucket{method="GetExperimentTemplates",le="+Inf"}', text)
+        self.assertIn('astra_call_com_call_seconds_count{method="GetExperimentTemplates"}', text)
+
+    def test_88_error_codes_and_defaults(self):
+        with self.assertRaises(astra_admin.AstraError) as context:
+            admin.get_sample_dndc(-1)
+
+        self.assertEqual(AstraErrorCode.E_EXP_BADHANDLE, context.exception.code)
+        self.assertIs(context.exception, admin.last_error)
+
+        # Without raising, failed calls return a default of the documented type.
+        admin.should_show_error_message_box = True
+        try:
+            sample = admin.get_sample(-1)
+        finally:
+            admin.should_show_error_message_box = False
+        self.assertIsInstance(sample, SampleInfo)
+        self.assertEqual("", sample.name)
+        self.assertEqual(0.0, sample.dndc)
+
+    def test_89_vision_uv_stream_latency(self):
+        from threading import Event
+        from vision_uv_stream import VisionUvStream
+
+        class PushRecorder:
+            # Stands in for AstraAdmin, the fake ASTRA only accepts VISION UV data while collecting.
+            last_error = None
+
+            def __init__(self):
+                self.batches = []
+                self.pushed = Event()
+
+            def push_vision_uv_data(self, experiment_id, channel_count, data):
+                self.batches.append(numpy.array(data).reshape(-1, channel_count + 1))
+                self.pushed.set()
+                return True
+
+        recorder = PushRecorder()
+        stream = VisionUvStream(recorder, 1, channel_count=2, batch_size=256, max_latency=0.05)
+        try:
+            # A single sample, far from a full batch, is pushed once it is "max_latency" old.
+            stream.push(0.5, 1.0, 2.0)
+            self.assertTrue(recorder.pushed.wait(5))
+            self.assertEqual([[0.5, 1.0, 2.0]], recorder.batches[0].tolist())
+
+            stream.push_many(numpy.arange(600 * 3, dtype=float).reshape(600, 3))
+        finally:
+            stream.close()
+        stats = stream.stats()
+        self.assertEqual(601, stats.samples)
+        self.assertEqual(0, stats.buffered)
+        self.assertEqual(601, sum(len(batch) for batch in recorder.batches))
+        self.assertLessEqual(max(len(batch) for batch in recorder.batches), 256)
+
+    def test_90_add_fraction_results(self):
+
+        exp_id = self.new_experiment()
+        detector = PeakDetector("G7121A:DEAE304354 P", "G7121A", "DEAE304354")
+        fraction_results = [
+            FractionResult(1, "Vial 1", 60.0, 90.0, 0.5, True, peak_detector_infos=[PeakDetectorInfo(detector)]),
+            {"Id": 2, "Location": "Vial 2"},
+            FractionResult(3, "Vial 3", 120.0, 150.0).to_json(),
+        ]
+        errors = admin.add_fraction_results(exp_id, fraction_results)
+
+        # The dict is reported without preventing the other fraction results from being added.
+        self.assertEqual([1], [error.index for error in errors])
+        self.assertIs(fraction_results[1], errors[0].fraction_result)
+        self.assertIn("dict", errors[0].error.message)
+        self.assertEqual(fraction_results[0], FractionResult.from_json(admin.get_fraction_result(exp_id, 0)))
+        self.assertEqual(fraction_results[2], admin.get_fraction_result(exp_id, 2))
+
+    def test_91_get_fraction_results(self):
+        from fake_astra import FakeComError
+
+        exp_id = self.new_experiment()
+        fraction_results = [FractionResult(i + 1, f"Vial {i + 1}", 30.0 * i, 30.0 * (i + 1)).to_json() for i in range(5)]
+        self.assertEqual([], admin.add_fraction_results(exp_id, fraction_results))
+
+        self.assertEqual(fraction_results, admin.get_fraction_results(exp_id, batch_size=2))
+        self.assertEqual(fraction_results[1:4], admin.get_fraction_results(exp_id, start_index=1, count=3))
+        self.assertEqual([], admin.get_fraction_results(exp_id, start_index=5))
+        with self.assertRaises(astra_admin.AstraError):
+            admin.get_fraction_results(exp_id, start_index=3, count=3)
+        with self.assertRaises(astra_admin.AstraError):
+            admin.get_fraction_results(-1)
+
+        table = admin.get_fraction_table(exp_id, start_index=2)
+        self.assertEqual([2, 3, 4], table.indexes.tolist())
+        self.assertEqual([3, 4, 5], table.ids.tolist())
+        self.assertEqual([0, 1, 2, 3, 4], admin.get_fraction_table(exp_id).indexes.tolist())
+
+        # The end of the list may be reported with another error than the one of the fake ASTRA.
+        fake = admin.astra_com.com_object
+        get_fraction_result = fake.GetFractionResult
+
+        def get_fraction_result_or_invalid_argument(experiment_id, index):
+            if index >= len(fraction_results):
+                raise FakeComError(0x80070057)
+            return get_fraction_result(experiment_id, index)
+
+        fake.GetFractionResult = get_fraction_result_or_invalid_argument
+        admin.astra_com._methods.pop("GetFractionResult", None)
+        try:
+            self.assertEqual(fraction_results, admin.get_fraction_results(exp_id))
+            self.assertEqual(5, len(admin.get_fraction_table(exp_id, refresh=True)))
+        finally:
+            del fake.GetFractionResult
+            admin.astra_com._methods.pop("GetFractionResult", None)
+
+    def sequence_rows(self, count: int) -> list:
+        from sequence_runner import SequenceRow
+
+        template = admin.get_experiment_templates()[0]
+        directory = tempfile.mkdtemp()
+        return [
+            SequenceRow(
+                template,
+                os.path.join(directory, f"injection {index + 1}"),
+                SampleInfo(name=f"Sample {index + 1}", description="", dndc=0.185, a2=0.0, uvExtinction=0.0, concentration=1.0),
+                duration=1.0,
+                injection_volume=0.1,
+            )
+            for index in range(count)
+        ]
+
+    def test_92_pipelined_sequence_runner(self):
+        from sequence_runner import PipelinedSequenceRunner
+
+        rows = self.sequence_rows(3)
+        runner = PipelinedSequenceRunner(progress_update=lambda message: None, save_results=True, data_set_definitions=["uv"])
+        results = runner.run(rows)
+
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        for result in results:
+            self.assertTrue(result.success, result.error)
+            self.assertLess(0, result.experiment_id)
+            self.assertTrue(os.path.isfile(result.results_path))
+            self.assertEqual(1, len(result.data_set_paths))
+            self.assertTrue(os.path.isfile(result.data_set_paths[0]))
+            # Exported experiments are closed.
+            self.assertNotIn(result.experiment_id, admin._experiments)
+
+    def test_98_sequence_row_failing_to_start(self):
+        from fake_astra import FakeComError
+        from sequence_runner import PipelinedSequenceRunner
+
+        rows = self.sequence_rows(3)
+        fake = admin.astra_com.com_object
+        start_collection = fake.StartCollection
+
+        def start_collection_or_fail(experiment_id):
+            if fake.GetSampleName(experiment_id) == rows[1].sample.name:
+                raise FakeComError(AstraErrorCode.E_EXP_RUNNING)
+            start_collection(experiment_id)
+
+        fake.StartCollection = start_collection_or_fail
+        admin.astra_com._methods.pop("StartCollection", None)
+        admin.should_show_error_message_box = True
+        try:
+            results = PipelinedSequenceRunner(progress_update=lambda message: None).run(rows)
+        finally:
+            admin.should_show_error_message_box = False
+            del fake.StartCollection
+            admin.astra_com._methods.pop("StartCollection", None)
+
+        self.assertEqual([True, False, True], [result.success for result in results])
+        self.assertEqual("Could not start collection", results[1].error)
+        # The experiment of the failed row is not left open for the rest of the sequence.
+        self.assertNotIn(results[1].experiment_id, admin._experiments)
+        self.assertNotIn(results[1].experiment_id, fake._experiments)
+
+    def test_93_resume_sequence_from_journal(self):
+        from sequence_journal import RowState, SequenceJournal
+        from sequence_runner import PipelinedSequenceRunner
+
+        rows = self.sequence_rows(3)
+        journal_path = os.path.join(tempfile.mkdtemp(), "sequence.db")
+
+        # Row 1 was collected before the client crashed, its experiment is still open in ASTRA.
+        collected_id = admin.new_experiment_from_template(rows[1].method_path)
+        # Applied as by the runner, waiting for the experiment to run again.
+        self.assertTrue(ExperimentParameterBatch(collected_id).set_sample(rows[1].sample).apply())
+        collection_finished = admin.event_router.arm(collected_id, astra_admin.ExperimentEventType.COLLECTION_FINISHED)
+        self.assertTrue(admin.start_collection(collected_id))
+        self.assertTrue(admin.wait_future(collection_finished, 30))
+        with SequenceJournal(journal_path) as journal:
+            journal.record(1, rows[1].experiment_path, RowState.CREATED, collected_id)
+            journal.record(1, rows[1].experiment_path, RowState.COLLECTED, collected_id)
+
+        with SequenceJournal(journal_path) as journal:
+            results = PipelinedSequenceRunner(progress_update=lambda message: None, journal=journal).run(rows)
+            entries = journal.entries()
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual([False, True, False], [result.resumed for result in results])
+        # Exported without collecting again.
+        self.assertEqual(collected_id, results[1].experiment_id)
+        self.assertEqual(0.0, results[1].collection_time)
+        self.assertEqual([(0, RowState.EXPORTED), (1, RowState.EXPORTED), (2, RowState.EXPORTED)], [(entry.index, entry.state) for entry in entries])
+
+        # Running the sequence again skips the completed rows.
+        with SequenceJournal(journal_path) as journal:
+            results = PipelinedSequenceRunner(progress_update=lambda message: None, journal=journal).run(rows)
+        self.assertEqual([True, True, True], [result.resumed for result in results])
+        self.assertEqual([entry.experiment_id for entry in entries], [result.experiment_id for result in results])
+
+        # A journal is only applied to the rows it was written for.
+        rows[0].experiment_path += " (edited)"
+        with SequenceJournal(journal_path) as journal:
+            self.assertIsNone(journal.last_entry(0, rows[0].experiment_path))
+
+    def test_94_collection_timeline(self):
+        import json
+        from sequence_runner import PipelinedSequenceRunner
+
+        AstraAdmin.tracer.clear()
+        result = PipelinedSequenceRunner(progress_update=lambda message: None).run(self.sequence_rows(1))[0]
+        self.assertTrue(result.success, result.error)
+
+        spans = AstraAdmin.tracer.spans(result.experiment_id)
+        names = [span.name for span in spans]
+        for name in ("create_experiment", "apply_parameters", "start_collection", "preparing_for_collection",
+                     "waiting_for_auto_inject", "collecting", "post_run", "save", "close"):
+            self.assertIn(name, names)
+        for span in spans:
+            self.assertLessEqual(span.start, span.end)
+        phases = {span.name: span for span in spans}
+        self.assertLessEqual(phases["collecting"].end, phases["post_run"].start)
+        self.assertLessEqual(phases["post_run"].end, phases["save"].start)
+
+        path = os.path.join(tempfile.mkdtemp(), "sequence.trace.json")
+        AstraAdmin.tracer.save_chrome_trace(path)
+        with open(path) as file:
+            events = json.load(file)["traceEvents"]
+        self.assertEqual(len(AstraAdmin.tracer.spans()), len(events))
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+
+        otel_spans = AstraAdmin.tracer.to_otel()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        experiment_attribute = {"key": "astra.experiment_id", "value": {"intValue": str(result.experiment_id)}}
+        trace_ids = {span["traceId"] for span in otel_spans if experiment_attribute in span["attributes"]}
+        # One trace per experiment.
+        self.assertEqual(1, len(trace_ids))
+
+    def test_95_double_array_marshalling(self):
+        from com_backend import ComBackend
+        from session_journal import to_plain
+
+        backend = ComBackend()
+        # Rows of a ring buffer, as pushed by VisionUvStream, are passed without a copy.
+        buffer = numpy.arange(12, dtype=numpy.float64).reshape(4, 3)
+        batch = backend.double_array(buffer[1:3])
+        self.assertEqual((6,), batch.shape)
+        self.assertTrue(numpy.shares_memory(batch, buffer))
+        self.assertEqual([3.0, 4.0, 5.0, 6.0, 7.0, 8.0], batch.tolist())
+
+        # Other arrays are converted to a contiguous float64 buffer, other sequences are passed as is.
+        column = backend.double_array(numpy.arange(6, dtype=numpy.int32).reshape(3, 2)[:, 1])
+        self.assertEqual(numpy.float64, column.dtype)
+        self.assertTrue(column.flags.c_contiguous)
+        self.assertEqual([1.0, 3.0, 5.0], column.tolist())
+        values = [0.5, 1.0, 2.0]
+        self.assertIs(values, backend.double_array(values))
+
+        # Recorded sessions store arrays as lists.
+        self.assertEqual([3.0, 4.0, 5.0, 6.0, 7.0, 8.0], to_plain(batch))
+
+    def test_96_template_catalog(self):
+        from threading import Event
+        from template_catalog import TemplateCatalog
+
+        path = os.path.join(tempfile.mkdtemp(), "templates.json")
+        catalog = TemplateCatalog(path=path, ttl=0.05)
+        templates = admin.get_experiment_templates()
+        self.assertEqual(templates, catalog.templates())
+        self.assertEqual([], catalog.directories())
+
+        conformation = "//localhost/System/Methods/Light Scattering/Online/Conformation"
+        self.assertIn(conformation, catalog.lookup("light scattering/online"))
+        self.assertEqual(conformation, catalog.lookup("online/conf")[0])
+        self.assertEqual(conformation, catalog.lookup("conformaton")[0])
+        self.assertNotIn("//localhost/System/Methods/Protein Conjugate/Online/Default", catalog.lookup("ls online"))
+
+        # A new client starts from the saved catalog, without reading ASTRA.
+        saved = TemplateCatalog(path=path)
+        self.assertEqual(catalog.snapshot(), saved.snapshot())
+
+        # Templates added in ASTRA are picked up by the background refresh, and the observers notified.
+        changed = Event()
+        snapshots = []
+        catalog.add_change_observer(lambda snapshot: (snapshots.append(snapshot), changed.set()))
+        fake = admin.astra_com.com_object
+        fake.templates = templates + ["//localhost/System/Methods/UV/Online/Default"]
+        try:
+            with catalog:
+                self.assertTrue(changed.wait(10))
+        finally:
+            del fake.templates
+        self.assertIn("//localhost/System/Methods/UV/Online/Default", snapshots[-1].templates)
+        self.assertIn("//localhost/System/Methods/UV/Online/Default", catalog.lookup("uv"))
+        self.assertIsNone(catalog.last_error)
+
+    def test_97_events_fired_during_creation(self):
+        from threading import Event, Thread
+        from astra_admin import AstraEvents
+
+        fake = admin.astra_com.com_object
+        new_experiment_from_template = fake.NewExperimentFromTemplate
+
+        def new_experiment_firing_events(template_path):
+            # An STA may deliver incoming event calls while the call creating the experiment is in progress.
+            # They are fired here instead of after the call returns.
+            fake._schedule_load = lambda experiment: None
+            try:
+                experiment_id = new_experiment_from_template(template_path)
+            finally:
+                del fake._schedule_load
+            for sink in list(fake._sinks):
+                sink.sink._IAstraEvents_ExperimentRead(experiment_id)
+                sink.sink._IAstraEvents_ExperimentRun(experiment_id)
+            # Let the handlers run before the experiment is registered.
+            handled = Event()
+            AstraEvents.dispatcher.post(handled.set)
+            handled.wait(5)
+            return experiment_id
+
+        fake.NewExperimentFromTemplate = new_experiment_firing_events
+        admin.astra_com._methods.pop("NewExperimentFromTemplate", None)
+        try:
+            # Without the events, "new_experiment_from_template" would wait forever.
+            created = []
+            thread = Thread(target=lambda: created.append(self.new_experiment()), daemon=True)
+            thread.start()
+            thread.join(30)
+            self.assertFalse(thread.is_alive())
+        finally:
+            del fake.NewExperimentFromTemplate
+            admin.astra_com._methods.pop("NewExperimentFromTemplate", None)
+
+        exp_id = created[0]
+        self.assertEqual(astra_admin.ExperimentStatus.READY, admin.get_internal_experiment(exp_id).status)
+        admin.close_experiment(exp_id)
+
+    def test_100_async_experiments(self):
+        import asyncio
+        from async_astra_admin import AsyncAstraAdmin
+
+        async_admin = AsyncAstraAdmin()
+        template = admin.get_experiment_templates()[0]
+        path = os.path.join(tempfile.mkdtemp(), "async experiment")
+
+        async def scenario():
+            # Both experiments are loaded at once, each one awaiting its own events.
+            exp_ids = await asyncio.gather(
+                async_admin.new_experiment_from_template(template, timeout=30),
+                async_admin.new_experiment_from_template(template, timeout=30),
+            )
+            self.assertEqual(2, len(set(exp_ids)))
+            for exp_id in exp_ids:
+                self.assertLess(0, exp_id)
+                self.assertEqual(astra_admin.ExperimentStatus.READY, admin.get_internal_experiment(exp_id).status)
+
+            self.assertTrue(await async_admin.run_experiment(exp_ids[0], timeout=30))
+            self.assertTrue(await async_admin.start_collection(exp_ids[1]))
+            self.assertTrue(await async_admin.wait_collection_finished(exp_ids[1], timeout=30))
+            self.assertTrue(await async_admin.wait_experiment_run(exp_ids[1], timeout=30))
+            self.assertTrue(await async_admin.call(admin.has_collected_data, exp_ids[1]))
+            self.assertTrue(await async_admin.save_experiment(exp_ids[1], path, timeout=30))
+
+            for exp_id in exp_ids:
+                self.assertTrue(await async_admin.close_experiment(exp_id, timeout=30))
+                self.assertIsNone(admin.get_internal_experiment(exp_id))
+
+        asyncio.run(scenario())
+
+    def test_101_async_wait_timeout(self):
+        import asyncio
+        from async_astra_admin import AsyncAstraAdmin
+
+        async_admin = AsyncAstraAdmin()
+        exp_id = self.new_experiment()
+
+        async def scenario():
+            # No collection was started, the event never comes.
+            collection_finished = admin.event_router.arm(exp_id, astra_admin.ExperimentEventType.COLLECTION_FINISHED)
+            self.assertFalse(await async_admin.wait_future(collection_finished, timeout=0.1))
+            return collection_finished
+
+        collection_finished = asyncio.run(scenario())
+        # Cancelled, so that it does not claim the event of a later collection.
+        self.assertTrue(collection_finished.cancelled())
+        self.assertFalse(asyncio.run(async_admin.wait_collection_started(exp_id, timeout=0.1)))
+        admin.close_experiment(exp_id)
+
+    def test_102_non_com_errors_return_defaults(self):
+        import contextlib
+        import io
+
+        exp_id = self.new_experiment()
+        fake = admin.astra_com.com_object
+
+        def get_sample_with_bad_argument(experiment_id):
+            raise ArgumentError("argument 1: wrong type")
+
+        fake.GetSample = get_sample_with_bad_argument
+        admin.astra_com._methods.pop("GetSample", None)
+        try:
+            with self.assertRaises(ArgumentError):
+                admin.get_sample(exp_id)
+
+            # Errors that are not COM errors are reported like the API errors instead of stopping the caller.
+            admin.should_show_error_message_box = True
+            with contextlib.redirect_stderr(io.StringIO()):
+                sample = admin.get_sample(exp_id)
+                executed = admin.try_execute(lambda: admin.astra_com.GetSample(exp_id))
+        finally:
+            admin.should_show_error_message_box = False
+            del fake.GetSample
+            admin.astra_com._methods.pop("GetSample", None)
+
+        self.assertIsInstance(sample, SampleInfo)
+        self.assertEqual("", sample.name)
+        self.assertFalse(executed)
+        self.assertIsInstance(admin.last_error, astra_admin.AstraError)
+        self.assertIsNone(admin.last_error.hresult)
+        self.assertIn("wrong type", admin.last_error.message)
+        admin.close_experiment(exp_id)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Crash-safe journal of the progress of a sequence.
+
+Each change of state of a row of a sequence (see "sequence_runner") is appended to a SQLite
+database and synchronized to disk before the runner moves on, so that after a crash of Python or
+ASTRA the sequence can be resumed: completed rows are skipped and the experiments of interrupted
+rows are reattached rather than collected again.
+"""
+import sqlite3
+
+from dataclasses import dataclass
+from enum import Enum
+from threading import Lock
+from time import time
+
+
+class RowState(Enum):
+    PENDING = "pending"
+    # Experiment created from its method, parameters set.
+    CREATED = "created"
+    COLLECTING = "collecting"
+    # Collection finished and experiment run, not saved yet.
+    COLLECTED = "collected"
+    # Experiment saved, results and datasets not exported yet.
+    SAVED = "saved"
+    EXPORTED = "exported"
+    FAILED = "failed"
+
+
+@dataclass
+class JournalEntry:
+    """Last known state of a row."""
+    index: int
+    experiment_path: str
+    state: RowState
+    experiment_id: int
+    error: str
+    time: float
+
+
+class SequenceJournal:
+    """Append-only journal of the states of the rows of a sequence. Thread safe.
+
+    Rows are identified by their index and experiment path, so that the journal of a sequence is
+    not applied to a sequence file that has been edited since.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Constructor.
+
+        Args:
+            path (str): Location of the journal, created if it does not exist.
+        """
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Every transition is on disk once "record" returns.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS transitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                row_index INTEGER NOT NULL,
+                experiment_path TEXT NOT NULL,
+                state TEXT NOT NULL,
+                experiment_id INTEGER NOT NULL,
+                error TEXT NOT NULL,
+                time REAL NOT NULL
+            )"""
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS transitions_row ON transitions (row_index, experiment_path)"
+        )
+
+    def record(self, index: int, experiment_path: str, state: RowState, experiment_id: int = -1, error: str = "") -> None:
+        """Append a change of state of a row.
+
+        Args:
+            index (int): Index of the row in the sequence.
+            experiment_path (str): Location where the experiment of the row is saved.
+            state (RowState): New state of the row.
+            experiment_id (int, optional): ID of the experiment of the row. Defaults to -1 (none).
+            error (str, optional): Error of the row. Defaults to "" (none).
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO transitions (row_index, experiment_path, state, experiment_id, error, time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (index, experiment_path, state.value, experiment_id, error, time()),
+            )
+
+    def last_entry(self, index: int, experiment_path: str) -> JournalEntry:
+        """Get the last known state of a row.
+
+        Args:
+            index (int): Index of the row in the sequence.
+            experiment_path (str): Location where the experiment of the row is saved.
+
+        Returns:
+            JournalEntry: Last state of the row, None if the row was never started.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT row_index, experiment_path, state, experiment_id, error, time FROM transitions "
+                "WHERE row_index = ? AND experiment_path = ? ORDER BY id DESC LIMIT 1",
+                (index, experiment_path),
+            ).fetchone()
+        return self._to_entry(row) if row is not None else None
+
+    def entries(self) -> list[JournalEntry]:
+        """Get the last known state of all rows started.
+
+        Returns:
+            list[JournalEntry]: Last state of each row, by index.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT row_index, experiment_path, state, experiment_id, error, time FROM transitions "
+                "WHERE id IN (SELECT MAX(id) FROM transitions GROUP BY row_index, experiment_path) "
+                "ORDER BY row_index"
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "SequenceJournal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @staticmethod
+    def _to_entry(row: tuple) -> JournalEntry:
+        index, experiment_path, state, experiment_id, error, time = row
+        return JournalEntry(index, experiment_path, RowState(state), experiment_id, error, time)
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+Pipelined runner of collection sequences.
+
+Each row of a sequence goes through three stages: prepare (create the experiment from its
+method and set its parameters), collect, and export (save the experiment, results and dataset,
+then close it). Only the collection uses the instrument, so the experiment of the next row is
+prepared while the current one is collecting, and exports run in the background while the next
+row is collecting.
+
+With a "SequenceJournal", the state of each row is journaled as it progresses and an
+interrupted sequence is resumed by running it again with the same journal.
+"""
+import os
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Callable
+
+from astra_admin import AstraAdmin, ExperimentEventType, ExperimentParameterBatch, SampleInfo
+from sequence_journal import JournalEntry, RowState, SequenceJournal
+
+
+@dataclass
+class SequenceRow:
+    """Collection of a sequence, see "AstraAdmin.collect_data".
+    """
+    method_path: str
+    experiment_path: str
+    sample: SampleInfo
+    duration: float
+    injection_volume: float
+    # Negative to keep the flow rate of the method.
+    flow_rate: float = -1.0
+
+
+@dataclass
+class SequenceResult:
+    """Outcome of a row of a sequence.
+    """
+    row: SequenceRow
+    # Index of the row in the sequence.
+    index: int = 0
+    experiment_id: int = -1
+    success: bool = False
+    error: str = ""
+    state: RowState = RowState.PENDING
+    # Completed, or reattached, from a previous run of the sequence.
+    resumed: bool = False
+    # Time the instrument was idle before this collection started, in seconds.
+    idle_time: float = 0.0
+    collection_time: float = 0.0
+    export_time: float = 0.0
+    results_path: str = None
+    data_set_paths: list[str] = field(default_factory=list)
+
+
+def read_sequence_csv(path: str, export_path: str) -> list[SequenceRow]:
+    """Read a sequence from a CSV file, one row per injection.
+
+    Args:
+        path (str): Location of the CSV file.
+        export_path (str): Directory where the experiments are saved.
+
+    Returns:
+        list[SequenceRow]: Rows of the sequence.
+    """
+    rows = []
+    with open(path, "r") as file:
+        lines = file.readlines()
+    for line in lines:
+        if len(line) == 0:
+            continue
+
+        # values store data from a row in the csv file, where
+        # values[0]: Enable
+        # values[1]: Name
+        # values[2]: Description
+        # values[3]: Injection
+        # values[4]: Method
+        # values[5]: Duration (minutes)
+        # values[6]: Injection Volume (microL)
+        # values[7]: dn/dc (mL/g)
+        # values[8]: A2 (mol mL/g^2)
+        # values[9]: UV Ext (mL/(mg cm)))
+        # values[10]: Concentration (mg/mL)
+        # values [11]: Flow Rate (mL/min)
+        values = line.split(",")
+
+        if len(values) != 12 or values[0] == "FALSE":
+            continue
+
+        injection = int(values[3])
+        for i in range(1, injection + 1):
+            sample_info = SampleInfo(
+                name=values[1],
+                description=values[2],
+                dndc=float(values[7]),
+                a2=float(values[8]),
+                uvExtinction=float(values[9]),
+                concentration=float(values[10]),
+            )
+
+            exp_file_name = sample_info.name if len(sample_info.name) > 0 else "untitled"
+            if injection > 1:
+                exp_file_name += f" ({i} of {injection})"
+
+            rows.append(
+                SequenceRow(
+                    method_path=values[4],
+                    experiment_path=os.path.join(export_path, exp_file_name),
+                    sample=sample_info,
+                    duration=float(values[5]),
+                    injection_volume=float(values[6]),
+                    flow_rate=float(values[11]),
+                )
+            )
+    return rows
+
+
+class PipelinedSequenceRunner:
+    """Run the rows of a sequence, overlapping the preparation of the next experiment and the export
+    of the previous ones with the current collection.
+
+    Unlike "AstraAdmin.collect_data", the parameters of each row are set before its collection,
+    while the previous row is collecting, rather than re-running the experiment after it.
+    """
+
+    def __init__(
+        self,
+        admin: AstraAdmin = None,
+        progress_update: Callable = print,
+        save_results: bool = False,
+        data_set_definitions: list[str] = None,
+        journal: SequenceJournal = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            admin (AstraAdmin, optional): AstraAdmin to use. Defaults to None (the AstraAdmin singleton).
+            progress_update (Callable, optional): Called with a message at each major step. Defaults to print.
+            save_results (bool, optional): Save the results next to each experiment, as XML. Defaults to False.
+            data_set_definitions (list[str], optional): Datasets saved next to each experiment, as CSV. Defaults to None (none).
+            journal (SequenceJournal, optional): Journal of the sequence, to resume it. Defaults to None (no journal).
+        """
+        self.admin = admin if admin is not None else AstraAdmin()
+        self.progress_update = progress_update
+        self.save_results = save_results
+        self.data_set_definitions = data_set_definitions or []
+        self.journal = journal
+
+    def run(self, rows: list[SequenceRow]) -> list[SequenceResult]:
+        """Run a sequence. Rows completed in a previous run with the same journal are skipped,
+        and the experiments of rows interrupted after their collection are exported without collecting again.
+
+        Args:
+            rows (list[SequenceRow]): Rows of the sequence.
+
+        Returns:
+            list[SequenceResult]: Outcome of each row, once all exports are completed.
+        """
+        results = [SequenceResult(row=row, index=index) for index, row in enumerate(rows)]
+        exports: list[Future] = []
+        last_run = None
+        with ThreadPoolExecutor(1, "AstraPrepare") as preparer, ThreadPoolExecutor(1, "AstraExport") as exporter:
+            pending = []
+            for result in results:
+                if not self._resume(result):
+                    pending.append(result)
+                elif not result.success:
+                    exports.append(exporter.submit(self._export, result))
+
+            prepared = preparer.submit(self._prepare, pending[0]) if pending else None
+            for index, result in enumerate(pending):
+                try:
+                    prepared.result()
+                except Exception as ex:
+                    result.error = str(ex)
+                if index + 1 < len(pending):
+                    prepared = preparer.submit(self._prepare, pending[index + 1])
+                if result.experiment_id <= 0:
+                    self._record(result, RowState.FAILED)
+                    continue
+                if result.error:
+                    self._record(result, RowState.FAILED)
+                    self.admin.close_experiment(result.experiment_id)
+                    continue
+
+                if last_run is not None:
+                    result.idle_time = monotonic() - last_run
+                if not self._collect(result):
+                    continue
+                last_run = monotonic()
+                exports.append(exporter.submit(self._export, result))
+
+            for export in exports:
+                export.result()
+        return results
+
+    def _prepare(self, result: SequenceResult) -> None:
+        row = result.row
+        self.progress_update(f'Preparing experiment using method "{row.method_path}"...')
+        start = monotonic()
+        result.experiment_id = self.admin.new_experiment_from_template(row.method_path)
+        self.admin.tracer.record("create_experiment", start, monotonic(), result.experiment_id, method=row.method_path)
+        if result.experiment_id <= 0:
+            result.error = f'Could not create experiment from "{row.method_path}"'
+            return
+
+        with self.admin.tracer.span("apply_parameters", result.experiment_id):
+            batch = ExperimentParameterBatch(result.experiment_id)
+            batch.set_sample(row.sample).set_collection_duration(row.duration).set_injected_volume(row.injection_volume)
+            if row.flow_rate >= 0:
+                batch.set_pump_flow_rate(row.flow_rate)
+            applied = batch.apply()
+        if not applied:
+            result.error = "Could not set the experiment parameters"
+            return
+        self._record(result, RowState.CREATED)
+
+    def _collect(self, result: SequenceResult) -> bool:
+        admin = self.admin
+        experiment_id = result.experiment_id
+        futures, event_times = admin.arm_collection(experiment_id)
+        self._record(result, RowState.COLLECTING)
+        self.progress_update(f"Collection of {os.path.basename(result.row.experiment_path)} starting...")
+        start = event_times["START_COLLECTION"] = monotonic()
+        if not admin.start_collection(experiment_id):
+            for future in futures.values():
+                future.cancel()
+            result.error = "Could not start collection"
+            self._record(result, RowState.FAILED)
+            admin.close_experiment(experiment_id)
+            return False
+
+        admin.wait_future(futures[ExperimentEventType.PREPARING_FOR_COLLECTION])
+        self.progress_update("Preparing for collection...")
+        admin.wait_future(futures[ExperimentEventType.WAITING_FOR_AUTO_INJECT])
+        self.progress_update("Waiting for auto-inject...")
+        admin.wait_future(futures[ExperimentEventType.COLLECTION_STARTED])
+        self.progress_update("Starting collecting data...")
+        admin.wait_future(futures[ExperimentEventType.COLLECTION_FINISHED])
+        self.progress_update("Collection finished.")
+        admin.wait_future(futures[ExperimentEventType.RUN])
+        result.collection_time = monotonic() - start
+        admin.tracer.record_collection(experiment_id, event_times)
+        self._record(result, RowState.COLLECTED)
+        return True
+
+    def _export(self, result: SequenceResult) -> None:
+        admin = self.admin
+        experiment_id = result.experiment_id
+        path = result.row.experiment_path
+        start = monotonic()
+        try:
+            self.progress_update(f'Saving experiment "{path}"...')
+            with admin.tracer.span("save", experiment_id, path=path):
+                saved = admin.save_experiment(experiment_id, path)
+            if not saved:
+                result.error = f'Could not save experiment "{path}"'
+                return
+            self._record(result, RowState.SAVED)
+            with admin.tracer.span("export", experiment_id):
+                self._export_results(result)
+            result.success = not result.error
+            if result.success:
+                self._record(result, RowState.EXPORTED)
+        finally:
+            if not result.success:
+                self._record(result)
+            if result.state == RowState.COLLECTED:
+                # Not saved, the experiment is left open so that a resumed sequence can reattach it.
+                self.progress_update(f'Experiment "{path}" could not be saved and is left open.')
+            else:
+                with admin.tracer.span("close", experiment_id):
+                    admin.close_experiment(experiment_id)
+            result.export_time = monotonic() - start
+            self.progress_update(f'Experiment "{path}" completed.')
+
+    def _export_results(self, result: SequenceResult) -> None:
+        admin = self.admin
+        experiment_id = result.experiment_id
+        base_path = os.path.splitext(result.row.experiment_path)[0]
+        if self.save_results:
+            result.results_path = f"{base_path}.xml"
+            if not admin.save_results(experiment_id, result.results_path):
+                result.error = f'Could not save results "{result.results_path}"'
+                return
+        for definition_name in self.data_set_definitions:
+            data_set_path = f"{base_path} - {definition_name}.csv"
+            if not admin.save_data_set(experiment_id, definition_name, data_set_path):
+                result.error = f'Could not save data set "{definition_name}"'
+                return
+            result.data_set_paths.append(data_set_path)
+
+    def _resume(self, result: SequenceResult) -> bool:
+        """Restore the state of a row from the journal.
+
+        Returns:
+            bool: True if the row does not need to be collected, i.e. it is completed or its experiment was reattached.
+        """
+        if self.journal is None:
+            return False
+        path = result.row.experiment_path
+        entry = self.journal.last_entry(result.index, path)
+        if entry is None:
+            return False
+
+        if entry.state == RowState.EXPORTED:
+            result.state = entry.state
+            result.experiment_id = entry.experiment_id
+            result.success = result.resumed = True
+            self.progress_update(f'Experiment "{path}" already completed, skipped.')
+            return True
+
+        if entry.state in (RowState.COLLECTING, RowState.COLLECTED, RowState.SAVED) and self._reattach(result, entry):
+            self.progress_update(f'Experiment "{path}" reattached.')
+            result.resumed = True
+            return True
+
+        if entry.state == RowState.SAVED:
+            # ASTRA was restarted, the saved experiment holds the collected data.
+            experiment_id = self.admin.open_experiment(_saved_experiment_file(path) or path)
+            if experiment_id > 0:
+                self.progress_update(f'Experiment "{path}" reopened.')
+                result.experiment_id = experiment_id
+                result.state = entry.state
+                result.resumed = True
+                return True
+
+        if entry.state == RowState.CREATED and self._adopt(result, entry.experiment_id):
+            # Prepared but never collected, it is prepared again with the rest of the sequence.
+            self.admin.close_experiment(result.experiment_id)
+            result.experiment_id = -1
+        return False
+
+    def _reattach(self, result: SequenceResult, entry: JournalEntry) -> bool:
+        admin = self.admin
+        if not self._adopt(result, entry.experiment_id):
+            return False
+        experiment_id = result.experiment_id
+        if entry.state == RowState.COLLECTING:
+            # Arm before checking, so that the end of the collection cannot be missed.
+            run = admin.event_router.arm(experiment_id, ExperimentEventType.RUN)
+            if admin.is_running(experiment_id):
+                self.progress_update("Waiting for the collection in progress...")
+                admin.wait_future(run)
+            else:
+                run.cancel()
+        if not admin.has_collected_data(experiment_id):
+            admin.close_experiment(experiment_id)
+            result.experiment_id = -1
+            return False
+        result.state = RowState.SAVED if entry.state == RowState.SAVED else RowState.COLLECTED
+        return True
+
+    def _adopt(self, result: SequenceResult, experiment_id: int) -> bool:
+        """Register the experiment of a previous run if it is still open in ASTRA."""
+        if experiment_id <= 0:
+            return False
+        admin = self.admin
+        try:
+            # IDs are reused once ASTRA is restarted, check that the experiment is the one of the row.
+            if admin.get_sample_name(experiment_id) != result.row.sample.name:
+                return False
+        except Exception:
+            return False
+        if admin.register_experiment(lambda: experiment_id) <= 0:
+            return False
+        admin.refresh_experiment(experiment_id)
+        result.experiment_id = experiment_id
+        return True
+
+    def _record(self, result: SequenceResult, state: RowState = None) -> None:
+        if state is not None:
+            result.state = state
+        if self.journal is not None:
+            self.journal.record(result.index, result.row.experiment_path, result.state, result.experiment_id, result.error)
+
+
+def _saved_experiment_file(path: str) -> str:
+    # ASTRA adds the extension of the experiment files when saving.
+    for file_name in (path, f"{path}.afe8", f"{path}.afe7"):
+        if os.path.isfile(file_name):
+            return file_name
+    return None
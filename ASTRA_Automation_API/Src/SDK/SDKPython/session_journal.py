@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+Record and replay of the sessions between "AstraAdmin" and ASTRA.
+
+"SessionRecorder" writes every call made on the ASTRA objects, with its arguments, return value
+or error and timing, and every ASTRA event to a binary journal. "ReplayBackend" plays a journal
+back in place of ASTRA, at recorded speed or as fast as possible, so that a real session can be
+replayed anywhere to measure the wrapper:
+
+    ASTRA_BACKEND=replay ASTRA_REPLAY_JOURNAL=overnight.journal python my_benchmark.py
+
+Journals are read with pickle, only replay journals you trust.
+"""
+import pickle
+import struct
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, fields, is_dataclass
+from threading import Lock
+from time import monotonic, sleep
+from types import SimpleNamespace
+
+from fake_astra import EventScheduler, FakeConnection, UvDeviceDetails
+
+
+MAGIC = b"ASTRAJ\x01\n"
+
+# Record header: kind and size of the pickled record.
+_header = struct.Struct("<BI")
+
+CALL = 1
+GET = 2
+EVENT = 3
+
+# Name of the channels, i.e. of the ASTRA objects, by ProgID prefix.
+_channels = {"WTC.ASTRA": "astra", "Wyatt.AstraSP": "sp"}
+
+
+@dataclass
+class Structure:
+    """Value of a structure (e.g. SampleInfo) as stored in a journal."""
+    type: str
+    values: dict
+
+
+@dataclass
+class CallRecord:
+    """Call of a method, or read of a property, of an ASTRA object."""
+    index: int
+    channel: str
+    name: str
+    args: tuple
+    result: object
+    error: tuple
+    start: float
+    duration: float
+    is_property: bool = False
+
+
+@dataclass
+class EventRecord:
+    """ASTRA event, "trigger" being the index of the last call completed before it was received."""
+    name: str
+    args: tuple
+    time: float
+    trigger: int
+
+
+class ReplayedComError(Exception):
+    """Error raised by a replayed call, with the arguments of the recorded error."""
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.hresult = args[0] if args and isinstance(args[0], int) else None
+
+
+class JournalMismatchError(LookupError):
+    """A call made during a replay was not recorded."""
+
+
+def to_plain(value):
+    """Convert a value exchanged with ASTRA to plain Python values that can be stored in a journal.
+
+    Args:
+        value (_type_): Argument or return value of a call.
+
+    Returns:
+        _type_: Plain value, structures being stored as "Structure".
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(to_plain(item) for item in value)
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if type(value).__module__ == "numpy":
+        # NumPy array or scalar, e.g. the data pushed by "VisionUvStream".
+        return value.tolist()
+    if is_dataclass(value):
+        names = [field.name for field in fields(value)]
+    elif hasattr(value, "_fields_"):
+        # ctypes structure, e.g. a record of the ASTRA type library.
+        names = [field[0] for field in value._fields_]
+    else:
+        return repr(value)
+    return Structure(type(value).__name__, {name: to_plain(getattr(value, name)) for name in names})
+
+
+def from_plain(value):
+    """Convert a value read from a journal back to an object with the attributes of the recorded value.
+
+    Args:
+        value (_type_): Value returned by "to_plain".
+
+    Returns:
+        _type_: Value, structures being returned as "SimpleNamespace".
+    """
+    if isinstance(value, Structure):
+        return SimpleNamespace(**{name: from_plain(item) for name, item in value.values.items()})
+    if isinstance(value, (list, tuple)):
+        return type(value)(from_plain(item) for item in value)
+    return value
+
+
+class JournalWriter:
+    """Append records to a journal file. Thread safe."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._lock = Lock()
+        self._origin = monotonic()
+        self._calls = 0
+        # Index of the last call completed, events are replayed after it.
+        self._last_call = None
+
+    def now(self) -> float:
+        return monotonic() - self._origin
+
+    def write_call(self, kind: int, channel: str, name: str, args: tuple, result, error, start: float) -> None:
+        duration = self.now() - start
+        with self._lock:
+            record = CallRecord(
+                self._calls, channel, name, to_plain(args), to_plain(result), error, start, duration, kind == GET
+            )
+            self._calls += 1
+            self._last_call = record.index
+            self._write(kind, record)
+
+    def write_event(self, name: str, args: tuple) -> None:
+        with self._lock:
+            self._write(EVENT, EventRecord(name, to_plain(args), self.now(), self._last_call))
+
+    def _write(self, kind: int, record) -> None:
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(_header.pack(kind, len(data)))
+        self._file.write(data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_journal(path: str) -> list:
+    """Read all the records of a journal.
+
+    Args:
+        path (str): Location of the journal.
+
+    Returns:
+        list: "CallRecord" and "EventRecord", in recorded order.
+    """
+    records = []
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an ASTRA session journal")
+        while True:
+            header = file.read(_header.size)
+            if len(header) < _header.size:
+                break
+            _, size = _header.unpack(header)
+            data = file.read(size)
+            if len(data) < size:
+                # Journal of a session that did not end cleanly.
+                break
+            records.append(pickle.loads(data))
+    return records
+
+
+class RecordingProxy:
+    """Record the calls made on an ASTRA object, e.g. "AstraAdmin.astra_com"."""
+
+    def __init__(self, target, writer: JournalWriter, channel: str) -> None:
+        self.target = target
+        self.writer = writer
+        self.channel = channel
+
+    @property
+    def com_object(self):
+        # Used by "ComThread.get_events".
+        return self.target.com_object
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        start = self.writer.now()
+        attribute = getattr(self.target, name)
+        if not callable(attribute):
+            self.writer.write_call(GET, self.channel, name, (), attribute, None, start)
+            return attribute
+
+        def call(*args):
+            start = self.writer.now()
+            try:
+                result = attribute(*args)
+            except Exception as ex:
+                self.writer.write_call(CALL, self.channel, name, args, None, to_plain(ex.args), start)
+                raise
+            self.writer.write_call(CALL, self.channel, name, args, result, None, start)
+            return result
+
+        return call
+
+
+class RecordingSink:
+    """Record the ASTRA events received by a sink, e.g. "AstraAdmin.events"."""
+
+    prefix = "_IAstraEvents_"
+
+    def __init__(self, sink, writer: JournalWriter) -> None:
+        self.sink = sink
+        self.writer = writer
+
+    def __getattr__(self, name: str):
+        handler = getattr(self.sink, name)
+        if not name.startswith(self.prefix):
+            return handler
+
+        def on_event(*args):
+            self.writer.write_event(name[len(self.prefix):], args)
+            return handler(*args)
+
+        return on_event
+
+
+class SessionRecorder:
+    """Record the session of an AstraAdmin to a journal, from "start" to "stop".
+
+    Example:
+        with SessionRecorder("overnight.journal"):
+            run_sequence()
+    """
+
+    def __init__(self, path: str, admin=None) -> None:
+        """Constructor.
+
+        Args:
+            path (str): Location of the journal, overwritten if it exists.
+            admin (AstraAdmin, optional): AstraAdmin to record. Defaults to None (the AstraAdmin singleton).
+        """
+        if admin is None:
+            from astra_admin import AstraAdmin
+
+            admin = AstraAdmin()
+        self.path = path
+        self.admin = admin
+        self.writer = None
+        self._saved = None
+
+    def start(self) -> None:
+        # The ASTRA objects are class attributes of AstraAdmin: they are swapped on the class, so that
+        # "AstraAdmin.connect" and "AstraAdmin.attach" still replace them while recording.
+        cls = type(self.admin)
+        cls.connect()
+        self.writer = JournalWriter(self.path)
+        self._saved = (cls.astra_com, cls.astra_sp_com)
+        cls.astra_com = RecordingProxy(cls.astra_com, self.writer, "astra")
+        cls.astra_sp_com = RecordingProxy(cls.astra_sp_com, self.writer, "sp")
+        self._reconnect(RecordingSink(cls.events, self.writer))
+
+    def stop(self) -> None:
+        admin = self.admin
+        cls = type(admin)
+        # Restored unless ASTRA was reconnected meanwhile, in which case the new objects are kept.
+        if isinstance(cls.astra_com, RecordingProxy):
+            cls.astra_com = self._saved[0]
+        if isinstance(cls.astra_sp_com, RecordingProxy):
+            cls.astra_sp_com = self._saved[1]
+        for name in ("astra_com", "astra_sp_com", "connection"):
+            # Left by earlier versions of the recorder, they would hide the class attributes.
+            admin.__dict__.pop(name, None)
+        self._reconnect(cls.events)
+        self._saved = None
+        self.writer.close()
+
+    def _reconnect(self, sink) -> None:
+        cls = type(self.admin)
+
+        def reconnect():
+            # Done on the COM thread, so that no event is received by both sinks or by neither.
+            cls.connection = None
+            cls.connection = cls.com_thread.get_events(cls.astra_com, sink)
+
+        cls.com_thread.call(reconnect)
+
+    def __enter__(self) -> "SessionRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class ReplaySession:
+    """Records of a journal, consumed as the replayed ASTRA objects are called."""
+
+    def __init__(self, path: str, speed: float = None) -> None:
+        """Constructor.
+
+        Args:
+            path (str): Location of the journal.
+            speed (float, optional): Replay speed, 1.0 being the recorded speed. Defaults to None (as fast as possible).
+        """
+        self.speed = speed
+        self.mismatches: list[tuple[str, str, tuple]] = []
+        self._calls = defaultdict(deque)
+        self._events = defaultdict(list)
+        self._lock = Lock()
+        self._sinks = set()
+        self._scheduler = EventScheduler("AstraReplayEvents")
+
+        records = read_journal(path)
+        for record in records:
+            if isinstance(record, EventRecord):
+                self._events[record.trigger].append(record)
+        calls = [record for record in records if isinstance(record, CallRecord)]
+        for record in calls:
+            self._calls[(record.channel, record.name)].append(record)
+        self._end = {record.index: record.start + record.duration for record in calls}
+        self.property_names = {(record.channel, record.name) for record in calls if record.is_property}
+
+    def connect(self, sink) -> FakeConnection:
+        self._sinks.add(sink)
+        # Events received before the first call, e.g. InstrumentDetectionCompleted.
+        self._fire_events(None, 0.0)
+        return FakeConnection(self, sink)
+
+    def call(self, channel: str, name: str, args: tuple):
+        with self._lock:
+            calls = self._calls.get((channel, name))
+            record = calls.popleft() if calls else None
+        if record is None:
+            self.mismatches.append((channel, name, args))
+            raise JournalMismatchError(f"{channel}.{name}{args} was not recorded")
+        if self.speed:
+            sleep(record.duration / self.speed)
+        self._fire_events(record.index, self._end[record.index])
+        if record.error is not None:
+            raise ReplayedComError(*record.error)
+        return from_plain(record.result)
+
+    def _fire_events(self, trigger: int, time: float) -> None:
+        for event in self._events.pop(trigger, ()):
+            delay = (event.time - time) / self.speed if self.speed else 0.0
+            self._scheduler.schedule(max(delay, 0.0), self._fire, event)
+
+    def _fire(self, event: EventRecord) -> None:
+        for sink in list(self._sinks):
+            getattr(sink, f"{RecordingSink.prefix}{event.name}")(*from_plain(event.args))
+
+    def close(self) -> None:
+        self._scheduler.stop()
+
+
+class ReplayObject:
+    """Replayed ASTRA object."""
+
+    def __init__(self, session: ReplaySession, channel: str) -> None:
+        self.session = session
+        self.channel = channel
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if (self.channel, name) in self.session.property_names:
+            return self.session.call(self.channel, name, ())
+        return lambda *args: self.session.call(self.channel, name, args)
+
+
+class ReplayBackend:
+    """Backend replaying a journal in place of ASTRA."""
+
+    name = "replay"
+
+    pumps_messages = False
+
+    def __init__(self, path: str, speed: float = None) -> None:
+        """Constructor.
+
+        Args:
+            path (str): Location of the journal.
+            speed (float, optional): Replay speed, 1.0 being the recorded speed. Defaults to None (as fast as possible).
+        """
+        self.session = ReplaySession(path, speed)
+
+    def initialize(self) -> None:
+        pass
+
+    def uninitialize(self) -> None:
+        pass
+
+    def create_object(self, prog_id: str) -> ReplayObject:
+        for prefix, channel in _channels.items():
+            if prog_id.startswith(prefix):
+                return ReplayObject(self.session, channel)
+        raise ValueError(f"No channel recorded for {prog_id}")
+
+    def get_events(self, source: ReplayObject, sink) -> FakeConnection:
+        return source.session.connect(sink)
+
+    def double_array(self, values):
+        return values
+
+    def uv_device_details(self) -> type:
+        return UvDeviceDetails
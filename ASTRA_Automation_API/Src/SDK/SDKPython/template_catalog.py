@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Cached catalog of the experiment templates and of the Data database directories.
+
+"AstraAdmin.get_experiment_templates" and "AstraAdmin.get_data_database_directory" query ASTRA
+and the system database on every call. "TemplateCatalog" keeps their last result in memory and
+in a JSON file, so that a new client starts from the previous listing, and reads them again in
+the background once they are older than a time to live:
+
+    catalog = TemplateCatalog(path="templates.json").start()
+    catalog.add_change_observer(lambda snapshot: editor.reload(snapshot.templates))
+    paths = catalog.lookup("ls online")
+"""
+import json
+import os
+import traceback
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from threading import Condition, Lock, Thread
+from time import time
+from typing import Callable
+
+from astra_admin import AstraAdmin, observer_dispatcher
+from astra_errors import AstraError
+
+
+@dataclass
+class CatalogSnapshot:
+    """Templates and directories read from ASTRA at "read_time" (Unix time)."""
+    templates: list[str] = field(default_factory=list)
+    directories: dict[str, list[str]] = field(default_factory=dict)
+    read_time: float = 0.0
+
+
+class TemplateCatalog:
+    """Serve the experiment templates and Data database directories from a cache refreshed in the background.
+    Observers added with "add_change_observer" are notified with the new snapshot when the listing changes.
+    """
+
+    def __init__(
+        self,
+        admin: AstraAdmin = None,
+        path: str = None,
+        ttl: float = 300.0,
+        directory_roots: tuple[str, ...] = ("",),
+    ) -> None:
+        """Constructor.
+
+        Args:
+            admin (AstraAdmin, optional): AstraAdmin to use. Defaults to None (the AstraAdmin singleton).
+            path (str, optional): JSON file keeping the catalog between sessions. Defaults to None (memory only).
+            ttl (float, optional): Age of the catalog, in seconds, after which it is read again. Defaults to 300.
+            directory_roots (tuple[str, ...], optional): Root paths whose directories are cached. Defaults to ("",).
+        """
+        self.admin = admin if admin is not None else AstraAdmin()
+        self.path = path
+        self.ttl = ttl
+        self._roots = list(directory_roots)
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._wakeup = Condition(self._lock)
+        self._snapshot: CatalogSnapshot = None
+        # Lower case keys sorted for the prefix lookups, and the template path of each key.
+        self._keys: list[str] = []
+        self._paths: list[str] = []
+        self._observers: list[Callable] = []
+        self._thread: Thread = None
+        self._stopped = False
+        # Last failure of a background refresh.
+        self.last_error: Exception = None
+        if path is not None:
+            snapshot = self._load(path)
+            if snapshot is not None:
+                self._set_snapshot(snapshot)
+
+    def add_change_observer(self, observer: Callable) -> None:
+        """Call "observer" with the new CatalogSnapshot each time the templates or directories change.
+
+        Args:
+            observer (Callable): Function taking a CatalogSnapshot, called on the observer dispatcher.
+        """
+        self._observers.append(observer)
+
+    def start(self) -> "TemplateCatalog":
+        """Start refreshing the catalog in the background, right away if it is older than the time to live.
+
+        Returns:
+            TemplateCatalog: This catalog.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = Thread(target=self._run, name="AstraTemplateCatalog", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._stopped = True
+            self._thread = None
+            self._wakeup.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> "TemplateCatalog":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Get the cached catalog, reading it from ASTRA if there is none yet.
+
+        Returns:
+            CatalogSnapshot: Templates and directories.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def templates(self) -> list[str]:
+        """Get the experiment templates, see "AstraAdmin.get_experiment_templates".
+
+        Returns:
+            list[str]: Paths of the templates in the system database.
+        """
+        return list(self.snapshot().templates)
+
+    def directories(self, root_path: str = "") -> list[str]:
+        """Get the directories of the Data database under "root_path", see "AstraAdmin.get_data_database_directory".
+        A root path read for the first time is added to the cached ones.
+
+        Args:
+            root_path (str, optional): Path used to get all sub directories. Defaults to "".
+
+        Returns:
+            list[str]: Directories under "root_path".
+        """
+        directories = self.snapshot().directories.get(root_path)
+        if directories is None:
+            with self._lock:
+                if root_path not in self._roots:
+                    self._roots.append(root_path)
+            self.refresh()
+            directories = self.snapshot().directories.get(root_path, [])
+        return list(directories)
+
+    def lookup(self, query: str, limit: int = 10) -> list[str]:
+        """Find templates by path, ignoring case. Paths starting with "query", or with a path
+        component starting with it (e.g. "Online/Default"), come first, followed by approximate matches.
+
+        Args:
+            query (str): Start of a path or of a path component, or approximate template name.
+            limit (int, optional): Maximum number of paths returned. Defaults to 10.
+
+        Returns:
+            list[str]: Template paths, best matches first.
+        """
+        self.snapshot()
+        query = query.strip().lower()
+        if not query:
+            return []
+        with self._lock:
+            keys = self._keys
+            paths = self._paths
+        matches = []
+        index = bisect_left(keys, query)
+        while index < len(keys) and keys[index].startswith(query) and len(matches) < limit:
+            if paths[index] not in matches:
+                matches.append(paths[index])
+            index += 1
+        if len(matches) < limit:
+            # Approximate matches, so that "ls online" or "conformaton" find ".../Light Scattering/Online/Conformation".
+            tokens = query.replace("/", " ").split()
+            scores = []
+            for path in {path for path in paths if path not in matches}:
+                score = _fuzzy_score(tokens, path)
+                if score > 0:
+                    scores.append((-score, len(path), path))
+            matches += [path for _, _, path in sorted(scores)[:limit - len(matches)]]
+        return matches
+
+    def refresh(self) -> bool:
+        """Read the templates and directories from ASTRA now, and notify the observers if they changed.
+
+        Raises:
+            AstraError: ASTRA failed to list the templates or directories, the cached catalog is kept.
+
+        Returns:
+            bool: True if the catalog changed, false otherwise.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                roots = list(self._roots)
+            # Called without "try_get", so that a failure keeps the cached catalog rather than emptying it.
+            admin = self.admin
+            templates = [str(template) for template in admin.timed_call(lambda: admin.astra_com.GetExperimentTemplates()) or ()]
+            directories = {
+                root: [
+                    str(directory)
+                    for directory in admin.timed_call(lambda: admin.astra_com.GetDataDatabaseDirectory(root)) or ()
+                ]
+                for root in roots
+            }
+            snapshot = CatalogSnapshot(templates, directories, time())
+            previous = self._snapshot
+            changed = previous is None or previous.templates != templates or previous.directories != directories
+            self._set_snapshot(snapshot)
+            if self.path is not None:
+                self._save(self.path, snapshot)
+        if changed:
+            for observer in self._observers:
+                observer_dispatcher.post(observer, snapshot)
+        return changed
+
+    def _set_snapshot(self, snapshot: CatalogSnapshot) -> None:
+        # Each template is indexed by its whole path and by the rest of its path after each "/".
+        index = []
+        for path in snapshot.templates:
+            key = path.lower()
+            index.append((key, path))
+            position = key.find("/")
+            while position >= 0:
+                if position + 1 < len(key) and key[position + 1] != "/":
+                    index.append((key[position + 1:], path))
+                position = key.find("/", position + 1)
+        index.sort()
+        with self._lock:
+            self._snapshot = snapshot
+            self._keys = [key for key, _ in index]
+            self._paths = [path for _, path in index]
+            for root in snapshot.directories:
+                if root not in self._roots:
+                    self._roots.append(root)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                snapshot = self._snapshot
+                wait = 0.0 if snapshot is None else snapshot.read_time + self.ttl - time()
+                if wait > 0:
+                    self._wakeup.wait(wait)
+                    continue
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as ex:
+                # The cached catalog is still served, the refresh is tried again after the time to live.
+                if not isinstance(ex, (AstraError, OSError)):
+                    traceback.print_exc()
+                self.last_error = ex
+                with self._lock:
+                    if not self._stopped:
+                        self._wakeup.wait(self.ttl)
+
+    @staticmethod
+    def _load(path: str) -> CatalogSnapshot:
+        try:
+            with open(path, encoding="utf-8") as file:
+                value = json.load(file)
+            return CatalogSnapshot(list(value["templates"]), dict(value["directories"]), float(value["read_time"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or unreadable, the catalog is read from ASTRA instead.
+            return None
+
+    @staticmethod
+    def _save(path: str, snapshot: CatalogSnapshot) -> None:
+        # Written to a temporary file first, so that a client starting meanwhile never reads a partial file.
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"templates": snapshot.templates, "directories": snapshot.directories, "read_time": snapshot.read_time},
+                file,
+            )
+        os.replace(temporary_path, path)
+
+
+def _fuzzy_score(tokens: list[str], path: str) -> float:
+    # Each token has to start a word of the path, be the initials of a component ("ls" for "Light Scattering"),
+    # or be close to a word. The score is the average similarity of the tokens, 0 if one of them is not found.
+    components = [component.split() for component in path.lower().split("/") if component]
+    words = [word for component in components for word in component]
+    initials = ["".join(word[0] for word in component) for component in components]
+    if not words:
+        return 0.0
+    total = 0.0
+    for token in tokens:
+        if token in initials or any(word.startswith(token) for word in words):
+            similarity = 1.0
+        else:
+            similarity = max(SequenceMatcher(None, token, word).ratio() for word in words)
+            if similarity < 0.75:
+                return 0.0
+        total += similarity
+    return total / len(tokens)
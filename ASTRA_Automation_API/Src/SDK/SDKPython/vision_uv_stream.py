@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Batched streaming of VISION UV data to ASTRA.
+Requires NumPy.
+
+Samples are written to a preallocated ring buffer and pushed by a background thread with one
+"PushVisionUvData" call per batch, rather than one call per sample:
+
+    with AstraAdmin().open_vision_uv_stream(experiment_id, channel_count=2) as stream:
+        for time, absorbance_1, absorbance_2 in detector:
+            stream.push(time, absorbance_1, absorbance_2)
+"""
+from dataclasses import dataclass
+from threading import Condition, Thread
+from time import monotonic
+
+import numpy
+
+
+@dataclass
+class VisionUvStreamStats:
+    """Counters of a VisionUvStream. Times are expressed in seconds."""
+    samples: int
+    batches: int
+    buffered: int
+    max_buffered: int
+    # Time producers were blocked because the buffer was full, i.e. ASTRA was falling behind.
+    blocked_time: float
+
+
+class VisionUvStream:
+    """Buffer UV samples and push them to an experiment in batches, from a background thread.
+
+    A batch is pushed once "batch_size" samples are buffered, or once the oldest buffered sample
+    is "max_latency" old. When the buffer is full, "push" blocks until ASTRA has caught up.
+    """
+
+    def __init__(
+        self,
+        admin,
+        experiment_id: int,
+        channel_count: int,
+        batch_size: int = 256,
+        max_latency: float = 0.1,
+        capacity: int = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            admin (AstraAdmin): AstraAdmin pushing the data.
+            experiment_id (int): ID of experiment collecting.
+            channel_count (int): Number of channels of each sample.
+            batch_size (int, optional): Maximum number of samples pushed per call. Defaults to 256.
+            max_latency (float, optional): Maximum time a sample is buffered, in seconds. Defaults to 0.1.
+            capacity (int, optional): Number of samples buffered before "push" blocks. Defaults to None (16 batches).
+        """
+        if channel_count <= 0 or batch_size <= 0:
+            raise ValueError("channel_count and batch_size must be positive")
+        self.admin = admin
+        self.experiment_id = experiment_id
+        self.channel_count = channel_count
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.capacity = capacity if capacity is not None else 16 * batch_size
+        # Each row is a sample: time then one value per channel, as expected by PushVisionUvData.
+        self._buffer = numpy.empty((self.capacity, channel_count + 1), dtype=numpy.float64)
+        self._condition = Condition()
+        # Index of the oldest buffered sample, and number of buffered samples.
+        self._head = 0
+        self._count = 0
+        # Time the oldest buffered sample was pushed to the stream.
+        self._oldest = None
+        self._pushing = 0
+        self._closed = False
+        self._error = None
+        self._samples = 0
+        self._batches = 0
+        self._max_buffered = 0
+        self._blocked_time = 0.0
+        self._thread = Thread(target=self._run, name=f"AstraVisionUv{experiment_id}", daemon=True)
+        self._thread.start()
+
+    def push(self, time: float, *values: float, timeout: float = None) -> bool:
+        """Add a sample.
+
+        Args:
+            time (float): Time of the sample.
+            values (float): Value of each channel.
+            timeout (float, optional): Maximum time to wait for room in the buffer, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the sample was buffered, false if the timeout expired.
+        """
+        if len(values) == 1 and numpy.ndim(values[0]) == 1:
+            values = values[0]
+        if len(values) != self.channel_count:
+            raise ValueError(f"Expected {self.channel_count} channel value(s), got {len(values)}")
+        with self._condition:
+            if not self._wait_for_room(1, timeout):
+                return False
+            row = self._buffer[(self._head + self._count) % self.capacity]
+            row[0] = time
+            row[1:] = values
+            self._added(1)
+        return True
+
+    def push_many(self, samples, timeout: float = None) -> bool:
+        """Add several samples at once.
+
+        Args:
+            samples (_type_): Array of shape (samples, channel_count + 1), each row being the time then the value of each channel.
+            timeout (float, optional): Maximum time to wait for room in the buffer, in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if all samples were buffered, false if the timeout expired (the first samples may have been buffered).
+        """
+        samples = numpy.asarray(samples, dtype=numpy.float64)
+        if samples.ndim != 2 or samples.shape[1] != self.channel_count + 1:
+            raise ValueError(f"Expected samples of shape (n, {self.channel_count + 1}), got {samples.shape}")
+        deadline = monotonic() + timeout if timeout is not None else None
+        offset = 0
+        while offset < len(samples):
+            with self._condition:
+                remaining = None if deadline is None else max(deadline - monotonic(), 0.0)
+                if not self._wait_for_room(1, remaining):
+                    return False
+                # Copy as many samples as fit, at most up to the end of the buffer.
+                tail = (self._head + self._count) % self.capacity
+                size = min(len(samples) - offset, self.capacity - self._count, self.capacity - tail)
+                self._buffer[tail:tail + size] = samples[offset:offset + size]
+                self._added(size)
+            offset += size
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Push all buffered samples now and wait until they are pushed.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if all samples were pushed, false if the timeout expired.
+        """
+        with self._condition:
+            # Flush regardless of the latency.
+            self._oldest = -float("inf") if self._count else None
+            self._condition.notify_all()
+            flushed = self._condition.wait_for(
+                lambda: (self._count == 0 and not self._pushing) or self._error is not None, timeout
+            )
+            self._raise_error()
+            return flushed
+
+    def close(self) -> None:
+        """Push all buffered samples and stop the stream."""
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+
+    def stats(self) -> VisionUvStreamStats:
+        with self._condition:
+            return VisionUvStreamStats(
+                self._samples, self._batches, self._count, self._max_buffered, self._blocked_time
+            )
+
+    def __enter__(self) -> "VisionUvStream":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _wait_for_room(self, size: int, timeout: float) -> bool:
+        self._raise_error()
+        if self._closed:
+            raise ValueError("Stream is closed")
+        if self._count + size <= self.capacity:
+            return True
+        start = monotonic()
+        room = self._condition.wait_for(
+            lambda: self._count + size <= self.capacity or self._error is not None or self._closed, timeout
+        )
+        self._blocked_time += monotonic() - start
+        self._raise_error()
+        return room and not self._closed
+
+    def _added(self, size: int) -> None:
+        was_empty = self._count == 0
+        if was_empty:
+            self._oldest = monotonic()
+        self._count += size
+        self._samples += size
+        self._max_buffered = max(self._max_buffered, self._count)
+        # An empty buffer leaves the thread waiting without a timeout, it has to start timing the latency.
+        if was_empty or self._count >= self.batch_size:
+            self._condition.notify_all()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _ready(self) -> bool:
+        return self._count >= self.batch_size or (
+            self._count > 0 and monotonic() - self._oldest >= self.max_latency
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready():
+                    if self._closed:
+                        return
+                    wait = None if self._count == 0 else max(self._oldest + self.max_latency - monotonic(), 0.0)
+                    self._condition.wait(wait)
+                # The rows being pushed are not reused until the call returns, they are passed as a view of the buffer.
+                size = min(self._count, self.batch_size, self.capacity - self._head)
+                batch = self._buffer[self._head:self._head + size]
+                self._pushing = size
+            try:
+                # One SAFEARRAY(double) per batch, copied from the buffer at once.
+                if not self.admin.push_vision_uv_data(self.experiment_id, self.channel_count, batch.ravel()):
+                    raise self.admin.last_error or RuntimeError("Could not push VISION UV data")
+            except Exception as ex:
+                with self._condition:
+                    self._error = ex
+                    self._pushing = 0
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._head = (self._head + size) % self.capacity
+                self._count -= size
+                self._pushing = 0
+                self._batches += 1
+                # Samples left over keep the time of the oldest sample of the batch, so they are pushed early rather than late.
+                if self._count == 0:
+                    self._oldest = None
+                self._condition.notify_all()